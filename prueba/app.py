@@ -1,20 +1,62 @@
 import sys
 import os
+import importlib
+import threading
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QLabel, QStackedWidget)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont
 
-from interface.img_interface import ImageInterface
-from interface.doc_interface import DocumentInterface
-from interface.audio_interface import AudioInterface
-from interface.data_interface import DataInterface
+from config.settings import (PREWARM_TABS, PREWARM_DELAY_MS, DIAGNOSTICS_PANEL,
+                             METRICS_ENABLED, METRICS_EXPORT_MS, DOC_OCR_WORKERS)
+from tools import metrics
+
+# Cada pestaña se importa y construye al abrirla por primera vez, así el
+# arranque no carga EasyOCR/torch, pdf2image, Vosk ni PyAudio.
+# (nombre, módulo, clase, dependencias pesadas a importar al precalentar;
+#  "modulo:funcion" importa el módulo y además llama a la función)
+PESTANAS = [
+    ("imagen", "interface.img_interface", "ImageInterface", ["tools.imgocr.img_extraction", "easyocr"]),
+    ("documento", "interface.doc_interface", "DocumentInterface", ["tools.dococr.doc_extraction"]),
+    ("audio", "interface.audio_interface", "AudioInterface", ["tools.audio.audio_extraction:warm_up"]),
+    ("datos", "interface.data_interface", "DataInterface", []),
+]
+if DIAGNOSTICS_PANEL:
+    PESTANAS.append(("diagnostico", "interface.diagnostics_interface", "DiagnosticsInterface", []))
+
+def precalentar(nombres):
+    """Importa los módulos de las pestañas indicadas (se llama en segundo plano)."""
+    for nombre, modulo, _, dependencias in PESTANAS:
+        if nombre not in nombres:
+            continue
+        for dependencia in [modulo] + dependencias:
+            try:
+                nombre_modulo, _, funcion = dependencia.partition(":")
+                cargado = importlib.import_module(nombre_modulo)
+                if funcion:
+                    getattr(cargado, funcion)()
+            except Exception as e:
+                print(f"Aviso: No se pudo precalentar {dependencia}: {e}")
+
+def preparar_almacen():
+    """Migra o importa el historial guardado (se llama en segundo plano al iniciar)."""
+    try:
+        from tools import storage
+        storage.prepare()
+    except Exception as e:
+        print(f"Aviso: No se pudo preparar el almacén: {e}")
 
 class OptiMaxApp(QMainWindow):
     def __init__(self):
         super().__init__()
+        self.precalentado = False
         self.init_ui()
 
+        if METRICS_ENABLED and METRICS_EXPORT_MS:
+            self.timer_metricas = QTimer(self)
+            self.timer_metricas.timeout.connect(self.exportar_metricas)
+            self.timer_metricas.start(METRICS_EXPORT_MS)
+
     def init_ui(self):
         self.setWindowTitle("OptiMax - Sistema de Extracción de Datos")
         self.setMinimumSize(1000, 700)
@@ -31,15 +73,20 @@ class OptiMaxApp(QMainWindow):
         self.stack_contenido = QStackedWidget()
         self.stack_contenido.setStyleSheet("background-color: white;")
 
-        self.imagen_interface = ImageInterface()
-        self.documento_interface = DocumentInterface()
-        self.audio_interface = AudioInterface()
-        self.datos_interface = DataInterface()
+        bienvenida = QLabel("Seleccione una fuente de datos en el panel lateral")
+        bienvenida.setAlignment(Qt.AlignCenter)
+        bienvenida.setStyleSheet("""
+            QLabel {
+                background-color: #515151;
+                color: #E3F2FD;
+                font-size: 16px;
+                font-weight: bold;
+            }
+        """)
+        self.stack_contenido.addWidget(bienvenida)
 
-        self.stack_contenido.addWidget(self.imagen_interface)
-        self.stack_contenido.addWidget(self.documento_interface)
-        self.stack_contenido.addWidget(self.audio_interface)
-        self.stack_contenido.addWidget(self.datos_interface)
+        # Interfaces ya construidas, por índice de pestaña
+        self.interfaces = {}
 
         main_layout.addWidget(self.stack_contenido, 4)
 
@@ -131,6 +178,10 @@ class OptiMaxApp(QMainWindow):
         self.btn_datos = self.crear_boton_menu("Datos Guardados", 3)
         layout.addWidget(self.btn_datos)
 
+        if DIAGNOSTICS_PANEL:
+            self.btn_diagnostico = self.crear_boton_menu("Diagnóstico", 4)
+            layout.addWidget(self.btn_diagnostico)
+
         layout.addStretch()
 
         footer = QLabel("v1.0")
@@ -168,13 +219,46 @@ class OptiMaxApp(QMainWindow):
         btn.clicked.connect(lambda checked, idx=indice: self.cambiar_vista(idx))
         return btn
 
+    def obtener_interfaz(self, indice):
+        """Construye la interfaz de la pestaña la primera vez que se necesita."""
+        if indice not in self.interfaces:
+            _, modulo, clase, _ = PESTANAS[indice]
+            interfaz = getattr(importlib.import_module(modulo), clase)()
+            self.stack_contenido.addWidget(interfaz)
+            self.interfaces[indice] = interfaz
+        return self.interfaces[indice]
+
     def cambiar_vista(self, indice):
-        self.stack_contenido.setCurrentIndex(indice)
+        nueva = indice not in self.interfaces
+        if nueva:
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            interfaz = self.obtener_interfaz(indice)
+        finally:
+            if nueva:
+                QApplication.restoreOverrideCursor()
+        self.stack_contenido.setCurrentWidget(interfaz)
 
-        if indice == 3:
-            self.datos_interface.cargar_datos()
+    def exportar_metricas(self):
+        try:
+            metrics.write_metrics()
+        except OSError as e:
+            print(f"Aviso: No se pudieron exportar las métricas: {e}")
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if PREWARM_TABS and not self.precalentado:
+            self.precalentado = True
+            # Después de pintar la ventana, importar en segundo plano
+            QTimer.singleShot(PREWARM_DELAY_MS, lambda: threading.Thread(
+                target=precalentar, args=(PREWARM_TABS,), daemon=True).start())
 
 def main():
+    # Con varias páginas de PDF en paralelo, cada Tesseract usa un solo hilo
+    # de OpenMP para no competir con los demás
+    if DOC_OCR_WORKERS != 1:
+        os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
     # Fix para Wayland en Arch Linux
     os.environ['QT_QPA_PLATFORM'] = 'wayland'
     os.environ['QT_QPA_PLATFORMTHEME'] = 'qt5ct'
@@ -192,10 +276,16 @@ def main():
     font = QFont("Arial", 10)
     app.setFont(font)
 
+    # La primera ejecución con SQLite importa todo el historial JSONL; así no
+    # ocurre en el hilo de la interfaz cuando el visor o un guardado abren la base
+    threading.Thread(target=preparar_almacen, daemon=True).start()
+
     ventana = OptiMaxApp()
     ventana.show()
 
-    sys.exit(app.exec_())
+    codigo = app.exec_()
+    ventana.exportar_metricas()
+    sys.exit(codigo)
 
 if __name__ == "__main__":
     main()
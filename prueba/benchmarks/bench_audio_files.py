@@ -0,0 +1,77 @@
+"""
+Mide la velocidad de transcripción de archivos de audio (segundos de audio
+por segundo de reloj) con distintos tamaños de bloque y números de procesos.
+
+Un valor de x1.0 equivale a la grabación en vivo, que avanza al ritmo del
+micrófono.
+
+Uso (desde el directorio prueba/):
+    python -m benchmarks.bench_audio_files carpeta_con_audios --workers 1 2 4
+    python -m benchmarks.bench_audio_files carpeta_con_audios --bloques 0.25 2 8
+"""
+import argparse
+import glob
+import os
+import time
+
+from tools.audio.audio_extraction import (AUDIO_EXTENSIONS, audio_duration, extract_text_from_audio,
+                                          extract_text_from_audios, get_model)
+
+
+def collect_audios(directory: str, limit: int = None):
+    paths = []
+    for extension in AUDIO_EXTENSIONS:
+        paths.extend(glob.glob(os.path.join(directory, "*" + extension)))
+    paths.sort()
+    return paths[:limit] if limit else paths
+
+
+def run_sequential(paths, chunk_seconds: float):
+    inicio = time.perf_counter()
+    total_tokens = sum(len(extract_text_from_audio(p, chunk_seconds)) for p in paths)
+    return time.perf_counter() - inicio, total_tokens
+
+
+def run_pool(paths, workers: int, chunk_seconds: float):
+    inicio = time.perf_counter()
+    total_tokens = sum(len(tokens) for _, tokens in
+                       extract_text_from_audios(paths, workers=workers, chunk_seconds=chunk_seconds))
+    return time.perf_counter() - inicio, total_tokens
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directorio")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--bloques", type=float, nargs="+", default=[0.25, 2.0],
+                        help="segundos por bloque a comparar en un solo proceso")
+    parser.add_argument("--limite", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    paths = collect_audios(args.directorio, args.limite)
+    if not paths:
+        print(f"No se encontraron audios en {args.directorio}")
+        return
+
+    audio_s = sum(audio_duration(p) for p in paths)
+    print(f"{len(paths)} archivos, {audio_s:.1f} s de audio")
+
+    # El modelo se carga antes para no sumarlo a la primera medición
+    get_model()
+    for chunk_seconds in args.bloques:
+        total_s, tokens = run_sequential(paths, chunk_seconds)
+        print(f"bloque={chunk_seconds:<5g} s  total {total_s:7.2f} s   "
+              f"x{audio_s / total_s:6.1f} tiempo real   tokens {tokens}")
+
+    # Con el pool cada proceso carga su propio modelo; ese costo sí se incluye
+    base = None
+    for workers in args.workers:
+        total_s, tokens = run_pool(paths, workers, max(args.bloques))
+        velocidad = audio_s / total_s
+        base = base or velocidad
+        print(f"workers={workers:<3} total {total_s:7.2f} s   x{velocidad:6.1f} tiempo real   "
+              f"aceleración x{velocidad / base:4.2f}   tokens {tokens}")
+
+
+if __name__ == "__main__":
+    main()
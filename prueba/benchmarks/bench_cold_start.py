@@ -0,0 +1,194 @@
+"""
+Mide el arranque en frío y la memoria base (RSS) al importar los módulos de
+la aplicación, y opcionalmente el costo de construir el lector de EasyOCR.
+
+Con --ventana mide además el arranque completo: tiempo hasta la primera
+ventana pintada, RSS y desglose del tiempo de importación por paquete. Cada
+muestra corre en un proceso nuevo con QT_QPA_PLATFORM=offscreen. --todas
+compara con la construcción de todas las pestañas al abrir la ventana, lo
+que equivale al arranque anterior a la carga diferida.
+
+Uso (desde el directorio prueba/):
+    python -m benchmarks.bench_cold_start
+    python -m benchmarks.bench_cold_start --modelo --repeticiones 5
+    python -m benchmarks.bench_cold_start --ventana --todas --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+DEFAULT_MODULES = ["tools.imgocr.img_extraction", "interface.img_interface", "app"]
+
+_CHILD_SCRIPT = """
+import json, resource, sys, time
+inicio = time.perf_counter()
+import importlib
+importlib.import_module({module!r})
+import_s = time.perf_counter() - inicio
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+modelo_s = None
+if {modelo!r}:
+    from tools.imgocr.reader_registry import get_reader
+    inicio = time.perf_counter()
+    get_reader()
+    modelo_s = time.perf_counter() - inicio
+print(json.dumps({{"import_s": import_s, "rss_kb": rss_kb, "modelo_s": modelo_s}}))
+"""
+
+_WINDOW_SCRIPT = """
+import json, resource, sys, time
+lanzado = float(sys.argv[1])
+inicio = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
+app = QApplication(sys.argv[:1])
+import app as optimax
+import_s = time.perf_counter() - inicio
+ventana = optimax.OptiMaxApp()
+ventana.show()
+if {todas!r}:
+    for indice in range(len(optimax.PESTANAS)):
+        ventana.obtener_interfaz(indice)
+
+def listo():
+    print(json.dumps({{
+        "primera_ventana_s": time.time() - lanzado,
+        "en_proceso_s": time.perf_counter() - inicio,
+        "import_s": import_s,
+        "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }}))
+    app.quit()
+
+# El temporizador se ejecuta cuando el bucle de eventos ya pintó la ventana
+QTimer.singleShot(0, listo)
+app.exec_()
+"""
+
+
+def _cwd() -> str:
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_once(module: str, modelo: bool) -> Dict:
+    script = _CHILD_SCRIPT.format(module=module, modelo=modelo)
+    proc = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True, text=True,
+        cwd=_cwd()
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "error")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def bench_module(module: str, repeticiones: int, modelo: bool) -> Dict:
+    muestras: List[Dict] = [run_once(module, modelo) for _ in range(repeticiones)]
+    resultado = {
+        "modulo": module,
+        "import_s_mediana": statistics.median(m["import_s"] for m in muestras),
+        "rss_mb_mediana": statistics.median(m["rss_kb"] for m in muestras) / 1024,
+    }
+    if modelo:
+        resultado["modelo_s_mediana"] = statistics.median(m["modelo_s"] for m in muestras)
+    return resultado
+
+
+def run_window_once(todas: bool, importtime: bool = False) -> Dict:
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    comando = [sys.executable]
+    if importtime:
+        comando += ["-X", "importtime"]
+    comando += ["-c", _WINDOW_SCRIPT.format(todas=todas), repr(time.time())]
+
+    proc = subprocess.run(comando, capture_output=True, text=True, cwd=_cwd(), env=env)
+    if proc.returncode != 0:
+        errores = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        raise RuntimeError(errores[-1] if errores else "error")
+
+    resultado = json.loads(proc.stdout.strip().splitlines()[-1])
+    if importtime:
+        resultado["importaciones"] = parse_importtime(proc.stderr)
+    return resultado
+
+
+def parse_importtime(salida: str) -> Dict[str, float]:
+    """
+    Suma el tiempo de importación (propio, en segundos) por paquete de primer
+    nivel a partir de la salida de python -X importtime.
+    """
+    por_paquete: Dict[str, float] = {}
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio_us, _, nombre = linea[len("import time:"):].split("|", 2)
+        paquete = nombre.strip().split(".")[0]
+        por_paquete[paquete] = por_paquete.get(paquete, 0.0) + int(propio_us) / 1e6
+    return por_paquete
+
+
+def bench_window(todas: bool, repeticiones: int) -> Dict:
+    muestras: List[Dict] = [run_window_once(todas) for _ in range(repeticiones)]
+    return {
+        "modo": "todas las pestañas" if todas else "diferido",
+        "primera_ventana_s_mediana": statistics.median(m["primera_ventana_s"] for m in muestras),
+        "import_s_mediana": statistics.median(m["import_s"] for m in muestras),
+        "rss_mb_mediana": statistics.median(m["rss_kb"] for m in muestras) / 1024,
+        # El desglose se toma aparte: -X importtime agrega su propio costo
+        "importaciones": run_window_once(todas, importtime=True)["importaciones"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modulos", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--modelo", action="store_true",
+                        help="medir también la primera construcción del lector EasyOCR")
+    parser.add_argument("--ventana", action="store_true",
+                        help="medir también el tiempo hasta la primera ventana pintada")
+    parser.add_argument("--todas", action="store_true",
+                        help="con --ventana, comparar con la construcción de todas las pestañas al inicio")
+    parser.add_argument("--top", type=int, default=10, help="paquetes a mostrar en el desglose")
+    parser.add_argument("--json", action="store_true", help="imprimir resultados en JSON")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for module in args.modulos:
+        try:
+            resultados.append(bench_module(module, args.repeticiones, args.modelo))
+        except RuntimeError as e:
+            print(f"Error al medir {module}: {e}", file=sys.stderr)
+
+    arranques = []
+    if args.ventana or args.todas:
+        for todas in ([False, True] if args.todas else [False]):
+            try:
+                arranques.append(bench_window(todas, args.repeticiones))
+            except RuntimeError as e:
+                print(f"Error al medir el arranque: {e}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps({"modulos": resultados, "arranque": arranques} if arranques else resultados, indent=2))
+        return
+
+    for r in resultados:
+        linea = f"{r['modulo']:<35} import {r['import_s_mediana'] * 1000:8.1f} ms   RSS {r['rss_mb_mediana']:7.1f} MB"
+        if "modelo_s_mediana" in r:
+            linea += f"   modelo {r['modelo_s_mediana']:6.2f} s"
+        print(linea)
+
+    for r in arranques:
+        print(f"{r['modo']:<20} primera ventana {r['primera_ventana_s_mediana'] * 1000:8.1f} ms   "
+              f"import {r['import_s_mediana'] * 1000:8.1f} ms   RSS {r['rss_mb_mediana']:7.1f} MB")
+        paquetes = sorted(r["importaciones"].items(), key=lambda p: p[1], reverse=True)
+        for paquete, segundos in paquetes[:args.top]:
+            print(f"    {paquete:<30} {segundos * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
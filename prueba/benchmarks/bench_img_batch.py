@@ -0,0 +1,61 @@
+"""
+Mide el rendimiento del OCR de imágenes por lotes con distintos números de
+procesos y lo compara con el procesamiento secuencial.
+
+Uso (desde el directorio prueba/):
+    python -m benchmarks.bench_img_batch carpeta_con_imagenes --workers 1 2 4 8
+"""
+import argparse
+import glob
+import os
+import time
+
+from tools.imgocr.img_extraction import extract_text_from_images
+
+IMAGE_PATTERNS = ("*.png", "*.jpg", "*.jpeg", "*.bmp")
+
+
+def collect_images(directory: str, limit: int = None):
+    paths = []
+    for pattern in IMAGE_PATTERNS:
+        paths.extend(glob.glob(os.path.join(directory, pattern)))
+    paths.sort()
+    return paths[:limit] if limit else paths
+
+
+def run(paths, workers: int, chunksize: int):
+    inicio = time.perf_counter()
+    primera = None
+    total_tokens = 0
+    for _, tokens in extract_text_from_images(paths, workers=workers, chunksize=chunksize):
+        if primera is None:
+            primera = time.perf_counter() - inicio
+        total_tokens += len(tokens)
+    return time.perf_counter() - inicio, primera, total_tokens
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directorio")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--chunksize", type=int, default=1)
+    parser.add_argument("--limite", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    paths = collect_images(args.directorio, args.limite)
+    if not paths:
+        print(f"No se encontraron imágenes en {args.directorio}")
+        return
+
+    print(f"{len(paths)} imágenes")
+    base = None
+    for workers in args.workers:
+        total_s, primera_s, tokens = run(paths, workers, args.chunksize)
+        imgs_s = len(paths) / total_s
+        base = base or imgs_s
+        print(f"workers={workers:<3} total {total_s:7.2f} s   primera {primera_s:6.2f} s   "
+              f"{imgs_s:6.2f} img/s   aceleración x{imgs_s / base:4.2f}   tokens {tokens}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+Suite de rendimiento de extremo a extremo sobre datos sintéticos
+(benchmarks.fixtures): rendimiento, latencia y memoria máxima (RSS) de
+extract_text_from_image, extract_text_from_pdf, extract_key_values, el
+almacén (JSONL y SQLite) y la transcripción de audio, con varios tamaños.
+
+Cada caso y tamaño corre en un proceso propio para que el RSS máximo sea
+solo suyo. Los resultados se guardan como línea base en JSON; con
+--comparar se marca como regresión todo lo que empeore más de --umbral por
+ciento en rendimiento, latencia p50 o RSS, y el proceso termina con código 1.
+
+Uso (desde el directorio prueba/):
+    python -m benchmarks.bench_suite --guardar benchmarks/base.json
+    python -m benchmarks.bench_suite --casos valores almacen_jsonl --comparar benchmarks/base.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.fixtures import (AUDIO_SECONDS, DEFAULT_SEED, FIXTURES_DIR, IMAGE_ITEMS,
+                                 IMAGES_PER_SIZE, PDF_PAGES, audio_path, generate, image_path,
+                                 load_manifest, make_entries, pdf_path, receipt_tokens)
+
+BASELINE_VERSION = 1
+
+TOKEN_SIZES = (1000, 10000, 100000)
+STORE_SIZES = (1000, 10000, 50000)
+
+# Mínimo de llamadas para los casos que tardan milisegundos
+MIN_FAST_CALLS = 20
+# Anexos individuales medidos sobre un almacén ya poblado
+SINGLE_APPENDS = 20
+
+# Métricas comparadas con la línea base: (clave, True si mayor es mejor)
+COMPARED = (("rendimiento", True), ("latencia_p50_ms", False), ("rss_mb", False))
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _row(operacion: str, tamano: int, unidad: str, unidades: float, latencias: List[float]) -> Dict:
+    """Resume las latencias (s) de una operación que procesa unidades por llamada."""
+    mediana = _percentile(latencias, 0.5)
+    return {
+        "operacion": operacion,
+        "tamano": tamano,
+        "unidad": unidad,
+        "llamadas": len(latencias),
+        # Según la mediana: una pausa aislada del sistema no mueve la comparación
+        "rendimiento": unidades / mediana if mediana else 0.0,
+        "latencia_p50_ms": mediana * 1000,
+        "latencia_p95_ms": _percentile(latencias, 0.95) * 1000,
+    }
+
+
+def _timed(fn: Callable, *args, **kwargs):
+    inicio = time.perf_counter()
+    resultado = fn(*args, **kwargs)
+    return time.perf_counter() - inicio, resultado
+
+
+def _accuracy(tokens_por_archivo: Dict[str, List[str]], esperados: Dict[str, Dict]) -> float:
+    from config.keywords import keywords_list
+    from tools.data_extraction import extract_key_values
+
+    aciertos = sum(1 for nombre, tokens in tokens_por_archivo.items()
+                   if extract_key_values(tokens, keywords_list) == esperados.get(nombre))
+    return 100 * aciertos / len(tokens_por_archivo) if tokens_por_archivo else 0.0
+
+
+def case_imagen(tamano: int, fixtures: str, repeticiones: int, semilla: int) -> List[Dict]:
+    from tools.imgocr.img_extraction import extract_text_from_image
+
+    paths = [image_path(fixtures, tamano, i) for i in range(IMAGES_PER_SIZE)]
+    if not all(os.path.exists(p) for p in paths):
+        raise RuntimeError("faltan las imágenes sintéticas (se requiere Pillow)")
+
+    # La primera llamada incluye la carga del lector y no cuenta en la latencia
+    primera_s, _ = _timed(extract_text_from_image, paths[0], use_cache=False)
+    latencias = []
+    tokens_por_archivo = {}
+    for _ in range(repeticiones):
+        for path in paths:
+            segundos, tokens = _timed(extract_text_from_image, path, use_cache=False)
+            if not tokens:
+                raise RuntimeError(f"OCR sin tokens en {path}")
+            latencias.append(segundos)
+            tokens_por_archivo[os.path.basename(path)] = tokens
+
+    fila = _row("imagen", tamano, "img", 1, latencias)
+    fila["primera_s"] = primera_s
+    fila["exactitud_pct"] = _accuracy(tokens_por_archivo, load_manifest(fixtures)["esperados"])
+    return [fila]
+
+
+def case_pdf(tamano: int, fixtures: str, repeticiones: int, semilla: int) -> List[Dict]:
+    from tools.dococr.doc_extraction import extract_text_from_pdf
+
+    path = pdf_path(fixtures, tamano)
+    if not os.path.exists(path):
+        raise RuntimeError("faltan los PDF sintéticos (se requiere Pillow)")
+
+    primera_s, _ = _timed(extract_text_from_pdf, pdf_path(fixtures, PDF_PAGES[0]), use_cache=False)
+    latencias = []
+    tokens = []
+    for _ in range(repeticiones):
+        segundos, tokens = _timed(extract_text_from_pdf, path, use_cache=False)
+        if not tokens:
+            raise RuntimeError(f"OCR sin tokens en {path}")
+        latencias.append(segundos)
+
+    fila = _row("pdf", tamano, "pág", tamano, latencias)
+    fila["primera_s"] = primera_s
+    fila["exactitud_pct"] = _accuracy({os.path.basename(path): tokens}, load_manifest(fixtures)["esperados"])
+    return [fila]
+
+
+def case_valores(tamano: int, fixtures: str, repeticiones: int, semilla: int) -> List[Dict]:
+    from config.keywords import keywords_list
+    from tools.data_extraction import extract_key_values
+
+    tokens = receipt_tokens(random.Random(f"{semilla}-valores"), tamano)
+    extract_key_values(tokens, keywords_list)
+    latencias = [_timed(extract_key_values, tokens, keywords_list)[0]
+                 for _ in range(max(repeticiones, MIN_FAST_CALLS))]
+    return [_row("valores", tamano, "tokens", tamano, latencias)]
+
+
+def _case_store(backend, nombre: str, extension: str, tamano: int, fixtures: str,
+                repeticiones: int, semilla: int) -> List[Dict]:
+    entradas = make_entries(random.Random(f"{semilla}-almacen"), tamano)
+
+    # En el mismo disco que la aplicación: el costo de fsync depende de él
+    with tempfile.TemporaryDirectory(dir=fixtures) as directorio:
+        lote = []
+        path = None
+        for i in range(repeticiones):
+            path = os.path.join(directorio, f"almacen_{i}.{extension}")
+            lote.append(_timed(backend.append_entries, entradas, path)[0])
+
+        # Posteriores a las del lote, como las que agrega la aplicación
+        extra = make_entries(random.Random(f"{semilla}-almacen-extra"), SINGLE_APPENDS,
+                             datetime(2030, 1, 1))
+        individual = [_timed(backend.append_entry, entrada, path)[0] for entrada in extra]
+
+        llamadas = max(repeticiones, MIN_FAST_CALLS)
+        consulta = [_timed(backend.count, path, clave="total", valor_min=100)[0]
+                    for _ in range(llamadas)]
+        pagina = [_timed(backend.query_entries, path, orden="fecha", descendente=True, limit=50)[0]
+                  for _ in range(llamadas)]
+
+    return [
+        _row(f"{nombre}.anexar_lote", tamano, "entradas", tamano, lote),
+        _row(f"{nombre}.anexar", tamano, "entradas", 1, individual),
+        _row(f"{nombre}.consulta", tamano, "consultas", 1, consulta),
+        _row(f"{nombre}.pagina", tamano, "consultas", 1, pagina),
+    ]
+
+
+def case_almacen_jsonl(tamano: int, fixtures: str, repeticiones: int, semilla: int) -> List[Dict]:
+    from tools import jsonl_store
+    return _case_store(jsonl_store, "almacen_jsonl", "jsonl", tamano, fixtures, repeticiones, semilla)
+
+
+def case_almacen_sqlite(tamano: int, fixtures: str, repeticiones: int, semilla: int) -> List[Dict]:
+    from tools import sqlite_store
+    return _case_store(sqlite_store, "almacen_sqlite", "db", tamano, fixtures, repeticiones, semilla)
+
+
+def case_audio(tamano: int, fixtures: str, repeticiones: int, semilla: int) -> List[Dict]:
+    from tools.audio.audio_extraction import MODEL_PATH, extract_text_from_audio, get_model
+
+    if not os.path.exists(MODEL_PATH):
+        raise RuntimeError(f"modelo Vosk no encontrado en {MODEL_PATH}")
+
+    primera_s, _ = _timed(get_model)
+    path = audio_path(fixtures, tamano)
+    latencias = [_timed(extract_text_from_audio, path)[0] for _ in range(repeticiones)]
+
+    fila = _row("audio", tamano, "s de audio", tamano, latencias)
+    fila["primera_s"] = primera_s
+    return [fila]
+
+
+# Caso -> (función, tamaños por defecto)
+CASES = {
+    "imagen": (case_imagen, IMAGE_ITEMS),
+    "pdf": (case_pdf, PDF_PAGES),
+    "valores": (case_valores, TOKEN_SIZES),
+    "almacen_jsonl": (case_almacen_jsonl, STORE_SIZES),
+    "almacen_sqlite": (case_almacen_sqlite, STORE_SIZES),
+    "audio": (case_audio, AUDIO_SECONDS),
+}
+
+
+def run_child(caso: str, tamano: int, fixtures: str, repeticiones: int, semilla: int) -> None:
+    import resource
+
+    filas = CASES[caso][0](tamano, fixtures, repeticiones, semilla)
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    for fila in filas:
+        fila["caso"] = caso
+        fila["rss_mb"] = rss_mb
+    print(json.dumps(filas), flush=True)
+
+
+def run_case(caso: str, tamano: int, fixtures: str, repeticiones: int, semilla: int) -> List[Dict]:
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_suite", "--interno", caso, str(tamano),
+         "--fixtures", os.path.abspath(fixtures), "--repeticiones", str(repeticiones), "--semilla", str(semilla)],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "error")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def key(fila: Dict) -> str:
+    return f"{fila['operacion']}/{fila['tamano']}"
+
+
+def compare(base: List[Dict], actual: List[Dict], umbral: float) -> List[Dict]:
+    """
+    Compara cada operación y tamaño presentes en ambas corridas.
+
+    Returns:
+        Una fila por métrica con el cambio en por ciento (positivo = peor) y
+        si supera el umbral
+    """
+    anteriores = {key(f): f for f in base}
+    cambios = []
+    for fila in actual:
+        anterior = anteriores.get(key(fila))
+        if anterior is None:
+            continue
+        for metrica, mayor_es_mejor in COMPARED:
+            antes, ahora = anterior.get(metrica), fila.get(metrica)
+            if not antes or ahora is None:
+                continue
+            peor_pct = 100 * ((antes - ahora) if mayor_es_mejor else (ahora - antes)) / antes
+            cambios.append({"clave": key(fila), "metrica": metrica, "antes": antes, "ahora": ahora,
+                            "peor_pct": peor_pct, "regresion": peor_pct > umbral})
+    return cambios
+
+
+def save_baseline(path: str, filas: List[Dict], semilla: int, repeticiones: int) -> None:
+    directorio = os.path.dirname(path)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": BASELINE_VERSION,
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "semilla": semilla,
+            "repeticiones": repeticiones,
+            "resultados": filas,
+        }, f, indent=2, ensure_ascii=False)
+
+
+def load_baseline(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def print_row(fila: Dict) -> None:
+    linea = (f"{key(fila):<34} {fila['rendimiento']:12.1f} {fila['unidad']}/s   "
+             f"p50 {fila['latencia_p50_ms']:9.2f} ms   p95 {fila['latencia_p95_ms']:9.2f} ms   "
+             f"RSS {fila['rss_mb']:7.1f} MB")
+    if "primera_s" in fila:
+        linea += f"   primera {fila['primera_s']:6.2f} s"
+    if "exactitud_pct" in fila:
+        linea += f"   exactitud {fila['exactitud_pct']:5.1f}%"
+    print(linea)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--casos", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="directorio de los datos sintéticos")
+    parser.add_argument("--semilla", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--guardar", metavar="JSON", help="guardar los resultados como línea base")
+    parser.add_argument("--comparar", metavar="JSON", help="línea base contra la que comparar")
+    parser.add_argument("--umbral", type=float, default=15.0,
+                        help="por ciento de empeoramiento a partir del cual hay regresión")
+    parser.add_argument("--interno", nargs=2, metavar=("CASO", "TAMANO"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.interno:
+        run_child(args.interno[0], int(args.interno[1]), args.fixtures, args.repeticiones, args.semilla)
+        return
+
+    base: Optional[Dict] = load_baseline(args.comparar) if args.comparar else None
+    if base is not None and base.get("semilla") != args.semilla:
+        print(f"Advertencia: la línea base usa la semilla {base.get('semilla')}, esta corrida {args.semilla}")
+
+    generate(args.fixtures, args.semilla)
+
+    filas = []
+    for caso in args.casos:
+        for tamano in CASES[caso][1]:
+            try:
+                resultado = run_case(caso, tamano, args.fixtures, args.repeticiones, args.semilla)
+            except RuntimeError as e:
+                print(f"{caso}/{tamano:<27} omitido: {e}")
+                continue
+            for fila in resultado:
+                print_row(fila)
+            filas.extend(resultado)
+
+    if args.guardar:
+        save_baseline(args.guardar, filas, args.semilla, args.repeticiones)
+        print(f"Línea base guardada en {args.guardar}")
+
+    if base is None:
+        return
+
+    cambios = compare(base["resultados"], filas, args.umbral)
+    regresiones = [c for c in cambios if c["regresion"]]
+    print(f"\nComparación con {args.comparar} ({base.get('fecha')}, umbral {args.umbral:g}%)")
+    for c in cambios:
+        marca = "REGRESIÓN" if c["regresion"] else ""
+        print(f"{c['clave']:<34} {c['metrica']:<16} {c['antes']:12.2f} -> {c['ahora']:12.2f}   "
+              f"{100 * (c['ahora'] - c['antes']) / c['antes']:+7.1f}%   {marca}")
+    if regresiones:
+        print(f"{len(regresiones)} regresiones por encima del {args.umbral:g}%")
+        sys.exit(1)
+    print("Sin regresiones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Compara el costo por página de los motores de Tesseract: pytesseract (un
+proceso por página con archivos temporales) y tesserocr (motor persistente
+en el proceso, imágenes en memoria).
+
+Sin argumentos mide la sobrecarga fija con una imagen casi vacía; con --pdf
+mide páginas reales del documento. Además procesa varios documentos
+seguidos por el mismo camino que la aplicación (un pool de hilos por
+documento) y cuenta los motores cargados: con los motores reutilizados
+solo se cargan en el primer documento.
+
+Uso (desde el directorio prueba/):
+    python -m benchmarks.bench_tesseract
+    python -m benchmarks.bench_tesseract --pdf factura.pdf --paginas 5 --documentos 10 --workers 4
+"""
+import argparse
+import statistics
+import time
+
+from config.settings import DOC_LANGUAGES
+
+
+def blank_images(count: int):
+    from PIL import Image, ImageDraw
+
+    images = []
+    for i in range(count):
+        image = Image.new("L", (400, 60), color=255)
+        ImageDraw.Draw(image).text((10, 20), f"TOTAL {i}.00", fill=0)
+        images.append(image)
+    return images
+
+
+def pdf_images(pdf_path: str, count: int):
+    from tools.dococr.doc_extraction import iter_pdf_pages
+
+    images = []
+    for page, image in iter_pdf_pages(pdf_path):
+        images.append(image)
+        if len(images) >= count:
+            break
+    return images
+
+
+def time_pytesseract(images, repeticiones: int):
+    import pytesseract
+
+    muestras = []
+    for _ in range(repeticiones):
+        for image in images:
+            inicio = time.perf_counter()
+            pytesseract.image_to_string(image, lang=DOC_LANGUAGES)
+            muestras.append(time.perf_counter() - inicio)
+    return muestras
+
+
+def time_tesserocr(images, repeticiones: int):
+    import tesserocr
+
+    inicio = time.perf_counter()
+    api = tesserocr.PyTessBaseAPI(lang=DOC_LANGUAGES)
+    carga = time.perf_counter() - inicio
+
+    muestras = []
+    try:
+        for _ in range(repeticiones):
+            for image in images:
+                inicio = time.perf_counter()
+                api.SetImage(image)
+                api.GetUTF8Text()
+                muestras.append(time.perf_counter() - inicio)
+    finally:
+        api.End()
+    return muestras, carga
+
+
+def time_documents(images, documentos: int, workers: int):
+    from tools import metrics
+    from tools.dococr.doc_extraction import _ocr_pages
+
+    metrics.reset()
+    muestras = []
+    for _ in range(documentos):
+        # _ocr_pages cierra cada imagen al terminar su OCR
+        paginas = [(n, image.copy()) for n, image in enumerate(images, start=1)]
+        inicio = time.perf_counter()
+        for _ in _ocr_pages(paginas, workers):
+            pass
+        muestras.append(time.perf_counter() - inicio)
+
+    cargas = sum(fila["cantidad"] for fila in metrics.snapshot() if fila["etapa"] == "carga_modelo")
+    return muestras, cargas
+
+
+def report(nombre: str, muestras):
+    muestras = sorted(muestras)
+    p95 = muestras[min(len(muestras) - 1, int(len(muestras) * 0.95))]
+    print(f"{nombre:<12} páginas {len(muestras):4d}   mediana {statistics.median(muestras) * 1000:8.1f} ms"
+          f"   p95 {p95 * 1000:8.1f} ms")
+    return statistics.median(muestras)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pdf", help="PDF del que tomar páginas reales")
+    parser.add_argument("--paginas", type=int, default=5)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--documentos", type=int, default=5,
+                        help="documentos seguidos en la medición por documento")
+    parser.add_argument("--workers", type=int, default=4, help="páginas en paralelo por documento")
+    args = parser.parse_args(argv)
+
+    images = pdf_images(args.pdf, args.paginas) if args.pdf else blank_images(args.paginas)
+
+    base = report("pytesseract", time_pytesseract(images, args.repeticiones))
+
+    try:
+        muestras, carga = time_tesserocr(images, args.repeticiones)
+    except ImportError:
+        print("tesserocr no está instalado; solo se midió pytesseract")
+        return
+
+    print(f"{'tesserocr':<12} carga única del motor {carga * 1000:.1f} ms")
+    persistente = report("tesserocr", muestras)
+    print(f"Ahorro por página: {(base - persistente) * 1000:.1f} ms (x{base / persistente:.2f})")
+
+    from tools.dococr import tess_engine
+    if tess_engine.active_backend() != "tesserocr":
+        return
+    muestras, cargas = time_documents(images, args.documentos, args.workers)
+    print(f"{'documentos':<12} {len(muestras):4d} x {len(images)} páginas, {args.workers} workers   "
+          f"primero {muestras[0] * 1000:8.1f} ms   mediana {statistics.median(muestras) * 1000:8.1f} ms")
+    print(f"Motores cargados: {cargas} (como mucho {args.workers}, no {args.workers} por documento)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Compara la transcripción de un conjunto de grabaciones con y sin la
+compuerta de voz (VAD): tiempo de CPU por minuto de audio, silencio omitido
+y exactitud.
+
+La exactitud se mide contra una transcripción de referencia si junto a cada
+audio hay un .txt con el mismo nombre (tokens tal como los produce
+format_transcription, p. ej. "total 161.04"); si no, contra el resultado sin
+VAD. También se comparan los valores extraídos con extract_key_values.
+
+Uso (desde el directorio prueba/):
+    python -m benchmarks.bench_vad carpeta_con_audios
+    python -m benchmarks.bench_vad carpeta_con_audios --umbral 200 400 800
+"""
+import argparse
+import os
+import time
+from typing import Dict, List, Optional
+
+from config.keywords import keywords_list
+from config.settings import AUDIO_VAD_MIN_RMS
+from tools.audio.audio_extraction import SAMPLE_RATE, audio_duration, get_model, iter_transcription
+from tools.audio.vad import EnergyVad
+from tools.data_extraction import extract_key_values
+from benchmarks.bench_audio_files import collect_audios
+
+
+def word_errors(reference: List[str], hypothesis: List[str]) -> int:
+    """Distancia de edición por palabras (sustituciones, inserciones y borrados)."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref in enumerate(reference, 1):
+        current = [i]
+        for j, hyp in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref != hyp)))
+        previous = current
+    return previous[-1]
+
+
+def transcribe(path: str, vad: Optional[EnergyVad]) -> Dict:
+    inicio = time.process_time()
+    tokens = [t for segment in iter_transcription(path, vad=vad) for t in segment]
+    return {"tokens": tokens, "cpu_s": time.process_time() - inicio}
+
+
+def load_reference(path: str) -> Optional[List[str]]:
+    referencia = os.path.splitext(path)[0] + ".txt"
+    if not os.path.exists(referencia):
+        return None
+    with open(referencia, encoding="utf-8") as f:
+        return f.read().lower().split()
+
+
+def run(paths: List[str], min_rms: Optional[float]) -> Dict:
+    audio_s = cpu_s = 0.0
+    omitido_s = 0.0
+    errores = palabras = 0
+    valores_distintos = 0
+
+    for path in paths:
+        duracion = audio_duration(path)
+        base = transcribe(path, None)
+        referencia = load_reference(path)
+        if referencia is None:
+            referencia = base["tokens"]
+
+        if min_rms is None:
+            resultado = base
+        else:
+            vad = EnergyVad(SAMPLE_RATE, min_rms=min_rms)
+            resultado = transcribe(path, vad)
+            omitido_s += vad.stats()["omitido_s"]
+
+        audio_s += duracion
+        cpu_s += resultado["cpu_s"]
+        errores += word_errors(referencia, resultado["tokens"])
+        palabras += len(referencia)
+        if extract_key_values(resultado["tokens"], keywords_list) != extract_key_values(referencia, keywords_list):
+            valores_distintos += 1
+
+    return {
+        "cpu_s_por_minuto": 60 * cpu_s / audio_s if audio_s else 0.0,
+        "omitido_pct": 100 * omitido_s / audio_s if audio_s else 0.0,
+        "wer_pct": 100 * errores / palabras if palabras else 0.0,
+        "valores_distintos": valores_distintos,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directorio")
+    parser.add_argument("--umbral", type=float, nargs="+", default=[AUDIO_VAD_MIN_RMS],
+                        help="valores de AUDIO_VAD_MIN_RMS a comparar")
+    parser.add_argument("--limite", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    paths = collect_audios(args.directorio, args.limite)
+    if not paths:
+        print(f"No se encontraron audios en {args.directorio}")
+        return
+
+    con_referencia = sum(1 for p in paths if load_reference(p) is not None)
+    print(f"{len(paths)} archivos ({con_referencia} con transcripción de referencia)")
+
+    get_model()
+    base = None
+    for umbral in [None] + args.umbral:
+        r = run(paths, umbral)
+        base = base or r["cpu_s_por_minuto"]
+        nombre = "sin VAD" if umbral is None else f"VAD rms>={umbral:g}"
+        print(f"{nombre:<16} CPU {r['cpu_s_por_minuto']:6.2f} s/min de audio "
+              f"(x{r['cpu_s_por_minuto'] / base if base else 0:4.2f})   omitido {r['omitido_pct']:5.1f}%   "
+              f"WER {r['wer_pct']:5.1f}%   archivos con valores distintos {r['valores_distintos']}")
+
+
+if __name__ == "__main__":
+    main()
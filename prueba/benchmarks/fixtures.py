@@ -0,0 +1,277 @@
+"""
+Datos sintéticos y deterministas para los benchmarks: recibos con las
+etiquetas de keywords_list (como texto, imágenes PNG y PDF escaneados de
+varias páginas), grabaciones WAV con ráfagas armónicas que imitan el ritmo
+del habla (sin TTS) y entradas para el almacén.
+
+Con la misma semilla se generan siempre los mismos recibos y valores, así
+que los resultados de distintas corridas son comparables. Las imágenes y
+los PDF requieren Pillow; el resto solo usa la biblioteca estándar.
+
+Uso (desde el directorio prueba/):
+    python -m benchmarks.fixtures .bench_fixtures
+"""
+import argparse
+import json
+import math
+import os
+import random
+import wave
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config.keywords import keywords_list
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    Image = ImageDraw = ImageFont = None
+
+FIXTURES_DIR = ".bench_fixtures"
+# Cambiar si cambia el contenido generado, para regenerar los datos guardados
+FIXTURES_VERSION = 1
+DEFAULT_SEED = 1234
+
+SAMPLE_RATE = 16000
+
+RECEIPT_WIDTH = 900
+RECEIPT_MARGIN = 40
+RECEIPT_FONT_SIZE = 28
+RECEIPT_DPI = 150
+# Fecha fija en los metadatos del PDF para que el archivo sea reproducible
+PDF_DATE = datetime(2024, 1, 1)
+
+PRODUCTOS = ["ARROZ", "LECHE", "PAN", "CAFE", "AZUCAR", "HUEVOS", "ACEITE",
+             "QUESO", "POLLO", "JABON", "AGUA", "GALLETAS", "FRIJOLES", "PASTA"]
+TASA_IMPUESTO = 0.07
+
+# Tamaños generados por defecto
+IMAGE_ITEMS = (5, 20, 50)
+IMAGES_PER_SIZE = 5
+PDF_PAGES = (1, 4, 16)
+AUDIO_SECONDS = (10, 30)
+
+
+def receipt_lines(rng: random.Random, items: int) -> Tuple[List[str], Dict[str, float]]:
+    """
+    Líneas de un recibo con items productos y una línea por cada palabra
+    clave de keywords_list que el recibo conoce.
+
+    Returns:
+        (líneas, valores esperados por palabra clave)
+    """
+    lines = ["SUPERMERCADO OPTIMAX",
+             f"FACTURA {rng.randint(100000, 999999)}",
+             f"FECHA {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024"]
+
+    subtotal = 0.0
+    for _ in range(items):
+        cantidad = rng.randint(1, 3)
+        importe = round(cantidad * rng.uniform(0.5, 40), 2)
+        subtotal += importe
+        lines.append(f"{cantidad} {rng.choice(PRODUCTOS)} {importe:.2f}")
+
+    subtotal = round(subtotal, 2)
+    impuesto = round(subtotal * TASA_IMPUESTO, 2)
+    total = round(subtotal + impuesto, 2)
+    conocidos = {
+        "previous": round(rng.uniform(0, 500), 2),
+        "current": total,
+        "subttl": subtotal,
+        "venta": subtotal,
+        "tax": impuesto,
+        "impuesto": impuesto,
+        "itbms": impuesto,
+        "total": total,
+    }
+
+    valores = {}
+    for clave in keywords_list:
+        if clave in conocidos:
+            valores[clave] = conocidos[clave]
+            lines.append(f"{clave.upper()} {conocidos[clave]:.2f}")
+    lines.append("GRACIAS POR SU COMPRA")
+    return lines, valores
+
+
+def receipt_tokens(rng: random.Random, n_tokens: int, items: int = 20) -> List[str]:
+    """Tokens de recibos consecutivos, como los produce el OCR, hasta n_tokens."""
+    tokens = []
+    while len(tokens) < n_tokens:
+        lines, _ = receipt_lines(rng, items)
+        tokens.extend(" ".join(lines).lower().split())
+    return tokens[:n_tokens]
+
+
+def make_entries(rng: random.Random, n: int, inicio: datetime = datetime(2024, 1, 1)) -> List[Dict]:
+    """Entradas del almacén con fechas (una por minuto desde inicio) y valores deterministas."""
+    fuentes = ("imagen", "documento", "audio")
+    entradas = []
+    for i in range(n):
+        _, valores = receipt_lines(rng, rng.randint(1, 5))
+        entradas.append({
+            "fuente": fuentes[i % len(fuentes)],
+            "fecha": (inicio + timedelta(minutes=i)).isoformat(),
+            "datos": valores,
+            "archivo": f"recibo_{i:06d}",
+        })
+    return entradas
+
+
+def _font(size: int):
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        pass
+    try:
+        # Pillow 10.1+ incluye una fuente escalable por defecto
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def render_receipt(lines: Sequence[str]):
+    """Dibuja las líneas del recibo en una imagen en escala de grises."""
+    if Image is None:
+        raise ImportError("Se requiere Pillow para generar imágenes de recibos")
+    font = _font(RECEIPT_FONT_SIZE)
+    line_height = int(RECEIPT_FONT_SIZE * 1.5)
+    image = Image.new("L", (RECEIPT_WIDTH, 2 * RECEIPT_MARGIN + line_height * len(lines)), 255)
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((RECEIPT_MARGIN, RECEIPT_MARGIN + i * line_height), line, fill=0, font=font)
+    return image
+
+
+def write_pdf(images: List, path: str) -> None:
+    """Guarda las imágenes como un PDF escaneado (sin capa de texto)."""
+    images[0].save(path, "PDF", save_all=True, append_images=images[1:],
+                   resolution=RECEIPT_DPI, creationDate=PDF_DATE, modDate=PDF_DATE)
+
+
+def synth_speech(rng: random.Random, seconds: float, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """
+    PCM de 16 bits mono con el ritmo del habla: frases de sílabas (ráfagas
+    armónicas de 80-250 ms) separadas por pausas, sobre un ruido de fondo
+    bajo. No contiene palabras reconocibles; sirve para medir la
+    decodificación y la compuerta de voz.
+    """
+    total = int(seconds * sample_rate)
+    samples = array("h")
+
+    def ruido(n: int) -> None:
+        samples.extend(int(rng.gauss(0, 60)) for _ in range(n))
+
+    while len(samples) < total:
+        for _ in range(rng.randint(3, 10)):
+            duracion = int(rng.uniform(0.08, 0.25) * sample_rate)
+            f0 = rng.uniform(100, 220)
+            amplitud = rng.uniform(2500, 6000)
+            paso = 2 * math.pi * f0 / sample_rate
+            for n in range(duracion):
+                envolvente = math.sin(math.pi * n / duracion)
+                fase = paso * n
+                voz = math.sin(fase) + math.sin(2 * fase) / 2 + math.sin(3 * fase) / 3
+                samples.append(int(amplitud * envolvente * voz + rng.gauss(0, 60)))
+            ruido(int(rng.uniform(0.03, 0.12) * sample_rate))
+        ruido(int(rng.uniform(0.4, 1.5) * sample_rate))
+
+    del samples[total:]
+    return samples.tobytes()
+
+
+def write_wav(path: str, pcm: bytes, sample_rate: int = SAMPLE_RATE) -> None:
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm)
+
+
+def image_path(directory: str, items: int, index: int) -> str:
+    return os.path.join(directory, "imagenes", f"recibo_{items:03d}i_{index:02d}.png")
+
+
+def pdf_path(directory: str, pages: int) -> str:
+    return os.path.join(directory, "pdf", f"recibos_{pages:03d}p.pdf")
+
+
+def audio_path(directory: str, seconds: int) -> str:
+    return os.path.join(directory, "audio", f"voz_{seconds:03d}s.wav")
+
+
+def load_manifest(directory: str) -> Optional[Dict]:
+    path = os.path.join(directory, "manifest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def generate(directory: str = FIXTURES_DIR, seed: int = DEFAULT_SEED, force: bool = False) -> Dict:
+    """
+    Genera (o reutiliza, si ya existen con la misma semilla) los archivos de
+    prueba y un manifest.json con los valores esperados de cada recibo.
+
+    Returns:
+        El manifiesto: semilla, versión y valores esperados por archivo
+    """
+    manifest = load_manifest(directory)
+    if (not force and manifest and manifest.get("semilla") == seed
+            and manifest.get("version") == FIXTURES_VERSION
+            and manifest.get("imagenes") == (Image is not None)):
+        return manifest
+
+    for sub in ("imagenes", "pdf", "audio"):
+        os.makedirs(os.path.join(directory, sub), exist_ok=True)
+
+    esperados = {}
+    if Image is not None:
+        for items in IMAGE_ITEMS:
+            rng = random.Random(f"{seed}-imagen-{items}")
+            for index in range(IMAGES_PER_SIZE):
+                lines, valores = receipt_lines(rng, items)
+                path = image_path(directory, items, index)
+                render_receipt(lines).save(path)
+                esperados[os.path.basename(path)] = valores
+
+        for pages in PDF_PAGES:
+            rng = random.Random(f"{seed}-pdf-{pages}")
+            imagenes = []
+            valores = {}
+            for _ in range(pages):
+                lines, valores = receipt_lines(rng, 20)
+                imagenes.append(render_receipt(lines))
+            path = pdf_path(directory, pages)
+            write_pdf(imagenes, path)
+            # Gana el último valor: los de la última página
+            esperados[os.path.basename(path)] = valores
+    else:
+        print("Pillow no está instalado: se omiten las imágenes y los PDF")
+
+    for seconds in AUDIO_SECONDS:
+        rng = random.Random(f"{seed}-audio-{seconds}")
+        write_wav(audio_path(directory, seconds), synth_speech(rng, seconds))
+
+    manifest = {"version": FIXTURES_VERSION, "semilla": seed,
+                "imagenes": Image is not None, "esperados": esperados}
+    with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera los datos sintéticos de los benchmarks")
+    parser.add_argument("directorio", nargs="?", default=FIXTURES_DIR)
+    parser.add_argument("--semilla", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--forzar", action="store_true", help="regenerar aunque ya existan")
+    args = parser.parse_args(argv)
+
+    manifest = generate(args.directorio, args.semilla, args.forzar)
+    print(f"Datos en {args.directorio} (semilla {manifest['semilla']}, "
+          f"{len(manifest['esperados'])} recibos renderizados)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Procesa imágenes, PDFs y audios WAV/FLAC por lotes sin interfaz gráfica y guarda
+los datos extraídos en el mismo almacén que la aplicación.
+
+Uso:
+    python cli.py facturas/ "recibos/*.jpg" notas/memo.wav --workers 4
+    python cli.py recibo_lento.jpg --perfil
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Tuple
+
+from tools import metrics, profiling
+from tools.pipeline import Document, extraction_pipeline, storage_sink
+from tools.storage import DATA_PATH
+
+EXTENSIONES = {
+    ".png": "imagen",
+    ".jpg": "imagen",
+    ".jpeg": "imagen",
+    ".bmp": "imagen",
+    ".pdf": "documento",
+    ".wav": "audio",
+    ".flac": "audio",
+}
+
+
+def collect_files(entradas: Iterable[str], recursivo: bool = False) -> List[Tuple[str, str]]:
+    """
+    Expande directorios y patrones glob en una lista de (ruta, fuente),
+    descartando extensiones no soportadas y duplicados.
+    """
+    rutas = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            if recursivo:
+                for raiz, _, nombres in os.walk(entrada):
+                    rutas.extend(os.path.join(raiz, n) for n in sorted(nombres))
+            else:
+                rutas.extend(os.path.join(entrada, n) for n in sorted(os.listdir(entrada)))
+        elif glob.has_magic(entrada):
+            rutas.extend(sorted(glob.glob(entrada, recursive=True)))
+        else:
+            rutas.append(entrada)
+
+    archivos = []
+    vistos = set()
+    for ruta in rutas:
+        fuente = EXTENSIONES.get(os.path.splitext(ruta)[1].lower())
+        if fuente is None or not os.path.isfile(ruta) or ruta in vistos:
+            continue
+        vistos.add(ruta)
+        archivos.append((ruta, fuente))
+    return archivos
+
+
+def _init_worker(verbose: bool) -> None:
+    # El paralelismo viene del pool de archivos: cada proceso usa un solo hilo
+    # de OpenMP (torch y tesseract) para no saturar los núcleos
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+    if not verbose:
+        sys.stdout = open(os.devnull, "w")
+
+
+def process_file(ruta: str, fuente: str, use_cache: bool = True) -> Dict:
+    """Extrae tokens y valores de un archivo con el pipeline de extracción."""
+    inicio = time.perf_counter()
+    final = None
+    error = None
+    perfil = profiling.profile(ruta, fuente)
+
+    try:
+        with perfil:
+            # Un solo hilo de Tesseract por PDF: el paralelismo viene del pool
+            for resultado in extraction_pipeline([Document(ruta, fuente)], use_cache, workers=1):
+                if not resultado.parcial:
+                    final = resultado
+        error = final.error
+    except Exception as e:
+        error = str(e)
+
+    segundos = time.perf_counter() - inicio
+    metrics.observe("archivo", segundos, fuente)
+    if error:
+        metrics.increment("errores", fuente)
+
+    return {
+        "ruta": ruta,
+        "fuente": fuente,
+        "tokens": final.total_tokens if final else 0,
+        "datos": final.datos if final else {},
+        "segundos": segundos,
+        "error": error,
+        "extraccion": final,
+        "perfil": perfil.directorio,
+        # Métricas del proceso del pool desde el archivo anterior
+        "metricas": metrics.drain(),
+    }
+
+
+def print_summary(resultados: List[Dict], total_s: float) -> None:
+    guardados = sum(1 for r in resultados if r["tokens"] and not r["error"])
+    print("\nResumen")
+    print(f"  Archivos procesados: {len(resultados)}")
+    print(f"  Con datos guardados: {guardados}")
+    print(f"  Sin texto o con error: {len(resultados) - guardados}")
+    print(f"  Tiempo total: {total_s:.2f} s ({len(resultados) / total_s:.2f} archivos/s)")
+
+    por_fuente: Dict[str, List[float]] = {}
+    for r in resultados:
+        por_fuente.setdefault(r["fuente"], []).append(r["segundos"])
+    for fuente, tiempos in sorted(por_fuente.items()):
+        print(f"  {fuente:<10} {len(tiempos):5d} archivos   media {sum(tiempos) / len(tiempos):6.2f} s/archivo")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("entradas", nargs="+", help="archivos, directorios o patrones glob")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="procesos en paralelo (por defecto todos los núcleos)")
+    parser.add_argument("--recursivo", action="store_true", help="recorrer subdirectorios")
+    parser.add_argument("--salida", default=DATA_PATH, help="archivo de datos donde guardar")
+    parser.add_argument("--sin-cache", action="store_true", help="no usar la caché OCR")
+    parser.add_argument("--sin-guardar", action="store_true", help="solo mostrar resultados")
+    parser.add_argument("--verbose", action="store_true", help="mostrar la salida de los extractores")
+    parser.add_argument("--perfil", action="store_true",
+                        help="perfilar cada archivo con cProfile y tracemalloc (ver PROFILE_DIR)")
+    args = parser.parse_args(argv)
+
+    archivos = collect_files(args.entradas, args.recursivo)
+    if not archivos:
+        print("No se encontraron archivos soportados (imágenes, PDF, WAV o FLAC)")
+        return 1
+
+    if args.perfil:
+        # Por variable de entorno: los procesos del pool la heredan
+        profiling.enable()
+
+    workers = min(args.workers or os.cpu_count() or 1, len(archivos))
+    print(f"Procesando {len(archivos)} archivos con {workers} procesos...")
+
+    resultados = []
+    guardar = storage_sink(args.salida)
+    inicio = time.perf_counter()
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(args.verbose,)) as pool:
+        futures = {pool.submit(process_file, ruta, fuente, not args.sin_cache): (ruta, fuente)
+                   for ruta, fuente in archivos}
+
+        for n, future in enumerate(as_completed(futures), 1):
+            try:
+                r = future.result()
+            except Exception as e:
+                # Por ejemplo, BrokenProcessPool si el sistema mató un proceso
+                # por falta de memoria: el archivo queda como error y el lote sigue
+                ruta, fuente = futures[future]
+                r = {"ruta": ruta, "fuente": fuente, "tokens": 0, "datos": {}, "segundos": 0.0,
+                     "error": str(e) or type(e).__name__, "extraccion": None, "perfil": None,
+                     "metricas": None}
+                metrics.increment("errores", fuente)
+            resultados.append(r)
+            metrics.merge(r.pop("metricas"))
+
+            estado = f"error: {r['error']}" if r["error"] else f"{len(r['datos'])} valores"
+            print(f"[{n}/{len(archivos)}] {r['fuente']:<10} {os.path.basename(r['ruta'])}: "
+                  f"{estado} ({r['segundos']:.2f}s)")
+            if r["perfil"]:
+                print(f"    perfil: {r['perfil']}")
+
+            if r["extraccion"] and not args.sin_guardar:
+                guardar(r["extraccion"])
+
+    print_summary(resultados, time.perf_counter() - inicio)
+    ruta_metricas = metrics.write_metrics()
+    if ruta_metricas:
+        print(f"  Métricas por etapa: {ruta_metricas}")
+    # Código distinto de cero si algún archivo falló, para scripts y cron
+    return 1 if any(r["error"] for r in resultados) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# Idiomas usados por EasyOCR para imágenes
+IMG_LANGUAGES = ['es', 'en']
+
+# Segundos sin uso antes de liberar el lector de EasyOCR (None = no liberar nunca)
+READER_IDLE_TIMEOUT = 300
+
+# Procesos para OCR de imágenes por lotes (None = todos los núcleos)
+IMG_BATCH_WORKERS = None
+
+# Imágenes enviadas a cada proceso por tarea
+IMG_BATCH_CHUNKSIZE = 1
+
+# Resolución y idiomas de Tesseract para documentos PDF
+DOC_DPI = 300
+DOC_LANGUAGES = 'eng'
+
+# Páginas rasterizadas a la vez; valores bajos mantienen la memoria constante
+DOC_PAGE_WINDOW = 1
+
+# Páginas procesadas con OCR en paralelo (None = todos los núcleos, 1 = secuencial).
+# Cada una es un mapa de bits en memoria (unos 25 MB por página A4 a 300 DPI),
+# así que el valor acota también la memoria usada por documento
+DOC_OCR_WORKERS = 4
+
+# Motor de Tesseract: "auto" usa tesserocr (motor persistente en el proceso) si
+# está instalado y pytesseract en caso contrario; también "tesserocr" o "pytesseract"
+DOC_OCR_BACKEND = "auto"
+
+# Leer la capa de texto embebida de los PDF digitales en lugar de hacer OCR
+DOC_TEXT_LAYER = True
+# Caracteres visibles mínimos para considerar que una página tiene texto embebido
+DOC_TEXT_MIN_CHARS = 20
+
+# Recorrer los PDF desde la última página y detenerse cuando todas las palabras
+# clave tengan valor (False = procesar siempre el documento completo)
+DOC_EARLY_EXIT = True
+
+# Caché en disco de resultados OCR
+OCR_CACHE_ENABLED = True
+OCR_CACHE_DIR = '.ocr_cache'
+OCR_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Almacén de extracciones: "jsonl" (registro de solo-anexado) o "sqlite"
+# (consultas indexadas por fuente, fecha y palabra clave)
+STORAGE_BACKEND = "jsonl"
+SQLITE_PATH = "data.db"
+
+# Visor de datos guardados: filas que se piden al almacén en cada página
+DATA_PAGE_SIZE = 200
+# Cada cuánto revisa la pestaña visible si hay extracciones nuevas (ms)
+DATA_REFRESH_MS = 1000
+
+# Pestañas cuyas dependencias se importan en segundo plano al abrir la ventana
+# ("imagen", "documento", "audio", "datos"). Vacío = cada pestaña se carga
+# solo al abrirla por primera vez
+PREWARM_TABS = []
+# Espera tras mostrar la ventana antes de precalentar (ms)
+PREWARM_DELAY_MS = 500
+
+# Transcripción de archivos de audio: segundos enviados al reconocedor por
+# bloque (bloques grandes = menos llamadas y decodificación más rápida)
+AUDIO_FILE_CHUNK_SECONDS = 2.0
+# Procesos para transcribir archivos por lotes (None = todos los núcleos)
+AUDIO_BATCH_WORKERS = None
+
+# Captura del micrófono: "callback" copia el audio a un buffer circular y el
+# reconocedor lo consume desde otro hilo (no se pierde audio si la
+# decodificación se atrasa); "blocking" lee y decodifica en el mismo hilo
+AUDIO_CAPTURE_MODE = "callback"
+# Segundos de audio que puede acumular el buffer antes de descartar
+AUDIO_RING_SECONDS = 10
+
+# Compuerta de voz (VAD) por energía delante de Vosk: los silencios no se
+# decodifican. Tramas de AUDIO_VAD_FRAME_MS; una trama es voz si su RMS supera
+# AUDIO_VAD_MIN_RMS y AUDIO_VAD_NOISE_FACTOR veces el ruido de fondo estimado.
+# Desactivada hasta validar el ahorro y la exactitud (y el piso
+# AUDIO_VAD_MIN_RMS, que depende del micrófono) con benchmarks/bench_vad.py
+# sobre grabaciones reales
+AUDIO_VAD_ENABLED = False
+AUDIO_VAD_FRAME_MS = 30
+AUDIO_VAD_MIN_RMS = 300
+AUDIO_VAD_NOISE_FACTOR = 3.0
+# Audio conservado antes y después de cada tramo de voz (ms)
+AUDIO_VAD_PRE_ROLL_MS = 300
+AUDIO_VAD_POST_ROLL_MS = 600
+
+# Métricas por etapa (tools/metrics.py): tiempos y contadores por tipo de fuente
+METRICS_ENABLED = True
+# Archivo exportado en formato de texto de Prometheus ("" = no exportar)
+METRICS_PATH = "metrics.prom"
+# Muestras recientes por etapa usadas para p50/p95/p99
+METRICS_WINDOW = 1024
+# Cada cuánto la aplicación reescribe el archivo de métricas (ms)
+METRICS_EXPORT_MS = 15000
+# Mostrar la pestaña "Diagnóstico" con la tabla de tiempos por etapa
+DIAGNOSTICS_PANEL = False
+
+# Perfilado bajo demanda (tools/profiling.py): cada archivo procesado se
+# ejecuta con cProfile y tracemalloc. También se activa con la variable de
+# entorno OPTIMAX_PROFILE=1 o con cli.py --perfil; apagado no tiene costo
+PROFILE_ENABLED = False
+# Directorio donde se crea una carpeta por ejecución perfilada
+PROFILE_DIR = "perfiles"
+# Funciones y líneas de memoria mostradas en el resumen
+PROFILE_TOP = 20
+# Marcos de pila guardados por asignación en la instantánea de memoria
+PROFILE_TRACE_FRAMES = 5
+
+# Pipeline de extracción (tools/pipeline.py): elementos en espera entre dos
+# etapas. Cuando la cola se llena la etapa anterior se detiene (contrapresión);
+# 0 ejecuta todas las etapas en el mismo hilo, sin solapamiento
+PIPELINE_QUEUE_SIZE = 2
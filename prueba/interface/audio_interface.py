@@ -1,113 +1,129 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QPushButton, QLabel, 
-                             QTextEdit, QMessageBox)
+                             QTextEdit, QMessageBox, QFileDialog)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 import json
 import os
-from vosk import Model, KaldiRecognizer
-import pyaudio
+import time
 
-from tools.data_extraction import extract_key_values
+from tools.audio.audio_extraction import MODEL_PATH, SAMPLE_RATE, warm_up
+from tools.data_extraction import StreamingKeyValueExtractor
 from config.keywords import keywords_list
+from tools import metrics, profiling
+from tools.pipeline import Document, Pipeline, extraction_pipeline, extractor, microphone, storage_sink
+from interface.extraction_worker import SinkThread
 
-MODEL_PATH = "tools/audio/vosk-model-small-es-0.42"
-SAMPLE_RATE = 16000
-CHUNK_SIZE = 4096
+class AudioTranscriptionThread(QThread):
+    """
+    Transcribe el micrófono con el pipeline de extracción: la fuente
+    microphone() entrega cada segmento reconocido al extractor, en este
+    hilo. Al terminar emite los tokens y el resultado final, que se guarda
+    con storage_sink si el usuario lo pide.
+    """
+    finished = pyqtSignal(list, object)
+    error = pyqtSignal(str)
+    segment_received = pyqtSignal(str)
+    # Valores extraídos hasta el momento; True si incluyen el resultado parcial
+    values_updated = pyqtSignal(dict, bool)
+    # Contadores de la captura (desbordamientos y subejecuciones del buffer) y
+    # audio omitido por la compuerta de voz
+    capture_stats = pyqtSignal(dict)
+
+    def __init__(self):
+        super().__init__()
+        self._is_running = True
+        self._ultimos_valores = None
+        # Solo para la vista previa del segmento en curso, que no es un
+        # elemento del pipeline: recibe los mismos segmentos que el extractor
+        self._vista_previa = StreamingKeyValueExtractor(keywords_list)
+        # El extractor tarda microsegundos por segmento: sin colas, el
+        # reconocedor, la vista previa y las señales quedan en este hilo
+        self._pipeline = Pipeline(
+            microphone(lambda: not self._is_running, self._parcial, self.capture_stats.emit),
+            extractor(keywords_list),
+            queue_size=0)
 
-KEYWORDS_FOR_EXTRACTION = ["sub", "impuesto", "total", "venta"]
+    def stop(self):
+        self._is_running = False
 
-grammar = KEYWORDS_FOR_EXTRACTION + [
-    "[unk]",
-    "cero", "uno", "dos", "tres", "cuatro", "cinco", "seis", "siete", "ocho", "nueve",
-    "punto", "coma"
-]
-grammar_json = json.dumps(grammar)
+    def _emitir_valores(self, valores, provisional):
+        if (valores, provisional) != self._ultimos_valores:
+            self._ultimos_valores = (valores, provisional)
+            self.values_updated.emit(valores, provisional)
 
-digit_map = {
-    "cero": "0", "uno": "1", "dos": "2", "tres": "3", "cuatro": "4",
-    "cinco": "5", "seis": "6", "siete": "7", "ocho": "8", "nueve": "9",
-    "punto": ".", "coma": "."
-}
+    def _parcial(self, tokens):
+        # Hipótesis del segmento en curso: los valores aparecen mientras se habla
+        self._emitir_valores(self._vista_previa.preview(tokens), bool(tokens))
 
-def format_transcription(result_text: str) -> str:
-    split_words = result_text.split()
-    formatted_text = ""
-    for word in split_words:
-        formatted_text += digit_map.get(word, f" {word} ") 
-    return formatted_text.strip()
+    def run(self):
+        if not os.path.exists(MODEL_PATH):
+            self.error.emit(f"Modelo Vosk no encontrado en {MODEL_PATH}")
+            return
 
-class AudioTranscriptionThread(QThread):
-    finished = pyqtSignal(list)
+        full_transcription = []
+        final = None
+        try:
+            for resultado in self._pipeline:
+                if not resultado.parcial:
+                    final = resultado
+                    continue
+                tokens = resultado.parte.tokens
+                if tokens:
+                    self.segment_received.emit(" ".join(tokens))
+                    full_transcription.extend(tokens)
+                    self._vista_previa.feed(tokens)
+                self._emitir_valores(resultado.datos, False)
+        except Exception as e:
+            self.error.emit(str(e))
+            return
+
+        self.finished.emit(full_transcription, final)
+
+class AudioFileThread(QThread):
+    """Transcribe un archivo WAV/FLAC sin esperar el tiempo real, con el pipeline de extracción."""
+    finished = pyqtSignal(list, object)
     error = pyqtSignal(str)
     segment_received = pyqtSignal(str)
+    values_updated = pyqtSignal(dict, bool)
 
-    def __init__(self):
+    def __init__(self, ruta):
         super().__init__()
+        self.ruta = ruta
         self._is_running = True
+        self._pipeline = extraction_pipeline([Document(ruta, "audio")])
 
     def stop(self):
         self._is_running = False
+        self._pipeline.stop()
 
     def run(self):
-        model_path = MODEL_PATH
-
-        if not os.path.exists(model_path):
-            self.error.emit(f"Modelo Vosk no encontrado en {model_path}")
+        if not os.path.exists(MODEL_PATH):
+            self.error.emit(f"Modelo Vosk no encontrado en {MODEL_PATH}")
             return
 
-        p = None
-        stream = None
         full_transcription = []
-
+        valores = {}
+        final = None
+        inicio = time.perf_counter()
         try:
-            model = Model(model_path)
-            recognizer = KaldiRecognizer(model, SAMPLE_RATE)
-            recognizer.SetGrammar(grammar_json)
-
-            p = pyaudio.PyAudio()
-            stream = p.open(format=pyaudio.paInt16,
-                            channels=1,
-                            rate=SAMPLE_RATE,
-                            input=True,
-                            frames_per_buffer=CHUNK_SIZE)
-
-            while self._is_running:
-                try:
-                    data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
-                    if not data:
-                        break
-
-                    if recognizer.AcceptWaveform(data):
-                        result = json.loads(recognizer.Result())
-                        result_text = result.get("text", "")
-
-                        if result_text:
-                            formatted_text = format_transcription(result_text)
-                            self.segment_received.emit(formatted_text)
-                            full_transcription.extend(formatted_text.lower().split())
-                except Exception:
-                    if not self._is_running:
-                        break
-
+            with profiling.profile(self.ruta, "audio"):
+                for resultado in self._pipeline:
+                    if not resultado.parcial:
+                        if resultado.error:
+                            raise RuntimeError(resultado.error)
+                        final = resultado
+                        continue
+                    tokens = resultado.parte.tokens
+                    self.segment_received.emit(" ".join(tokens))
+                    full_transcription.extend(tokens)
+                    if resultado.datos != valores:
+                        valores = resultado.datos
+                        self.values_updated.emit(valores, False)
         except Exception as e:
             self.error.emit(str(e))
             return
-        finally:
-            if 'recognizer' in locals():
-                try:
-                    final_result = json.loads(recognizer.FinalResult())
-                    if final_result.get("text"):
-                        formatted_cleanup = format_transcription(final_result['text'])
-                        full_transcription.extend(formatted_cleanup.lower().split())
-                except:
-                    pass
-
-            if stream and stream.is_active():
-                stream.stop_stream()
-                stream.close()
-            if p:
-                p.terminate()
-
-        self.finished.emit(full_transcription)
+
+        metrics.observe("transcripcion", time.perf_counter() - inicio, "audio")
+        self.finished.emit(full_transcription, final)
 
 class AudioInterface(QWidget):
     def __init__(self):
@@ -115,6 +131,10 @@ class AudioInterface(QWidget):
         self.init_ui()
         self.thread = None
 
+        # Cargar el modelo Vosk mientras se muestra la pestaña; se comparte
+        # entre todas las grabaciones del proceso
+        warm_up()
+
     def init_ui(self):
         layout = QVBoxLayout()
 
@@ -149,6 +169,21 @@ class AudioInterface(QWidget):
         """)
         layout.addWidget(self.label_estado)
 
+        # Valores extraídos mientras se habla (ver StreamingKeyValueExtractor)
+        self.label_valores = QLabel("Valores detectados: -")
+        self.label_valores.setAlignment(Qt.AlignCenter)
+        self.label_valores.setWordWrap(True)
+        self.label_valores.setStyleSheet("""
+            font-size: 14px; 
+            padding: 10px; 
+            color: #0D47A1;
+            background-color: #E3F2FD;
+            border: 1px solid #BDBDBD;
+            border-radius: 3px;
+            font-weight: bold;
+        """)
+        layout.addWidget(self.label_valores)
+
         self.btn_grabar = QPushButton("Iniciar Grabación")
         self.btn_grabar.setStyleSheet("""
             QPushButton {
@@ -170,6 +205,31 @@ class AudioInterface(QWidget):
         self.btn_grabar.clicked.connect(self.toggle_grabacion)
         layout.addWidget(self.btn_grabar)
 
+        self.btn_archivo = QPushButton("Transcribir Archivo de Audio")
+        self.btn_archivo.setStyleSheet("""
+            QPushButton {
+                background-color: #1976D2;
+                color: white;
+                padding: 12px;
+                border-radius: 5px;
+                font-size: 14px;
+                font-weight: bold;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #1565C0;
+            }
+            QPushButton:pressed {
+                background-color: #0D47A1;
+            }
+            QPushButton:disabled {
+                background-color: #BDBDBD;
+                color: #757575;
+            }
+        """)
+        self.btn_archivo.clicked.connect(self.transcribir_archivo)
+        layout.addWidget(self.btn_archivo)
+
         self.text_resultado = QTextEdit()
         self.text_resultado.setReadOnly(True)
         self.text_resultado.setPlaceholderText("La transcripción aparecerá aquí...")
@@ -216,7 +276,11 @@ class AudioInterface(QWidget):
         self.setLayout(layout)
 
         self.tokens_audio = []
+        # Extraction final de la última transcripción; se guarda al procesar
+        self.resultado_audio = None
+        self.hilo_guardado = None
         self.grabando = False
+        self.archivo_audio = None
 
     def toggle_grabacion(self):
         if not self.grabando:
@@ -226,6 +290,8 @@ class AudioInterface(QWidget):
 
     def iniciar_grabacion(self):
         self.grabando = True
+        self.archivo_audio = None
+        self.btn_archivo.setEnabled(False)
         self.label_estado.setText("GRABANDO... Hable ahora")
         self.label_estado.setStyleSheet("""
             font-size: 14px; 
@@ -255,12 +321,49 @@ class AudioInterface(QWidget):
             }
         """)
         self.text_resultado.clear()
+        self.on_values_updated({}, False)
         self.btn_procesar.setEnabled(False)
 
         self.thread = AudioTranscriptionThread()
+        self.thread.capture_stats.connect(self.on_capture_stats)
+        self.thread.finished.connect(self.on_transcription_finished)
+        self.thread.error.connect(self.on_transcription_error)
+        self.thread.segment_received.connect(self.on_segment_received)
+        self.thread.values_updated.connect(self.on_values_updated)
+        self.thread.start()
+
+    def transcribir_archivo(self):
+        archivo, _ = QFileDialog.getOpenFileName(
+            self,
+            "Seleccionar Archivo de Audio",
+            "",
+            "Audio (*.wav *.flac)"
+        )
+        if not archivo:
+            return
+
+        self.archivo_audio = os.path.basename(archivo)
+        self.label_estado.setText(f"Transcribiendo {self.archivo_audio}...")
+        self.label_estado.setStyleSheet("""
+            font-size: 14px; 
+            padding: 12px; 
+            color: #424242;
+            background-color: #FFF9C4;
+            border: 2px solid #FBC02D;
+            border-radius: 3px;
+            font-weight: bold;
+        """)
+        self.text_resultado.clear()
+        self.on_values_updated({}, False)
+        self.btn_procesar.setEnabled(False)
+        self.btn_grabar.setEnabled(False)
+        self.btn_archivo.setEnabled(False)
+
+        self.thread = AudioFileThread(archivo)
         self.thread.finished.connect(self.on_transcription_finished)
         self.thread.error.connect(self.on_transcription_error)
         self.thread.segment_received.connect(self.on_segment_received)
+        self.thread.values_updated.connect(self.on_values_updated)
         self.thread.start()
 
     def detener_grabacion(self):
@@ -278,13 +381,50 @@ class AudioInterface(QWidget):
             """)
             self.btn_grabar.setEnabled(False)
 
+    def on_values_updated(self, valores, provisional):
+        if valores:
+            texto = "   ".join(f"{clave}: {valor:g}" for clave, valor in valores.items())
+        else:
+            texto = "-"
+        self.label_valores.setText(f"Valores detectados: {texto}")
+        # En gris mientras dependen del segmento que aún se está reconociendo
+        color = "#757575" if provisional else "#0D47A1"
+        self.label_valores.setStyleSheet(f"""
+            font-size: 14px; 
+            padding: 10px; 
+            color: {color};
+            background-color: #E3F2FD;
+            border: 1px solid #BDBDBD;
+            border-radius: 3px;
+            font-weight: bold;
+        """)
+
+    def on_capture_stats(self, stats):
+        if "desbordamientos" in stats:
+            perdidos = stats["bytes_descartados"] / 2 / SAMPLE_RATE
+            self.text_resultado.append(
+                f"Captura: {stats['desbordamientos']} desbordamientos "
+                f"({perdidos:.2f}s de audio descartado), "
+                f"{stats['desbordamientos_entrada']} desbordamientos de entrada, "
+                f"{stats['subejecuciones']} subejecuciones"
+            )
+        if "omitido_s" in stats:
+            self.text_resultado.append(
+                f"Silencio omitido: {stats['omitido_s']:.1f}s de {stats['audio_s']:.1f}s "
+                f"({stats['omitido_pct']:.0f}%), {stats['segmentos']} tramos de voz"
+            )
+
     def on_segment_received(self, segment):
         self.text_resultado.append(f"Segmento: {segment}")
 
-    def on_transcription_finished(self, tokens):
+    def on_transcription_finished(self, tokens, resultado):
         self.grabando = False
         self.tokens_audio = tokens
-        self.label_estado.setText("Grabación finalizada correctamente")
+        self.resultado_audio = resultado
+        if self.archivo_audio:
+            self.label_estado.setText(f"Transcripción de {self.archivo_audio} finalizada")
+        else:
+            self.label_estado.setText("Grabación finalizada correctamente")
         self.label_estado.setStyleSheet("""
             font-size: 14px; 
             padding: 12px; 
@@ -313,6 +453,7 @@ class AudioInterface(QWidget):
             }
         """)
         self.btn_grabar.setEnabled(True)
+        self.btn_archivo.setEnabled(True)
 
         self.text_resultado.append(f"\nTotal de tokens transcritos: {len(tokens)}\n")
 
@@ -321,7 +462,7 @@ class AudioInterface(QWidget):
 
     def on_transcription_error(self, error):
         self.grabando = False
-        self.label_estado.setText("Error en la grabación")
+        self.label_estado.setText("Error en la transcripción" if self.archivo_audio else "Error en la grabación")
         self.label_estado.setStyleSheet("""
             font-size: 14px; 
             padding: 12px; 
@@ -350,49 +491,36 @@ class AudioInterface(QWidget):
             }
         """)
         self.btn_grabar.setEnabled(True)
+        self.btn_archivo.setEnabled(True)
         QMessageBox.critical(self, "Error", f"Error al transcribir audio: {error}")
 
     def procesar_audio(self):
-        if not self.tokens_audio:
+        if not self.tokens_audio or self.resultado_audio is None:
             return
 
-        try:
-            datos_extraidos = extract_key_values(self.tokens_audio, keywords_list)
-
-            self.text_resultado.append("\nDatos extraídos:\n")
-            self.text_resultado.append(json.dumps(datos_extraidos, indent=4, ensure_ascii=False))
-            self.text_resultado.append("\n")
+        # Los valores ya los extrajo el pipeline durante la transcripción
+        self.text_resultado.append("\nDatos extraídos:\n")
+        self.text_resultado.append(json.dumps(self.resultado_audio.datos, indent=4, ensure_ascii=False))
+        self.text_resultado.append("\n")
 
-            self.guardar_datos(datos_extraidos, "audio")
-
-            QMessageBox.information(self, "Éxito", "Datos procesados y guardados correctamente")
-            self.btn_procesar.setEnabled(False)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al procesar audio: {str(e)}")
-
-    def guardar_datos(self, datos, fuente):
-        try:
-            if os.path.exists("data.json"):
-                with open("data.json", "r", encoding="utf-8") as f:
-                    data_actual = json.load(f)
-            else:
-                data_actual = {}
-
-            if "extracciones" not in data_actual:
-                data_actual["extracciones"] = []
-
-            import datetime
-            entrada = {
-                "fuente": fuente,
-                "fecha": datetime.datetime.now().isoformat(),
-                "datos": datos
-            }
-
-            data_actual["extracciones"].append(entrada)
-
-            with open("data.json", "w", encoding="utf-8") as f:
-                json.dump(data_actual, f, indent=2, ensure_ascii=False)
-
-        except Exception as e:
-            print(f"Error al guardar datos: {e}")
+        # El guardado corre fuera del hilo de la interfaz, con el mismo destino
+        # que las imágenes, los documentos y cli.py
+        self.btn_procesar.setEnabled(False)
+        self.hilo_guardado = SinkThread(storage_sink(), self.resultado_audio)
+        self.hilo_guardado.done.connect(self.on_audio_saved)
+        self.hilo_guardado.error.connect(self.on_audio_save_failed)
+        self.hilo_guardado.finished.connect(self.on_save_thread_finished)
+        self.hilo_guardado.start()
+
+    def on_audio_saved(self):
+        QMessageBox.information(self, "Éxito", "Datos procesados y guardados correctamente")
+
+    def on_audio_save_failed(self, error):
+        self.btn_procesar.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Error al procesar audio: {error}")
+
+    def on_save_thread_finished(self):
+        # finished llega antes de que el hilo salga del todo: esperarlo antes
+        # de soltar la referencia
+        self.hilo_guardado.wait()
+        self.hilo_guardado = None
@@ -1,8 +1,11 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QPushButton, QLabel, 
-                             QTextEdit, QMessageBox, QHBoxLayout)
-from PyQt5.QtCore import Qt
-import json
-import os
+                             QTableView, QMessageBox, QHBoxLayout, QComboBox,
+                             QLineEdit, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import Qt, QTimer
+
+from tools import storage
+from interface.extraction_table import ExtractionTableModel
+from config.settings import DATA_REFRESH_MS
 
 class DataInterface(QWidget):
     def __init__(self):
@@ -89,86 +92,152 @@ class DataInterface(QWidget):
         """)
         layout.addWidget(self.label_info)
 
-        self.text_datos = QTextEdit()
-        self.text_datos.setReadOnly(True)
-        self.text_datos.setPlaceholderText("Los datos del archivo data.json aparecerán aquí...")
-        self.text_datos.setStyleSheet("""
-            QTextEdit {
+        filtros_layout = QHBoxLayout()
+
+        self.combo_fuente = QComboBox()
+        self.combo_fuente.addItem("Todas las fuentes", None)
+        for fuente in ("imagen", "documento", "audio"):
+            self.combo_fuente.addItem(fuente.capitalize(), fuente)
+        self.combo_fuente.currentIndexChanged.connect(self.aplicar_filtros)
+        filtros_layout.addWidget(self.combo_fuente)
+
+        self.input_clave = QLineEdit()
+        self.input_clave.setPlaceholderText("Palabra clave (ej. total)")
+        self.input_clave.editingFinished.connect(self.aplicar_filtros)
+        filtros_layout.addWidget(self.input_clave)
+
+        filtros_estilo = """
+            background-color: white;
+            color: #212121;
+            border: 2px solid #BDBDBD;
+            border-radius: 3px;
+            padding: 6px;
+            font-size: 13px;
+        """
+        self.combo_fuente.setStyleSheet(filtros_estilo)
+        self.input_clave.setStyleSheet(filtros_estilo)
+        layout.addLayout(filtros_layout)
+
+        self.modelo = ExtractionTableModel(parent=self)
+        self.modelo.total_changed.connect(self.mostrar_total)
+        self.modelo.load_failed.connect(self.mostrar_error)
+
+        self.tabla_datos = QTableView()
+        self.tabla_datos.setModel(self.modelo)
+        self.tabla_datos.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabla_datos.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabla_datos.setAlternatingRowColors(True)
+        self.tabla_datos.verticalHeader().setVisible(False)
+        # Altura de fila fija: la vista no mide cada fila al desplazarse
+        self.tabla_datos.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.tabla_datos.verticalHeader().setDefaultSectionSize(24)
+
+        encabezado = self.tabla_datos.horizontalHeader()
+        encabezado.setStretchLastSection(True)
+        # Ordenar al pulsar el encabezado sin el ordenamiento inmediato que
+        # haría setSortingEnabled; el modelo ordena en el almacén
+        encabezado.setSectionsClickable(True)
+        encabezado.setSortIndicatorShown(True)
+        encabezado.setSortIndicator(0, Qt.DescendingOrder)
+        encabezado.sortIndicatorChanged.connect(self.modelo.sort)
+
+        self.tabla_datos.setStyleSheet("""
+            QTableView {
                 background-color: white;
+                alternate-background-color: #F5F5F5;
                 color: #212121;
                 border: 2px solid #BDBDBD;
                 border-radius: 5px;
-                padding: 10px;
                 font-family: 'Courier New', monospace;
                 font-size: 12px;
             }
+            QHeaderView::section {
+                background-color: #E3F2FD;
+                color: #0D47A1;
+                padding: 6px;
+                border: none;
+                font-weight: bold;
+            }
         """)
-        layout.addWidget(self.text_datos)
+        layout.addWidget(self.tabla_datos, 1)
 
-        layout.addStretch()
         self.setLayout(layout)
 
-        self.cargar_datos()
+        # Mientras la pestaña está visible se agregan las extracciones que
+        # guarden otras pestañas o el modo por lotes
+        self.timer_refresco = QTimer(self)
+        self.timer_refresco.setInterval(DATA_REFRESH_MS)
+        self.timer_refresco.timeout.connect(self.cargar_datos)
+
+        # La consulta corre en segundo plano; mostrar_total actualiza la etiqueta
+        self.label_info.setText("Cargando datos...")
+        self.modelo.reload()
 
     def cargar_datos(self):
-        try:
-            if not os.path.exists("data.json"):
-                self.label_info.setText("El archivo data.json no existe aún")
-                self.label_info.setStyleSheet("""
-                    font-size: 13px; 
-                    padding: 12px; 
-                    color: #E65100;
-                    background-color: #FFE0B2;
-                    border: 2px solid #FF9800;
-                    border-radius: 3px;
-                    font-weight: bold;
-                """)
-                self.text_datos.clear()
-                self.text_datos.setPlaceholderText("No hay datos guardados. Procese alguna fuente de datos primero.")
-                return
+        # Solo lee lo agregado desde la última carga; si nada cambió no hace nada
+        self.modelo.refresh()
 
-            with open("data.json", "r", encoding="utf-8") as f:
-                datos = json.load(f)
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.cargar_datos()
+        self.timer_refresco.start()
 
-            if "extracciones" in datos and len(datos["extracciones"]) > 0:
-                num_extracciones = len(datos["extracciones"])
-                self.label_info.setText(f"Total de extracciones: {num_extracciones}")
-                self.label_info.setStyleSheet("""
-                    font-size: 13px; 
-                    padding: 12px; 
-                    color: #1B5E20;
-                    background-color: #C8E6C9;
-                    border: 2px solid #4CAF50;
-                    border-radius: 3px;
-                    font-weight: bold;
-                """)
-            else:
-                self.label_info.setText("No hay extracciones registradas")
-                self.label_info.setStyleSheet("""
-                    font-size: 13px; 
-                    padding: 12px; 
-                    color: #424242;
-                    background-color: white;
-                    border: 2px solid #BDBDBD;
-                    border-radius: 3px;
-                    font-weight: bold;
-                """)
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer_refresco.stop()
 
-            self.text_datos.clear()
-            self.text_datos.setPlainText(json.dumps(datos, indent=2, ensure_ascii=False))
+    def aplicar_filtros(self):
+        clave = self.input_clave.text().strip().lower() or None
+        self.label_info.setText("Cargando datos...")
+        self.modelo.set_filtros(fuente=self.combo_fuente.currentData(), clave=clave)
 
-        except Exception as e:
-            self.label_info.setText("Error al cargar datos")
+    def mostrar_total(self, total):
+        if total > 0:
+            self.label_info.setText(f"Total de extracciones: {total}")
             self.label_info.setStyleSheet("""
                 font-size: 13px; 
                 padding: 12px; 
-                color: #FFFFFF;
-                background-color: #C62828;
-                border: 2px solid #B71C1C;
+                color: #1B5E20;
+                background-color: #C8E6C9;
+                border: 2px solid #4CAF50;
+                border-radius: 3px;
+                font-weight: bold;
+            """)
+        elif self.combo_fuente.currentData() or self.input_clave.text().strip():
+            self.label_info.setText("No hay extracciones con esos filtros")
+            self.label_info.setStyleSheet("""
+                font-size: 13px; 
+                padding: 12px; 
+                color: #424242;
+                background-color: white;
+                border: 2px solid #BDBDBD;
+                border-radius: 3px;
+                font-weight: bold;
+            """)
+        else:
+            self.label_info.setText("No hay datos guardados aún")
+            self.label_info.setStyleSheet("""
+                font-size: 13px; 
+                padding: 12px; 
+                color: #E65100;
+                background-color: #FFE0B2;
+                border: 2px solid #FF9800;
                 border-radius: 3px;
                 font-weight: bold;
             """)
-            QMessageBox.critical(self, "Error", f"Error al cargar datos: {str(e)}")
+
+    def mostrar_error(self, mensaje):
+        self.label_info.setText("Error al cargar datos")
+        self.label_info.setStyleSheet("""
+            font-size: 13px; 
+            padding: 12px; 
+            color: #FFFFFF;
+            background-color: #C62828;
+            border: 2px solid #B71C1C;
+            border-radius: 3px;
+            font-weight: bold;
+        """)
+        QMessageBox.critical(self, "Error", f"Error al cargar datos: {mensaje}")
 
     def limpiar_datos(self):
         reply = QMessageBox.question(
@@ -181,10 +250,9 @@ class DataInterface(QWidget):
 
         if reply == QMessageBox.Yes:
             try:
-                if os.path.exists("data.json"):
-                    os.remove("data.json")
+                storage.clear()
 
-                self.text_datos.clear()
+                self.modelo.reload()
                 self.label_info.setText("Datos eliminados correctamente")
                 self.label_info.setStyleSheet("""
                     font-size: 13px; 
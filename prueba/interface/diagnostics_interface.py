@@ -0,0 +1,171 @@
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QPushButton, QLabel, QHBoxLayout,
+                             QTableWidget, QTableWidgetItem, QHeaderView,
+                             QAbstractItemView, QMessageBox)
+from PyQt5.QtCore import Qt, QTimer
+
+from tools import metrics
+from config.settings import DATA_REFRESH_MS
+
+COLUMNAS = ["Etapa", "Fuente", "Cantidad", "Total (s)", "p50 (ms)", "p95 (ms)", "p99 (ms)"]
+
+class DiagnosticsInterface(QWidget):
+    """Tiempos por etapa y contadores de tools.metrics (se activa con DIAGNOSTICS_PANEL)."""
+
+    def __init__(self):
+        super().__init__()
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        self.setStyleSheet("""
+            QWidget {
+                background-color: #515151;
+            }
+        """)
+
+        titulo = QLabel("Diagnóstico")
+        titulo.setStyleSheet("""
+            font-size: 20px;
+            font-weight: bold;
+            color: #0D47A1;
+            padding: 15px;
+            background-color: #E3F2FD;
+            border-radius: 5px;
+        """)
+        titulo.setAlignment(Qt.AlignCenter)
+        layout.addWidget(titulo)
+
+        btn_layout = QHBoxLayout()
+
+        self.btn_exportar = QPushButton("Exportar Métricas")
+        self.btn_exportar.setStyleSheet("""
+            QPushButton {
+                background-color: #1976D2;
+                color: white;
+                padding: 12px;
+                border-radius: 5px;
+                font-size: 14px;
+                font-weight: bold;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #1565C0;
+            }
+            QPushButton:pressed {
+                background-color: #0D47A1;
+            }
+        """)
+        self.btn_exportar.clicked.connect(self.exportar)
+        btn_layout.addWidget(self.btn_exportar)
+
+        self.btn_reiniciar = QPushButton("Reiniciar")
+        self.btn_reiniciar.setStyleSheet("""
+            QPushButton {
+                background-color: #D32F2F;
+                color: white;
+                padding: 12px;
+                border-radius: 5px;
+                font-size: 14px;
+                font-weight: bold;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #C62828;
+            }
+            QPushButton:pressed {
+                background-color: #B71C1C;
+            }
+        """)
+        self.btn_reiniciar.clicked.connect(self.reiniciar)
+        btn_layout.addWidget(self.btn_reiniciar)
+
+        layout.addLayout(btn_layout)
+
+        self.tabla = QTableWidget(0, len(COLUMNAS))
+        self.tabla.setHorizontalHeaderLabels(COLUMNAS)
+        self.tabla.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabla.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabla.verticalHeader().setVisible(False)
+        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.tabla.setStyleSheet("""
+            QTableWidget {
+                background-color: white;
+                color: #212121;
+                border: 2px solid #BDBDBD;
+                border-radius: 5px;
+                font-family: 'Courier New', monospace;
+                font-size: 12px;
+            }
+            QHeaderView::section {
+                background-color: #E3F2FD;
+                color: #0D47A1;
+                padding: 6px;
+                border: none;
+                font-weight: bold;
+            }
+        """)
+        layout.addWidget(self.tabla, 1)
+
+        self.label_contadores = QLabel("Sin eventos registrados")
+        self.label_contadores.setWordWrap(True)
+        self.label_contadores.setStyleSheet("""
+            font-size: 12px;
+            padding: 10px;
+            color: #424242;
+            background-color: white;
+            border: 1px solid #BDBDBD;
+            border-radius: 3px;
+        """)
+        layout.addWidget(self.label_contadores)
+
+        self.setLayout(layout)
+
+        self.timer_refresco = QTimer(self)
+        self.timer_refresco.setInterval(DATA_REFRESH_MS)
+        self.timer_refresco.timeout.connect(self.actualizar)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.actualizar()
+        self.timer_refresco.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer_refresco.stop()
+
+    def actualizar(self):
+        filas = metrics.snapshot()
+        self.tabla.setRowCount(len(filas))
+        for i, fila in enumerate(filas):
+            valores = [fila["etapa"], fila["fuente"], str(fila["cantidad"]),
+                       f"{fila['total_s']:.2f}", f"{fila['p50'] * 1000:.1f}",
+                       f"{fila['p95'] * 1000:.1f}", f"{fila['p99'] * 1000:.1f}"]
+            for j, valor in enumerate(valores):
+                item = QTableWidgetItem(valor)
+                if j >= 2:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.tabla.setItem(i, j, item)
+
+        contadores = metrics.counters()
+        if contadores:
+            self.label_contadores.setText("   ".join(
+                f"{evento} ({fuente}): {valor:g}" for (evento, fuente), valor in sorted(contadores.items())))
+        else:
+            self.label_contadores.setText("Sin eventos registrados")
+
+    def exportar(self):
+        try:
+            ruta = metrics.write_metrics()
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Error al exportar métricas: {str(e)}")
+            return
+
+        if ruta:
+            QMessageBox.information(self, "Éxito", f"Métricas exportadas en {ruta}")
+        else:
+            QMessageBox.warning(self, "Advertencia", "La exportación de métricas está desactivada")
+
+    def reiniciar(self):
+        metrics.reset()
+        self.actualizar()
@@ -0,0 +1,247 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QThread, pyqtSignal
+import json
+
+from tools import metrics, storage
+from config.settings import DATA_PAGE_SIZE
+
+# (campo de la entrada, encabezado); None = columna calculada, no ordenable
+COLUMNAS = [
+    ("fecha", "Fecha"),
+    ("fuente", "Fuente"),
+    ("archivo", "Archivo"),
+    (None, "Datos"),
+]
+
+class PageLoaderThread(QThread):
+    """
+    Pide una página al almacén fuera del hilo de la interfaz. Sin cursor,
+    toma uno nuevo y cuenta el total: todas las páginas siguientes se leen
+    contra ese mismo estado del almacén.
+    """
+    loaded = pyqtSignal(int, int, int, list, object)
+    error = pyqtSignal(int, str)
+
+    def __init__(self, generacion, offset, limit, consulta, cursor=None):
+        super().__init__()
+        self.generacion = generacion
+        self.offset = offset
+        self.limit = limit
+        self.consulta = consulta
+        self.cursor = cursor
+
+    def run(self):
+        try:
+            with metrics.timer("consulta_pagina", "datos"):
+                total = -1
+                cursor = self.cursor
+                if cursor is None:
+                    cursor = storage.snapshot()
+                    filtros = {k: v for k, v in self.consulta.items() if k not in ("orden", "descendente")}
+                    total = storage.count(corte=cursor, **filtros)
+                filas = storage.query_entries(limit=self.limit, offset=self.offset,
+                                              corte=cursor, **self.consulta)
+            self.loaded.emit(self.generacion, self.offset, total, filas, cursor)
+        except Exception as e:
+            self.error.emit(self.generacion, str(e))
+
+class ChangeReaderThread(QThread):
+    """Lee del almacén solo las extracciones agregadas desde el cursor."""
+    changed = pyqtSignal(int, object, object)
+    error = pyqtSignal(int, str)
+
+    def __init__(self, generacion, cursor):
+        super().__init__()
+        self.generacion = generacion
+        self.cursor = cursor
+
+    def run(self):
+        try:
+            with metrics.timer("consulta_cambios", "datos"):
+                nuevas, cursor = storage.read_since(self.cursor)
+            self.changed.emit(self.generacion, nuevas, cursor)
+        except Exception as e:
+            self.error.emit(self.generacion, str(e))
+
+class ExtractionTableModel(QAbstractTableModel):
+    """
+    Modelo de tabla sobre el almacén de extracciones. Solo mantiene en memoria
+    las páginas ya mostradas: la vista pide más filas con fetchMore al
+    desplazarse, y el orden y los filtros se resuelven en el almacén.
+
+    refresh() compara el cursor del almacén con el de la última lectura y,
+    si cambió, inserta solo las extracciones nuevas en su posición.
+    """
+    total_changed = pyqtSignal(int)
+    load_failed = pyqtSignal(str)
+
+    def __init__(self, page_size=DATA_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.page_size = page_size
+        self._filas = []
+        self._total = 0
+        self._filtros = {}
+        self._orden = "fecha"
+        self._descendente = True
+        # Estado del almacén que reflejan las filas cargadas
+        self._cursor = None
+        # Cada recarga invalida las páginas que aún estén en camino
+        self._generacion = 0
+        # Una sola lectura en curso: las páginas y los cambios usan offsets
+        # sobre las mismas filas
+        self._cargando = False
+        self._hilos = set()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._filas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNAS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entrada = self._filas[index.row()]
+        campo = COLUMNAS[index.column()][0]
+
+        if role == Qt.DisplayRole:
+            if campo is None:
+                return ", ".join(f"{k}: {v:g}" for k, v in entrada.get("datos", {}).items())
+            return entrada.get(campo, "")
+        if role == Qt.ToolTipRole and campo is None:
+            return json.dumps(entrada, indent=2, ensure_ascii=False)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNAS[section][1]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._cargando and len(self._filas) < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._cargar_pagina(len(self._filas))
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        campo = COLUMNAS[column][0]
+        if campo is None:
+            return
+        self._orden = campo
+        self._descendente = order == Qt.DescendingOrder
+        self.reload()
+
+    def set_filtros(self, **filtros):
+        """Filtros de storage.query_entries; los valores None se ignoran."""
+        filtros = {k: v for k, v in filtros.items() if v is not None}
+        if filtros == self._filtros:
+            return
+        self._filtros = filtros
+        self.reload()
+
+    def reload(self):
+        """Descarta las filas cargadas y pide el total y la primera página."""
+        self.beginResetModel()
+        self._filas = []
+        self._total = 0
+        self._cursor = None
+        self._generacion += 1
+        self.endResetModel()
+        self._cargar_pagina(0)
+
+    def refresh(self):
+        """
+        Agrega las extracciones guardadas desde la última lectura. Si el
+        almacén no cambió no hace nada más que comparar cursores.
+        """
+        if self._cargando or self._cursor is None:
+            return
+        if storage.snapshot() == self._cursor:
+            return
+        hilo = ChangeReaderThread(self._generacion, self._cursor)
+        hilo.changed.connect(self._cambios_leidos)
+        self._iniciar(hilo)
+
+    def _cargar_pagina(self, offset):
+        consulta = dict(self._filtros, orden=self._orden, descendente=self._descendente)
+        hilo = PageLoaderThread(self._generacion, offset, self.page_size, consulta, self._cursor)
+        hilo.loaded.connect(self._pagina_cargada)
+        self._iniciar(hilo)
+
+    def _iniciar(self, hilo):
+        hilo.error.connect(self._lectura_fallida)
+        # Conservar la referencia hasta que termine para que no se destruya en ejecución
+        hilo.finished.connect(lambda h=hilo: self._soltar(h))
+        self._hilos.add(hilo)
+        self._cargando = True
+        hilo.start()
+
+    def _soltar(self, hilo):
+        # finished se emite antes de que el hilo salga del todo: esperarlo
+        # antes de soltar la última referencia, como ExtractionQueue
+        hilo.wait()
+        self._hilos.discard(hilo)
+
+    def _pagina_cargada(self, generacion, offset, total, filas, cursor):
+        if generacion != self._generacion:
+            return
+        self._cargando = False
+        self._cursor = cursor
+        if total >= 0:
+            self._total = total
+            self.total_changed.emit(total)
+        if offset != len(self._filas) or not filas:
+            return
+
+        with metrics.timer("ui_pagina", "datos"):
+            self.beginInsertRows(QModelIndex(), offset, offset + len(filas) - 1)
+            self._filas.extend(filas)
+            self.endInsertRows()
+
+    def _cambios_leidos(self, generacion, nuevas, cursor):
+        if generacion != self._generacion:
+            return
+        self._cargando = False
+        if nuevas is None:
+            # El almacén se vació o se reescribió
+            self.reload()
+            return
+
+        self._cursor = cursor
+        agregadas = 0
+        with metrics.timer("ui_refresco", "datos"):
+            for entrada in nuevas:
+                if not storage.entry_matches(entrada, **self._filtros):
+                    continue
+                agregadas += 1
+                fila = self._posicion(entrada)
+                # Las filas cargadas son siempre un prefijo del resultado ordenado:
+                # una entrada que cae después de ellas llegará con fetchMore
+                if fila < len(self._filas) or len(self._filas) == self._total:
+                    self.beginInsertRows(QModelIndex(), fila, fila)
+                    self._filas.insert(fila, entrada)
+                    self.endInsertRows()
+                self._total += 1
+
+        if agregadas:
+            self.total_changed.emit(self._total)
+
+    def _posicion(self, entrada):
+        # Búsqueda binaria con el mismo orden que el almacén; ante claves
+        # iguales la entrada más nueva va al final (o al inicio si es descendente)
+        clave = entrada.get(self._orden) or ""
+        inicio, fin = 0, len(self._filas)
+        while inicio < fin:
+            medio = (inicio + fin) // 2
+            otra = self._filas[medio].get(self._orden) or ""
+            if (otra <= clave) if not self._descendente else (otra > clave):
+                inicio = medio + 1
+            else:
+                fin = medio
+        return inicio
+
+    def _lectura_fallida(self, generacion, mensaje):
+        if generacion != self._generacion:
+            return
+        self._cargando = False
+        self.load_failed.emit(mensaje)
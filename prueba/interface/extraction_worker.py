@@ -0,0 +1,178 @@
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from collections import deque
+
+from tools import metrics, profiling
+from tools.pipeline import Document, extraction_pipeline, storage_sink
+from config.settings import DOC_EARLY_EXIT, DOC_OCR_WORKERS
+
+class ExtractionThread(QThread):
+    """
+    Procesa un archivo (imagen o PDF) fuera del hilo de la interfaz con el
+    pipeline de extracción y guarda el resultado con storage_sink en este
+    mismo hilo. Emite la etapa actual y, en los PDF, cada página terminada;
+    completed indica además si se guardó. stop() pide cancelar: los PDF se
+    detienen en la siguiente página y las imágenes al terminar el OCR en
+    curso; en ambos casos no se entregan ni se guardan datos.
+    """
+    progress = pyqtSignal(str)
+    page_done = pyqtSignal(object)
+    completed = pyqtSignal(dict, int, bool)
+    cancelled = pyqtSignal()
+    error = pyqtSignal(str)
+    save_failed = pyqtSignal(str)
+
+    def __init__(self, ruta, fuente):
+        super().__init__()
+        self.ruta = ruta
+        self.fuente = fuente
+        self._is_running = True
+        # cProfile solo ve el hilo que perfila: con el perfilado activo las
+        # páginas de un PDF se procesan en este hilo, no en un pool
+        workers = 1 if profiling.is_enabled() else DOC_OCR_WORKERS
+        self._pipeline = extraction_pipeline([Document(ruta, fuente)], workers=workers,
+                                             early_exit=DOC_EARLY_EXIT)
+        self._guardar = storage_sink()
+
+    def stop(self):
+        self._is_running = False
+        self._pipeline.stop()
+
+    def run(self):
+        try:
+            with metrics.timer("archivo", self.fuente), profiling.profile(self.ruta, self.fuente):
+                final = self._procesar()
+        except Exception as e:
+            metrics.increment("errores", self.fuente)
+            self.error.emit(str(e))
+            return
+
+        if not self._is_running:
+            self.cancelled.emit()
+            return
+        if final is None:
+            self.completed.emit({}, 0, False)
+            return
+
+        guardado = False
+        if final.total_tokens:
+            try:
+                self._guardar(final)
+                guardado = True
+            except Exception as e:
+                self.save_failed.emit(str(e))
+        self.completed.emit(final.datos, final.total_tokens, guardado)
+
+    def _procesar(self):
+        if self.fuente == "imagen":
+            self.progress.emit("Extrayendo texto de la imagen...")
+        else:
+            self.progress.emit("Extrayendo texto del documento PDF...")
+
+        final = None
+        for resultado in self._pipeline:
+            if not resultado.parcial:
+                final = resultado
+            elif self.fuente == "documento":
+                self.page_done.emit(resultado.parte)
+            elif resultado.total_tokens:
+                self.progress.emit(f"Tokens extraídos: {resultado.total_tokens}. Buscando valores...")
+
+        if final is None or not self._is_running:
+            return None
+        if final.error:
+            raise RuntimeError(final.error)
+        return final
+
+class ExtractionQueue(QObject):
+    """
+    Cola de archivos de un mismo tipo que se procesan de a uno con
+    ExtractionThread. Se pueden agregar archivos mientras otro se procesa.
+    """
+    job_started = pyqtSignal(str)
+    job_progress = pyqtSignal(str)
+    page_done = pyqtSignal(object)
+    job_completed = pyqtSignal(str, dict, int, bool)
+    job_cancelled = pyqtSignal(str)
+    job_failed = pyqtSignal(str, str)
+    job_save_failed = pyqtSignal(str, str)
+    pending_changed = pyqtSignal(int)
+    idle = pyqtSignal()
+
+    def __init__(self, fuente, parent=None):
+        super().__init__(parent)
+        self.fuente = fuente
+        self._pendientes = deque()
+        self._thread = None
+
+    def add(self, rutas):
+        self._pendientes.extend(rutas)
+        self.pending_changed.emit(len(self._pendientes))
+        if self._thread is None:
+            self._siguiente()
+
+    def is_busy(self):
+        return self._thread is not None
+
+    def pending(self):
+        return len(self._pendientes)
+
+    def cancel_current(self):
+        if self._thread is not None:
+            self._thread.stop()
+
+    def cancel_all(self):
+        self._pendientes.clear()
+        self.pending_changed.emit(0)
+        self.cancel_current()
+
+    def _siguiente(self):
+        anterior, self._thread = self._thread, None
+        if anterior is not None:
+            # finished se emite desde el hilo antes de que termine del todo:
+            # soltar la última referencia mientras sigue corriendo destruye un
+            # QThread activo y Qt aborta el proceso. wait() retorna en cuanto
+            # el hilo sale de run()
+            anterior.wait()
+
+        if not self._pendientes:
+            self.idle.emit()
+            return
+
+        ruta = self._pendientes.popleft()
+        self.pending_changed.emit(len(self._pendientes))
+
+        thread = ExtractionThread(ruta, self.fuente)
+        thread.progress.connect(self.job_progress)
+        thread.page_done.connect(self.page_done)
+        thread.completed.connect(lambda datos, tokens, guardado:
+                                 self.job_completed.emit(ruta, datos, tokens, guardado))
+        thread.cancelled.connect(lambda: self.job_cancelled.emit(ruta))
+        thread.error.connect(lambda mensaje: self.job_failed.emit(ruta, mensaje))
+        thread.save_failed.connect(lambda mensaje: self.job_save_failed.emit(ruta, mensaje))
+        # El siguiente archivo empieza cuando el hilo anterior terminó del todo
+        thread.finished.connect(self._siguiente)
+        self._thread = thread
+        self.job_started.emit(ruta)
+        thread.start()
+
+class SinkThread(QThread):
+    """
+    Entrega un resultado ya extraído a un destino del pipeline (por ejemplo
+    storage_sink) fuera del hilo de la interfaz. Se usa cuando el guardado
+    lo pide el usuario después de que terminó el hilo que extrajo.
+    """
+    done = pyqtSignal()
+    error = pyqtSignal(str)
+
+    def __init__(self, sink, resultado):
+        super().__init__()
+        self.sink = sink
+        self.resultado = resultado
+
+    def run(self):
+        try:
+            self.sink(self.resultado)
+        except Exception as e:
+            self.error.emit(str(e))
+            return
+        self.done.emit()
@@ -4,9 +4,8 @@ from PyQt5.QtCore import Qt
 import json
 import os
 
-from tools.imgocr.img_extraction import extract_text_from_image
-from tools.data_extraction import extract_key_values
-from config.keywords import keywords_list
+from tools.imgocr.reader_registry import warm_up
+from interface.extraction_worker import ExtractionQueue
 
 class ImageInterface(QWidget):
     def __init__(self):
@@ -109,22 +108,63 @@ class ImageInterface(QWidget):
         self.btn_procesar.setEnabled(False)
         layout.addWidget(self.btn_procesar)
 
+        self.btn_cancelar = QPushButton("Cancelar")
+        self.btn_cancelar.setStyleSheet("""
+            QPushButton {
+                background-color: #D32F2F;
+                color: white;
+                padding: 12px;
+                border-radius: 5px;
+                font-size: 14px;
+                font-weight: bold;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #C62828;
+            }
+            QPushButton:pressed {
+                background-color: #B71C1C;
+            }
+            QPushButton:disabled {
+                background-color: #BDBDBD;
+                color: #757575;
+            }
+        """)
+        self.btn_cancelar.clicked.connect(self.cancelar_procesamiento)
+        self.btn_cancelar.setEnabled(False)
+        layout.addWidget(self.btn_cancelar)
+
         layout.addStretch()
         self.setLayout(layout)
 
-        self.ruta_imagen = None
+        self.rutas_imagen = []
+        self.guardadas = 0
+        self.cancelado = False
+
+        # El OCR corre en segundo plano; las imágenes se procesan en orden
+        self.cola = ExtractionQueue("imagen", self)
+        self.cola.job_started.connect(self.on_job_started)
+        self.cola.job_progress.connect(self.text_resultado.append)
+        self.cola.job_completed.connect(self.on_job_completed)
+        self.cola.job_cancelled.connect(self.on_job_cancelled)
+        self.cola.job_failed.connect(self.on_job_failed)
+        self.cola.job_save_failed.connect(self.on_job_save_failed)
+        self.cola.idle.connect(self.on_queue_idle)
 
     def cargar_imagen(self):
-        archivo, _ = QFileDialog.getOpenFileName(
+        archivos, _ = QFileDialog.getOpenFileNames(
             self, 
-            "Seleccionar Imagen", 
+            "Seleccionar Imágenes", 
             "", 
             "Imágenes (*.png *.jpg *.jpeg *.bmp)"
         )
 
-        if archivo:
-            self.ruta_imagen = archivo
-            self.label_archivo.setText(f"Imagen: {os.path.basename(archivo)}")
+        if archivos:
+            self.rutas_imagen = archivos
+            if len(archivos) == 1:
+                self.label_archivo.setText(f"Imagen: {os.path.basename(archivos[0])}")
+            else:
+                self.label_archivo.setText(f"Imágenes seleccionadas: {len(archivos)}")
             self.label_archivo.setStyleSheet("""
                 font-size: 13px; 
                 padding: 10px; 
@@ -136,56 +176,60 @@ class ImageInterface(QWidget):
             """)
             self.btn_procesar.setEnabled(True)
 
+            # Cargar el modelo mientras el usuario revisa la selección
+            warm_up()
+
     def procesar_imagen(self):
-        if not self.ruta_imagen:
+        if not self.rutas_imagen:
             return
 
-        try:
+        if not self.cola.is_busy():
             self.text_resultado.clear()
-            self.text_resultado.append("Extrayendo texto de la imagen...\n")
-            tokens = extract_text_from_image(self.ruta_imagen)
+            self.guardadas = 0
+            self.cancelado = False
 
-            if not tokens:
-                QMessageBox.warning(self, "Advertencia", "No se pudieron extraer datos de la imagen")
-                return
-
-            self.text_resultado.append(f"Tokens extraídos: {len(tokens)}\n")
-
-            datos_extraidos = extract_key_values(tokens, keywords_list)
-
-            self.text_resultado.append("Datos extraídos:\n")
-            self.text_resultado.append(json.dumps(datos_extraidos, indent=4, ensure_ascii=False))
-            self.text_resultado.append("\n")
+        # Se pueden agregar más imágenes mientras la cola trabaja
+        self.cola.add(self.rutas_imagen)
+        self.rutas_imagen = []
+        self.btn_procesar.setEnabled(False)
+        self.btn_cancelar.setEnabled(True)
 
-            self.guardar_datos(datos_extraidos, "imagen")
+    def cancelar_procesamiento(self):
+        self.cancelado = True
+        self.text_resultado.append("\nCancelando...")
+        self.cola.cancel_all()
 
-            QMessageBox.information(self, "Éxito", "Datos procesados y guardados correctamente")
+    def on_job_started(self, ruta):
+        pendientes = self.cola.pending()
+        en_cola = f" ({pendientes} en cola)" if pendientes else ""
+        self.text_resultado.append(f"\n=== {os.path.basename(ruta)}{en_cola} ===")
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error al procesar imagen: {str(e)}")
+    def on_job_completed(self, ruta, datos_extraidos, total_tokens, guardado):
+        if not total_tokens:
+            self.text_resultado.append("No se pudieron extraer datos de la imagen")
+            return
 
-    def guardar_datos(self, datos, fuente):
-        try:
-            if os.path.exists("data.json"):
-                with open("data.json", "r", encoding="utf-8") as f:
-                    data_actual = json.load(f)
-            else:
-                data_actual = {}
+        self.text_resultado.append("Datos extraídos:\n")
+        self.text_resultado.append(json.dumps(datos_extraidos, indent=4, ensure_ascii=False))
+        self.text_resultado.append("\n")
 
-            if "extracciones" not in data_actual:
-                data_actual["extracciones"] = []
+        # El hilo de extracción ya lo guardó (storage_sink)
+        if guardado:
+            self.guardadas += 1
 
-            import datetime
-            entrada = {
-                "fuente": fuente,
-                "fecha": datetime.datetime.now().isoformat(),
-                "datos": datos
-            }
+    def on_job_save_failed(self, ruta, error):
+        QMessageBox.critical(self, "Error", f"Error al guardar datos: {error}")
 
-            data_actual["extracciones"].append(entrada)
+    def on_job_cancelled(self, ruta):
+        self.text_resultado.append(f"Procesamiento de {os.path.basename(ruta)} cancelado")
 
-            with open("data.json", "w", encoding="utf-8") as f:
-                json.dump(data_actual, f, indent=2, ensure_ascii=False)
+    def on_job_failed(self, ruta, error):
+        self.text_resultado.append(f"Error al procesar imagen: {error}")
 
-        except Exception as e:
-            print(f"Error al guardar datos: {e}")
+    def on_queue_idle(self):
+        self.btn_cancelar.setEnabled(False)
+        if self.guardadas:
+            QMessageBox.information(self, "Éxito",
+                                    f"Datos procesados y guardados correctamente ({self.guardadas} imágenes)")
+        elif not self.cancelado:
+            QMessageBox.warning(self, "Advertencia", "No se pudieron extraer datos de la imagen")
@@ -0,0 +1,339 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+import wave
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from vosk import Model, KaldiRecognizer
+
+from config.settings import AUDIO_FILE_CHUNK_SECONDS, AUDIO_BATCH_WORKERS, AUDIO_VAD_ENABLED
+from tools.audio.vad import EnergyVad
+from tools import metrics
+
+try:
+    # Conversión de formato y remuestreo; en Python 3.13+ lo provee audioop-lts
+    import audioop
+except ImportError:
+    audioop = None
+
+try:
+    # Opcional: FLAC y otros formatos distintos de WAV
+    import soundfile
+except ImportError:
+    soundfile = None
+
+MODEL_PATH = "tools/audio/vosk-model-small-es-0.42"
+SAMPLE_RATE = 16000
+# Bloque del micrófono (128 ms): define cada cuánto se actualizan los valores en vivo
+CHUNK_SIZE = 2048
+
+AUDIO_EXTENSIONS = (".wav", ".flac")
+
+KEYWORDS_FOR_EXTRACTION = ["sub", "impuesto", "total", "venta"]
+
+grammar = KEYWORDS_FOR_EXTRACTION + [
+    "[unk]",
+    "cero", "uno", "dos", "tres", "cuatro", "cinco", "seis", "siete", "ocho", "nueve",
+    "punto", "coma"
+]
+grammar_json = json.dumps(grammar)
+
+digit_map = {
+    "cero": "0", "uno": "1", "dos": "2", "tres": "3", "cuatro": "4",
+    "cinco": "5", "seis": "6", "siete": "7", "ocho": "8", "nueve": "9",
+    "punto": ".", "coma": "."
+}
+
+def format_transcription(result_text: str) -> str:
+    split_words = result_text.split()
+    formatted_text = ""
+    for word in split_words:
+        formatted_text += digit_map.get(word, f" {word} ")
+    return formatted_text.strip()
+
+def result_tokens(result_json: str, key: str = "text") -> List[str]:
+    """
+    Convierte un resultado JSON de Vosk en tokens con los números como dígitos.
+    Para PartialResult() usar key="partial".
+    """
+    result_text = json.loads(result_json).get(key, "")
+    if not result_text:
+        return []
+    return format_transcription(result_text).lower().split()
+
+# El modelo se carga una sola vez por proceso; los reconocedores (ya con la
+# gramática compilada) se devuelven a un pool al terminar cada sesión
+_model = None
+_model_lock = threading.Lock()
+_recognizers: Dict[int, List[KaldiRecognizer]] = {}
+_recognizers_lock = threading.Lock()
+# Reconocedores libres que se conservan por frecuencia de muestreo
+MAX_POOLED_RECOGNIZERS = 2
+
+def get_model() -> Model:
+    """Retorna el modelo Vosk compartido, cargándolo en el primer uso."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            print(f"Cargando modelo Vosk desde {MODEL_PATH}...")
+            inicio = time.perf_counter()
+            _model = Model(MODEL_PATH)
+            segundos = time.perf_counter() - inicio
+            metrics.observe("carga_modelo", segundos, "audio")
+            print(f"Modelo Vosk cargado en {segundos:.2f}s")
+        return _model
+
+def is_loaded() -> bool:
+    return _model is not None
+
+def acquire_recognizer(sample_rate: int = SAMPLE_RATE) -> KaldiRecognizer:
+    """
+    Toma un reconocedor libre del pool para la frecuencia indicada, o crea
+    uno nuevo con la gramática de palabras clave si no hay ninguno.
+    """
+    with _recognizers_lock:
+        libres = _recognizers.get(sample_rate)
+        if libres:
+            return libres.pop()
+
+    recognizer = KaldiRecognizer(get_model(), sample_rate)
+    recognizer.SetGrammar(grammar_json)
+    return recognizer
+
+def release_recognizer(recognizer: KaldiRecognizer, sample_rate: int = SAMPLE_RATE) -> None:
+    """Reinicia el reconocedor y lo devuelve al pool para la próxima sesión."""
+    try:
+        recognizer.Reset()
+    except AttributeError:
+        # Versiones de Vosk sin Reset(): no se puede reutilizar con seguridad
+        return
+
+    with _recognizers_lock:
+        libres = _recognizers.setdefault(sample_rate, [])
+        if len(libres) < MAX_POOLED_RECOGNIZERS:
+            libres.append(recognizer)
+
+@contextmanager
+def pooled_recognizer(sample_rate: int = SAMPLE_RATE):
+    recognizer = acquire_recognizer(sample_rate)
+    try:
+        yield recognizer
+    finally:
+        release_recognizer(recognizer, sample_rate)
+
+def warm_up(sample_rate: int = SAMPLE_RATE) -> threading.Thread:
+    """
+    Carga el modelo y deja un reconocedor listo en segundo plano, para que
+    la primera grabación empiece a capturar sin esperar.
+
+    Returns:
+        Hilo que realiza la carga
+    """
+    def _cargar():
+        if not os.path.exists(MODEL_PATH):
+            return
+        try:
+            release_recognizer(acquire_recognizer(sample_rate), sample_rate)
+        except Exception as e:
+            print(f"Error al precargar Vosk: {e}")
+
+    hilo = threading.Thread(target=_cargar, name="vosk-warmup", daemon=True)
+    hilo.start()
+    return hilo
+
+def audio_duration(audio_path: str) -> float:
+    """Duración del archivo en segundos, leída de la cabecera."""
+    if os.path.splitext(audio_path)[1].lower() == ".wav":
+        with wave.open(audio_path, "rb") as wf:
+            return wf.getnframes() / wf.getframerate()
+    if soundfile is None:
+        raise ValueError("Se requiere el paquete soundfile para leer archivos que no son WAV")
+    info = soundfile.info(audio_path)
+    return info.frames / info.samplerate
+
+def _read_wav(audio_path: str, chunk_seconds: float) -> Iterator[Tuple[bytes, int, int, int]]:
+    with wave.open(audio_path, "rb") as wf:
+        channels, width, rate = wf.getnchannels(), wf.getsampwidth(), wf.getframerate()
+        chunk_frames = max(1, int(rate * chunk_seconds))
+        while True:
+            data = wf.readframes(chunk_frames)
+            if not data:
+                break
+            yield data, channels, width, rate
+
+def _read_soundfile(audio_path: str, chunk_seconds: float) -> Iterator[Tuple[bytes, int, int, int]]:
+    if soundfile is None:
+        raise ValueError("Se requiere el paquete soundfile para leer archivos que no son WAV")
+    rate = soundfile.info(audio_path).samplerate
+    chunk_frames = max(1, int(rate * chunk_seconds))
+    for block in soundfile.blocks(audio_path, blocksize=chunk_frames, dtype="int16", always_2d=True):
+        if block.shape[1] > 1:
+            # Promedio de canales en el propio bloque de numpy
+            block = block.mean(axis=1, dtype="float32").astype("int16")
+        yield block.tobytes(), 1, 2, rate
+
+def read_audio_chunks(audio_path: str,
+                      chunk_seconds: float = AUDIO_FILE_CHUNK_SECONDS) -> Iterator[bytes]:
+    """
+    Lee un archivo de audio por bloques grandes y los convierte al formato
+    que espera el reconocedor: PCM de 16 bits, mono, a SAMPLE_RATE.
+
+    Args:
+        audio_path: Ruta del archivo WAV o FLAC
+        chunk_seconds: Segundos de audio por bloque
+
+    Returns:
+        Iterador de bloques PCM listos para AcceptWaveform
+    """
+    if os.path.splitext(audio_path)[1].lower() == ".wav":
+        blocks = _read_wav(audio_path, chunk_seconds)
+    else:
+        blocks = _read_soundfile(audio_path, chunk_seconds)
+
+    state = None
+    for data, channels, width, rate in blocks:
+        if (channels, width, rate) != (1, 2, SAMPLE_RATE) and audioop is None:
+            raise ValueError("Se requiere audioop (audioop-lts en Python 3.13+) para convertir "
+                             f"audio de {channels} canales, {width * 8} bits y {rate} Hz")
+        if width == 1:
+            # Los WAV de 8 bits son sin signo
+            data = audioop.bias(data, 1, -128)
+        if width != 2:
+            data = audioop.lin2lin(data, width, 2)
+        if channels == 2:
+            data = audioop.tomono(data, 2, 0.5, 0.5)
+        elif channels != 1:
+            raise ValueError(f"WAV de {channels} canales no soportado (use mono o estéreo)")
+        if rate != SAMPLE_RATE:
+            # El estado del remuestreo pasa de un bloque al siguiente
+            data, state = audioop.ratecv(data, 2, 1, rate, SAMPLE_RATE, state)
+        yield data
+
+def iter_transcription(audio_path: str,
+                       chunk_seconds: float = AUDIO_FILE_CHUNK_SECONDS,
+                       should_stop: Optional[Callable[[], bool]] = None,
+                       vad: Optional[EnergyVad] = None) -> Iterator[List[str]]:
+    """
+    Transcribe un archivo de audio tan rápido como lo permita la CPU, sin
+    esperar el tiempo real.
+
+    Args:
+        audio_path: Ruta del archivo WAV o FLAC
+        chunk_seconds: Segundos de audio enviados al reconocedor por bloque
+        should_stop: Función opcional; si retorna True se deja de leer
+        vad: Compuerta de voz opcional; los silencios no se decodifican y
+            cada tramo de voz se cierra como un segmento
+
+    Returns:
+        Iterador con los tokens de cada segmento reconocido
+    """
+    with pooled_recognizer(SAMPLE_RATE) as recognizer:
+        for data in read_audio_chunks(audio_path, chunk_seconds):
+            if should_stop is not None and should_stop():
+                return
+            pieces = vad.process(data) if vad is not None else [(data, False)]
+            for audio, ended in pieces:
+                if audio and recognizer.AcceptWaveform(audio):
+                    tokens = result_tokens(recognizer.Result())
+                    if tokens:
+                        yield tokens
+                if ended:
+                    tokens = result_tokens(recognizer.FinalResult())
+                    if tokens:
+                        yield tokens
+        tokens = result_tokens(recognizer.FinalResult())
+        if tokens:
+            yield tokens
+
+def extract_text_from_audio(audio_path: str,
+                            chunk_seconds: float = AUDIO_FILE_CHUNK_SECONDS,
+                            use_vad: bool = AUDIO_VAD_ENABLED) -> List[str]:
+    """
+    Transcribe un archivo de audio y retorna una lista de tokens.
+
+    Args:
+        audio_path: Ruta del archivo WAV o FLAC (se convierte a mono y
+            SAMPLE_RATE si hace falta)
+        chunk_seconds: Segundos de audio enviados al reconocedor por bloque
+        use_vad: Omitir los silencios con la compuerta de voz (EnergyVad)
+
+    Returns:
+        Lista de tokens transcritos del audio
+    """
+    if not os.path.exists(audio_path):
+        print(f"Error: El archivo {audio_path} no existe")
+        return []
+
+    if not os.path.exists(MODEL_PATH):
+        print(f"Error: Modelo Vosk no encontrado en {MODEL_PATH}")
+        return []
+
+    try:
+        inicio = time.perf_counter()
+        vad = EnergyVad(SAMPLE_RATE) if use_vad else None
+        tokens = []
+        for segment in iter_transcription(audio_path, chunk_seconds, vad=vad):
+            tokens.extend(segment)
+
+        segundos = time.perf_counter() - inicio
+        metrics.observe("transcripcion", segundos, "audio")
+        velocidad = audio_duration(audio_path) / segundos if segundos else 0.0
+        omitido = f", {vad.stats()['omitido_pct']:.0f}% de silencio omitido" if vad is not None else ""
+        print(f"Tokens transcritos de audio: {len(tokens)} "
+              f"({segundos:.2f}s, x{velocidad:.1f} tiempo real{omitido})")
+        return tokens
+    except Exception as e:
+        print(f"Error al procesar audio: {e}")
+        return []
+
+def _init_worker(chunk_seconds: float) -> None:
+    global _worker_chunk_seconds
+    _worker_chunk_seconds = chunk_seconds
+    # Cada proceso carga el modelo una vez, antes de recibir archivos
+    get_model()
+
+_worker_chunk_seconds = AUDIO_FILE_CHUNK_SECONDS
+
+def _extract_worker(audio_path: str) -> Tuple[str, List[str], dict]:
+    # Las métricas del proceso (carga del modelo y decodificación) viajan con
+    # cada resultado para que el proceso principal las sume
+    tokens = extract_text_from_audio(audio_path, _worker_chunk_seconds)
+    return audio_path, tokens, metrics.drain()
+
+def extract_text_from_audios(
+    audio_paths: Iterable[str],
+    workers: Optional[int] = AUDIO_BATCH_WORKERS,
+    chunk_seconds: float = AUDIO_FILE_CHUNK_SECONDS
+    ) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Transcribe varios archivos de audio en paralelo usando un pool de
+    procesos. Cada proceso carga el modelo Vosk una sola vez.
+
+    Args:
+        audio_paths: Rutas de los archivos WAV o FLAC
+        workers: Número de procesos (None = todos los núcleos)
+        chunk_seconds: Segundos de audio enviados al reconocedor por bloque
+
+    Returns:
+        Iterador de tuplas (ruta, tokens) en el orden en que terminan
+    """
+    pending = list(audio_paths)
+    if not pending:
+        return
+
+    if not os.path.exists(MODEL_PATH):
+        print(f"Error: Modelo Vosk no encontrado en {MODEL_PATH}")
+        return
+
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processes=workers,
+                  initializer=_init_worker,
+                  initargs=(chunk_seconds,)) as pool:
+        for audio_path, tokens, metricas in pool.imap_unordered(_extract_worker, pending):
+            metrics.merge(metricas)
+            yield audio_path, tokens
@@ -0,0 +1,115 @@
+from typing import Dict
+
+import pyaudio
+
+from config.settings import AUDIO_CAPTURE_MODE, AUDIO_RING_SECONDS
+from tools.audio.ring_buffer import PcmRingBuffer
+
+
+class CallbackCapture:
+    """
+    Captura del micrófono con callback de PyAudio. El callback solo copia
+    cada bloque al PcmRingBuffer; el reconocedor lee desde otro hilo, así
+    que una decodificación lenta no hace perder audio mientras quepa en el
+    buffer (AUDIO_RING_SECONDS).
+    """
+
+    def __init__(self, sample_rate: int, chunk_size: int, buffer_seconds: float = AUDIO_RING_SECONDS):
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.ring = PcmRingBuffer(int(sample_rate * buffer_seconds) * 2)
+        # Desbordamientos informados por PortAudio (antes de llegar al buffer)
+        self.input_overflows = 0
+        self._pa = None
+        self._stream = None
+
+    def _callback(self, in_data, frame_count, time_info, status_flags):
+        if status_flags & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        self.ring.write(in_data)
+        return None, pyaudio.paContinue
+
+    def start(self) -> None:
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(format=pyaudio.paInt16,
+                                     channels=1,
+                                     rate=self.sample_rate,
+                                     input=True,
+                                     frames_per_buffer=self.chunk_size,
+                                     stream_callback=self._callback)
+        self._stream.start_stream()
+
+    def read(self) -> bytes:
+        """Audio pendiente (hasta un bloque); b"" si no llegó nada a tiempo o ya se vació."""
+        return self.ring.read(self.chunk_size * 2)
+
+    def stop(self) -> None:
+        """Detiene el micrófono; lo ya capturado se puede seguir leyendo."""
+        if self._stream is not None and self._stream.is_active():
+            self._stream.stop_stream()
+        self.ring.close()
+
+    def close(self) -> None:
+        self.stop()
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
+
+    def stats(self) -> Dict[str, int]:
+        stats = self.ring.stats()
+        stats["desbordamientos_entrada"] = self.input_overflows
+        return stats
+
+
+class BlockingCapture:
+    """
+    Captura con stream.read() en el mismo hilo del reconocedor. Si la
+    decodificación se atrasa, PortAudio descarta audio sin avisar.
+    """
+
+    def __init__(self, sample_rate: int, chunk_size: int):
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self._pa = None
+        self._stream = None
+        self._stopped = False
+
+    def start(self) -> None:
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(format=pyaudio.paInt16,
+                                     channels=1,
+                                     rate=self.sample_rate,
+                                     input=True,
+                                     frames_per_buffer=self.chunk_size)
+
+    def read(self) -> bytes:
+        if self._stopped:
+            return b""
+        return self._stream.read(self.chunk_size, exception_on_overflow=False)
+
+    def stop(self) -> None:
+        self._stopped = True
+        if self._stream is not None and self._stream.is_active():
+            self._stream.stop_stream()
+
+    def close(self) -> None:
+        self.stop()
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+def open_capture(sample_rate: int, chunk_size: int, mode: str = AUDIO_CAPTURE_MODE):
+    """Crea la captura según AUDIO_CAPTURE_MODE ("callback" o "blocking")."""
+    if mode == "blocking":
+        return BlockingCapture(sample_rate, chunk_size)
+    return CallbackCapture(sample_rate, chunk_size)
@@ -0,0 +1,94 @@
+import threading
+from typing import Dict
+
+
+class PcmRingBuffer:
+    """
+    Buffer circular preasignado para audio PCM con un solo productor (el
+    callback de PyAudio) y un solo consumidor (el hilo del reconocedor).
+
+    Cada posición la modifica un solo hilo: el productor solo avanza
+    _write_pos y el consumidor solo _read_pos, así que escribir y leer no
+    necesitan un lock. El productor nunca espera: si no hay espacio, el
+    bloque se descarta entero y se cuenta como desbordamiento.
+    """
+
+    def __init__(self, capacity_bytes: int, frame_bytes: int = 2):
+        # Capacidad múltiplo del tamaño de muestra para no partir muestras
+        self.capacity = max(frame_bytes, capacity_bytes - capacity_bytes % frame_bytes)
+        self.frame_bytes = frame_bytes
+        self._buffer = bytearray(self.capacity)
+        self._view = memoryview(self._buffer)
+        # Totales de bytes escritos y leídos desde el inicio (nunca retroceden)
+        self._write_pos = 0
+        self._read_pos = 0
+        self._data_ready = threading.Event()
+        self._closed = False
+
+        self.overflow_events = 0
+        self.overflow_bytes = 0
+        self.underflow_events = 0
+
+    def available(self) -> int:
+        return self._write_pos - self._read_pos
+
+    def write(self, data: bytes) -> bool:
+        """
+        Copia un bloque al buffer (lo llama el productor). Retorna False si
+        no había espacio y el bloque se descartó.
+        """
+        size = len(data)
+        if size > self.capacity - (self._write_pos - self._read_pos):
+            self.overflow_events += 1
+            self.overflow_bytes += size
+            return False
+
+        start = self._write_pos % self.capacity
+        first = min(size, self.capacity - start)
+        self._view[start:start + first] = data[:first]
+        if first < size:
+            self._view[:size - first] = data[first:]
+
+        # Publicar la posición solo después de copiar los datos
+        self._write_pos += size
+        self._data_ready.set()
+        return True
+
+    def read(self, max_bytes: int, timeout: float = 0.5) -> bytes:
+        """
+        Retorna lo disponible hasta max_bytes (lo llama el consumidor). Si el
+        buffer está vacío espera hasta timeout segundos; retorna b"" si no
+        llegó nada o el buffer se cerró y ya no quedan datos.
+        """
+        if not self.available():
+            if self._closed:
+                return b""
+            self.underflow_events += 1
+            self._data_ready.clear()
+            # Volver a mirar tras limpiar el evento: el productor pudo escribir entre medio
+            if not self.available() and not self._data_ready.wait(timeout):
+                return b""
+
+        size = min(self.available(), max_bytes)
+        size -= size % self.frame_bytes
+        start = self._read_pos % self.capacity
+        first = min(size, self.capacity - start)
+        data = bytes(self._view[start:start + first])
+        if first < size:
+            data += bytes(self._view[:size - first])
+
+        self._read_pos += size
+        return data
+
+    def close(self) -> None:
+        """Indica que no se escribirá más; read() entrega lo que queda y luego b""."""
+        self._closed = True
+        self._data_ready.set()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "desbordamientos": self.overflow_events,
+            "bytes_descartados": self.overflow_bytes,
+            "subejecuciones": self.underflow_events,
+            "bytes_en_buffer": self.available(),
+        }
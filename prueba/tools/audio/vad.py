@@ -0,0 +1,128 @@
+import math
+from array import array
+from collections import deque
+from typing import Dict, List, Tuple
+
+from config.settings import (AUDIO_VAD_FRAME_MS, AUDIO_VAD_MIN_RMS, AUDIO_VAD_NOISE_FACTOR,
+                             AUDIO_VAD_PRE_ROLL_MS, AUDIO_VAD_POST_ROLL_MS)
+
+try:
+    import audioop
+except ImportError:
+    audioop = None
+
+
+def frame_rms(frame: bytes) -> float:
+    """Energía RMS de un bloque PCM de 16 bits."""
+    if audioop is not None:
+        return audioop.rms(frame, 2)
+    samples = array("h", frame)
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class EnergyVad:
+    """
+    Compuerta de actividad de voz por energía delante del reconocedor. El
+    audio se divide en tramas de AUDIO_VAD_FRAME_MS; las tramas por debajo
+    del umbral no se envían a Vosk, salvo el margen previo (pre-roll) y
+    posterior (post-roll) alrededor de la voz, que conserva los bordes de
+    las palabras y el silencio que Vosk necesita para cerrar el segmento.
+
+    El umbral se adapta al ruido del ambiente: es el mayor entre
+    AUDIO_VAD_MIN_RMS y el piso de ruido estimado por AUDIO_VAD_NOISE_FACTOR.
+    """
+
+    def __init__(self, sample_rate: int,
+                 frame_ms: int = AUDIO_VAD_FRAME_MS,
+                 min_rms: float = AUDIO_VAD_MIN_RMS,
+                 noise_factor: float = AUDIO_VAD_NOISE_FACTOR,
+                 pre_roll_ms: int = AUDIO_VAD_PRE_ROLL_MS,
+                 post_roll_ms: int = AUDIO_VAD_POST_ROLL_MS):
+        self.sample_rate = sample_rate
+        self.frame_bytes = int(sample_rate * frame_ms / 1000) * 2
+        self.min_rms = min_rms
+        self.noise_factor = noise_factor
+        self.post_roll_frames = max(0, round(post_roll_ms / frame_ms))
+
+        self._pre_roll = deque(maxlen=max(0, round(pre_roll_ms / frame_ms)))
+        self._remainder = b""
+        self._hangover = 0
+        self._in_speech = False
+        self._noise_floor = None
+
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.segments = 0
+
+    def threshold(self) -> float:
+        if self._noise_floor is None:
+            return self.min_rms
+        return max(self.min_rms, self._noise_floor * self.noise_factor)
+
+    def _update_noise(self, rms: float) -> None:
+        # Media móvil lenta, solo con tramas de silencio
+        if self._noise_floor is None:
+            self._noise_floor = rms
+        else:
+            self._noise_floor += 0.05 * (rms - self._noise_floor)
+
+    def process(self, data: bytes) -> List[Tuple[bytes, bool]]:
+        """
+        Filtra un bloque de audio.
+
+        Returns:
+            Lista de tramos (audio a enviar al reconocedor, True si con ese
+            audio terminó un segmento de voz, incluido su post-roll). Un
+            bloque largo puede contener varios segmentos.
+        """
+        self.input_bytes += len(data)
+        data = self._remainder + data
+        usable = len(data) - len(data) % self.frame_bytes
+        self._remainder = data[usable:]
+
+        pieces = []
+        output = []
+        for start in range(0, usable, self.frame_bytes):
+            frame = data[start:start + self.frame_bytes]
+            rms = frame_rms(frame)
+
+            if rms >= self.threshold():
+                if not self._in_speech:
+                    self._in_speech = True
+                    self.segments += 1
+                    output.extend(self._pre_roll)
+                    self._pre_roll.clear()
+                output.append(frame)
+                self._hangover = self.post_roll_frames
+            elif self._in_speech and self._hangover > 0:
+                output.append(frame)
+                self._hangover -= 1
+            else:
+                if self._in_speech:
+                    self._in_speech = False
+                    pieces.append((b"".join(output), True))
+                    output = []
+                self._update_noise(rms)
+                if self._pre_roll.maxlen:
+                    self._pre_roll.append(frame)
+
+        if output:
+            pieces.append((b"".join(output), False))
+        self.output_bytes += sum(len(audio) for audio, _ in pieces)
+        return pieces
+
+    def skipped_seconds(self) -> float:
+        pending = sum(len(f) for f in self._pre_roll) + len(self._remainder)
+        return max(0, self.input_bytes - self.output_bytes - pending) / 2 / self.sample_rate
+
+    def stats(self) -> Dict[str, float]:
+        total = self.input_bytes / 2 / self.sample_rate
+        skipped = self.skipped_seconds()
+        return {
+            "audio_s": total,
+            "omitido_s": skipped,
+            "omitido_pct": 100 * skipped / total if total else 0.0,
+            "segmentos": self.segments,
+        }
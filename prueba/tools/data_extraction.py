@@ -1,5 +1,106 @@
 import re
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+
+# Regular expression for number validation
+number_pattern = re.compile(r'^\d*\.?\d+$')
+non_numeric_pattern = re.compile(r'[^\d\.]')
+
+# Characters removed from a token before keyword matching
+_TOKEN_STRIP_TABLE = str.maketrans('', '', ': $')
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed keyword set. A single pass over a token
+    finds every keyword it contains; first_match() returns the one that comes
+    first in keyword order, which is what the original per-keyword `in` loop
+    picked.
+    """
+
+    def __init__(self, keywords: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Lowest keyword index ending at each state, following failure links
+        self._best: List[Optional[int]] = [None]
+
+        for index, keyword in enumerate(keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                    self._goto[state][char] = next_state
+                state = next_state
+            if self._best[state] is None:
+                self._best[state] = index
+
+        # Breadth-first pass to fill failure links; parents are always
+        # finalized before their children
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._best[child] = _min_index(self._best[child], self._best[self._fail[child]])
+                queue.append(child)
+
+    def first_match(self, text: str) -> Optional[int]:
+        """Index of the first keyword (in keyword order) contained in text, or None."""
+        goto, fail, best_at = self._goto, self._fail, self._best
+        best = best_at[0]
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            found = best_at[state]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:
+                    break
+
+        return best
+
+def _min_index(a: Optional[int], b: Optional[int]) -> Optional[int]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+@lru_cache(maxsize=32)
+def compile_keywords(keywords: Tuple[str, ...]) -> Tuple[KeywordMatcher, List[str]]:
+    """
+    Builds (and caches) the matcher for a keyword set. Returns the matcher and
+    the original keyword reported for each matcher index.
+    """
+    # Pre-process keywords for robust substring matching
+    cleaned_keywords = {k.strip().upper(): k for k in keywords}
+    return KeywordMatcher(list(cleaned_keywords)), list(cleaned_keywords.values())
+
+def clean_token(item: str) -> str:
+    """Normalizes a token for keyword matching (remove punctuation/spaces)."""
+    return item.strip().upper().translate(_TOKEN_STRIP_TABLE)
+
+def parse_value(item: str) -> Optional[float]:
+    """Aggressively cleans a token and returns it as a number, or None."""
+    cleaned_value = non_numeric_pattern.sub('', item.strip().replace(',', '.'))
+
+    # Check if the cleaned item is a number
+    if number_pattern.match(cleaned_value):
+        try:
+            return float(cleaned_value)
+        except ValueError:
+            return None
+    return None
 
 def extract_key_values(
     char_list: List[str],
@@ -7,46 +108,153 @@ def extract_key_values(
     look_ahead: int = 6
     ) -> Dict[str, float]:
     """
-    Extracts key-value pairs from a list of OCR/Vosk tokens, handling fuzzy 
+    Extracts key-value pairs from a list of OCR/Vosk tokens, handling fuzzy
     keyword matches and using a "Last-One-Wins" strategy for final amounts.
     """
     final_values: Dict[str, float] = {}
 
-    # 1. Pre-process keywords for robust substring matching
-    cleaned_keywords = {k.strip().upper(): k for k in keywords}
+    # 1. Compiled once per keyword set and reused across calls
+    matcher, original_keywords = compile_keywords(tuple(keywords))
 
-    # Regular expression for number validation
-    number_pattern = re.compile(r'^\d*\.?\d+$')
+    # Repeated tokens are matched once; look-ahead candidates are parsed once
+    matches: Dict[str, Optional[int]] = {}
+    parsed_values: Dict[int, Optional[float]] = {}
 
     for i, item in enumerate(char_list):
-        # Clean the current char item for matching (remove punctuation/spaces)
-        cleaned_item = item.strip().upper().replace(':', '').replace('$', '').replace(' ', '')
+        # 2. Robust Keyword Check (Substring Match), first keyword wins
+        if item in matches:
+            match = matches[item]
+        else:
+            match = matches[item] = matcher.first_match(clean_token(item))
+        if match is None:
+            continue
+
+        # 3. Search for the numerical value in the subsequent items.
+        for j in range(i + 1, min(i + look_ahead, len(char_list))):
+            if j not in parsed_values:
+                parsed_values[j] = parse_value(char_list[j])
+
+            value = parsed_values[j]
+            if value is not None:
+                # LAST-ONE-WINS: Overwrite the dictionary entry
+                final_values[original_keywords[match]] = value
+                break
+
+    return final_values
 
-        # 2. Robust Keyword Check (Substring Match)
-        for clean_keyword, original_keyword in cleaned_keywords.items():
-            if clean_keyword in cleaned_item:
+class StreamingKeyValueExtractor:
+    """
+    Incremental version of extract_key_values for live transcription. Tokens
+    are fed one at a time; keywords still waiting for a value inside their
+    look-ahead window are kept between calls. After feeding a token list,
+    values() is equal (including key order) to extract_key_values() over the
+    same list.
 
-                # 3. Search for the numerical value in the subsequent items.
-                for j in range(i + 1, min(i + look_ahead, len(char_list))):
-                    next_item = char_list[j].strip()
+    preview() evaluates provisional tokens (e.g. a Vosk partial result) on
+    top of the committed state without modifying it.
+    """
 
-                    # Aggressively clean the potential value 
-                    cleaned_value = re.sub(r'[^\d\.]', '', next_item.replace(',', '.'))
+    def __init__(self, keywords: List[str], look_ahead: int = 6):
+        self.look_ahead = look_ahead
+        self._matcher, self._original_keywords = compile_keywords(tuple(keywords))
+        self._matches: Dict[str, Optional[int]] = {}
+        self._position = 0
+        # Keyword occurrences whose window is still open: (position, match)
+        self._pending: List[Tuple[int, int]] = []
+        # Per keyword: first resolved position (fixes the key order of the
+        # batch result) and the value of the last resolved occurrence
+        self._first: Dict[int, int] = {}
+        self._last: Dict[int, float] = {}
 
-                    # Check if the cleaned item is a number
-                    if number_pattern.match(cleaned_value):
-                        try:
-                            value = float(cleaned_value)
+    def _match(self, item: str) -> Optional[int]:
+        if item in self._matches:
+            return self._matches[item]
+        match = self._matches[item] = self._matcher.first_match(clean_token(item))
+        return match
 
-                            # LAST-ONE-WINS: Overwrite the dictionary entry
-                            final_values[original_keyword] = value
+    def _advance(self, item: str, position: int, pending: List[Tuple[int, int]],
+                 first: Dict[int, int], last: Dict[int, float]) -> List[Tuple[int, int]]:
+        value = None
+        still_open = []
+        for start, match in pending:
+            # The window of a keyword at `start` covers start+1 .. start+look_ahead-1
+            if position - start >= self.look_ahead:
+                continue
+            if value is None:
+                value = parse_value(item)
+            if value is None:
+                still_open.append((start, match))
+                continue
+            # Pending occurrences resolve in position order, so for each
+            # keyword the last write is also the last occurrence (LAST-ONE-WINS)
+            first.setdefault(match, start)
+            last[match] = value
 
-                            # Break the inner loops and move to the next char item
-                            break 
-                        except ValueError:
-                            continue
+        match = self._match(item)
+        if match is not None and self.look_ahead > 1:
+            still_open.append((position, match))
+        return still_open
 
-                # Stop checking other keywords against this single char item
-                break
+    def _build(self, first: Dict[int, int], last: Dict[int, float]) -> Dict[str, float]:
+        return {self._original_keywords[match]: last[match]
+                for match in sorted(first, key=first.__getitem__)}
 
-    return final_values
+    def feed(self, tokens: List[str]) -> bool:
+        """Commits tokens to the stream. Returns True if any value changed."""
+        before = dict(self._last)
+        for item in tokens:
+            self._pending = self._advance(item, self._position, self._pending,
+                                          self._first, self._last)
+            self._position += 1
+        return self._last != before
+
+    def values(self) -> Dict[str, float]:
+        """Values extracted from the committed tokens."""
+        return self._build(self._first, self._last)
+
+    def preview(self, tokens: List[str]) -> Dict[str, float]:
+        """Values as if tokens were committed, leaving the stream unchanged."""
+        if not tokens:
+            return self.values()
+
+        pending, first, last = self._pending, dict(self._first), dict(self._last)
+        for offset, item in enumerate(tokens):
+            pending = self._advance(item, self._position + offset, pending, first, last)
+        return self._build(first, last)
+
+class ReverseKeyValueExtractor:
+    """
+    Key-value extraction over pages fed from the last one to the first.
+    Values already found come from later pages and take priority
+    (LAST-ONE-WINS), and a new page only needs the first look_ahead - 1
+    tokens after it to complete its windows. The new page's keys are merged
+    in front of the ones already found, which keeps every key at its first
+    match, so once all pages are fed values() has the same values and key
+    order as extract_key_values over the whole document. complete() tells
+    when every keyword has a value and the remaining (earlier) pages can be
+    skipped; the values are final then, but a key that also appears on a
+    skipped page is ordered by the pages actually read.
+    """
+
+    def __init__(self, keywords: List[str], look_ahead: int = 6):
+        self.keywords = keywords
+        self.look_ahead = look_ahead
+        self._expected = set({k.strip().upper(): k for k in keywords}.values())
+        self._values: Dict[str, float] = {}
+        self._suffix: List[str] = []
+
+    def feed(self, tokens: List[str]) -> bool:
+        """Adds the page preceding the ones already fed. Returns True if any value changed."""
+        overlap = max(self.look_ahead - 1, 0)
+        page_values = extract_key_values(tokens + self._suffix[:overlap], self.keywords, self.look_ahead)
+        before = self._values
+        # Earlier page first: dict order is the order of first insertion
+        self._values = {**page_values, **self._values}
+        self._suffix = tokens + self._suffix[:overlap]
+        return self._values != before
+
+    def values(self) -> Dict[str, float]:
+        return dict(self._values)
+
+    def complete(self) -> bool:
+        return self._expected <= self._values.keys()
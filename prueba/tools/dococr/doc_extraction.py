@@ -1,37 +1,402 @@
-from pdf2image import convert_from_path
-import pytesseract
-from typing import List
+from pdf2image import convert_from_path, pdfinfo_from_path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 import os
+import subprocess
+import time
 
-def extract_text_from_pdf(pdf_path: str) -> List[str]:
+from config.settings import (DOC_DPI, DOC_LANGUAGES, DOC_PAGE_WINDOW, DOC_OCR_WORKERS,
+                             DOC_TEXT_LAYER, DOC_TEXT_MIN_CHARS)
+from tools.data_extraction import extract_key_values, ReverseKeyValueExtractor
+from tools.dococr import tess_engine
+from tools.ocr_cache import get_cache
+from tools import metrics
+
+class PageResult(NamedTuple):
+    page: int
+    tokens: List[str]
+    # Camino usado para la página: "texto" (capa embebida), "ocr" o "cache"
+    source: str = "ocr"
+    seconds: float = 0.0
+
+def _cache_settings() -> dict:
+    # "format" distingue las entradas por página de las listas planas anteriores
+    return {"engine": "tesseract", "languages": DOC_LANGUAGES, "dpi": DOC_DPI,
+            "format": "pages", "text_layer": DOC_TEXT_LAYER}
+
+def count_pdf_pages(pdf_path: str) -> int:
+    return int(pdfinfo_from_path(pdf_path)["Pages"])
+
+def _page_windows(pages: Sequence[int], window: int) -> Iterator[Tuple[int, int]]:
+    # Agrupa páginas consecutivas en rangos (primera, última) de hasta "window" páginas
+    start = prev = None
+    for page in pages:
+        if start is not None and page == prev + 1 and page - start < window:
+            prev = page
+            continue
+        if start is not None:
+            yield start, prev
+        start = prev = page
+    if start is not None:
+        yield start, prev
+
+def iter_pdf_pages(
+    pdf_path: str,
+    dpi: int = DOC_DPI,
+    window: int = DOC_PAGE_WINDOW,
+    thread_count: int = 1,
+    pages: Optional[Sequence[int]] = None,
+    reverse: bool = False
+    ):
     """
-    Extrae texto de un PDF y retorna una lista de tokens.
+    Rasteriza un PDF por ventanas de páginas en lugar de cargarlo completo
+    en memoria.
 
     Args:
-        pdf_path: Ruta del archivo PDF a procesar
+        pdf_path: Ruta del archivo PDF
+        dpi: Resolución de rasterizado
+        window: Páginas convertidas en cada llamada a Poppler
+        thread_count: Procesos de Poppler usados para cada ventana
+        pages: Números de página a rasterizar (None = todas)
+        reverse: Recorrer el documento desde la última página
 
     Returns:
-        Lista de tokens extraídos del PDF
+        Iterador de tuplas (número de página, imagen PIL)
     """
-    full_text_list = []
+    if pages is None:
+        pages = range(1, count_pdf_pages(pdf_path) + 1)
 
-    if not os.path.exists(pdf_path):
-        print(f"Error: El archivo {pdf_path} no existe")
+    windows = list(_page_windows(sorted(pages), max(1, window)))
+    if reverse:
+        windows.reverse()
+
+    for first, last in windows:
+        inicio = time.perf_counter()
+        images = convert_from_path(pdf_path, dpi=dpi, first_page=first, last_page=last,
+                                   thread_count=thread_count)
+        # Tiempo por página de la ventana
+        for _ in images:
+            metrics.observe("rasterizado", (time.perf_counter() - inicio) / len(images), "documento")
+        numbered = list(enumerate(images, start=first))
+        del images
+        if reverse:
+            numbered.reverse()
+        while numbered:
+            yield numbered.pop(0)
+
+def extract_text_layer(pdf_path: str) -> List[str]:
+    """
+    Lee la capa de texto embebida de un PDF con pdftotext (Poppler), sin
+    rasterizar.
+
+    Args:
+        pdf_path: Ruta del archivo PDF
+
+    Returns:
+        Texto de cada página en orden, o lista vacía si no se pudo leer
+    """
+    try:
+        proc = subprocess.run(["pdftotext", "-layout", "-enc", "UTF-8", pdf_path, "-"],
+                              capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Aviso: No se pudo leer la capa de texto del PDF, se usará OCR ({e})")
         return []
 
+    # pdftotext termina cada página con un salto de página
+    text = proc.stdout.decode("utf-8", errors="replace")
+    if text.endswith("\f"):
+        text = text[:-1]
+    return text.split("\f")
+
+def has_text_layer(page_text: str) -> bool:
+    return len("".join(page_text.split())) >= DOC_TEXT_MIN_CHARS
+
+def _resolve_workers(workers: Optional[int]) -> int:
+    return max(1, workers or os.cpu_count() or 1)
+
+def _render_pages(
+    pdf_path: str,
+    workers: int,
+    errors: list,
+    pages: Optional[Sequence[int]] = None,
+    reverse: bool = False
+    ) -> Iterator[Tuple[int, object]]:
+    # Solo los errores de conversión se reportan aquí; los de OCR se propagan.
+    # La ventana no crece con los workers: las páginas por adelantado las
+    # limita _ocr_pages
     try:
-        print(f"Convirtiendo páginas de {pdf_path}...")
-        images = convert_from_path(pdf_path, dpi=300)
+        yield from iter_pdf_pages(pdf_path,
+                                  window=DOC_PAGE_WINDOW,
+                                  thread_count=min(workers, DOC_PAGE_WINDOW),
+                                  pages=pages,
+                                  reverse=reverse)
     except Exception as e:
         print("Error: No se pudo convertir el PDF. Asegúrese de que Poppler esté instalado.")
         print(f"Error subyacente: {e}")
-        return []
+        errors.append(e)
+
+def _ocr_image(image) -> Tuple[List[str], float]:
+    inicio = time.perf_counter()
+    page_text = tess_engine.image_to_string(image, lang=DOC_LANGUAGES)
+    image.close()
+    segundos = time.perf_counter() - inicio
+    metrics.observe("ocr_pagina", segundos, "documento")
+    return page_text.lower().split(), segundos
+
+def _ocr_pages(rendered: Iterable[Tuple[int, object]], workers: int) -> Iterator[PageResult]:
+    if workers == 1:
+        for page, image in rendered:
+            print(f"Procesando Página {page}...")
+            tokens, seconds = _ocr_image(image)
+            yield PageResult(page, tokens, "ocr", seconds)
+        return
+
+    # pytesseract lanza un proceso de tesseract por página y tesserocr libera
+    # el GIL durante el reconocimiento, así que los hilos bastan para usar
+    # varios núcleos (OMP_THREAD_LIMIT se fija al iniciar la aplicación)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tesseract")
+    in_flight = deque()
+    try:
+        for page, image in rendered:
+            print(f"Procesando Página {page}...")
+            in_flight.append((page, executor.submit(_ocr_image, image)))
+
+            # Como mucho "workers" páginas rasterizadas en memoria a la vez;
+            # se entregan en orden de página
+            if len(in_flight) >= workers:
+                done_page, future = in_flight.popleft()
+                tokens, seconds = future.result()
+                yield PageResult(done_page, tokens, "ocr", seconds)
+
+        while in_flight:
+            done_page, future = in_flight.popleft()
+            tokens, seconds = future.result()
+            yield PageResult(done_page, tokens, "ocr", seconds)
+    finally:
+        for _, future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+def _merge_pages(
+    order: Sequence[int],
+    known: Dict[int, PageResult],
+    scanned: Iterator[PageResult]
+    ) -> Iterator[PageResult]:
+    for page in order:
+        if page in known:
+            yield known[page]
+            continue
+
+        result = next(scanned, None)
+        if result is None:
+            return
+        yield result
+
+def iter_text_from_pdf(
+    pdf_path: str,
+    use_cache: bool = True,
+    workers: Optional[int] = DOC_OCR_WORKERS,
+    reverse: bool = False
+    ) -> Iterator[PageResult]:
+    """
+    Extrae texto de un PDF página por página. Las páginas con capa de texto
+    embebida se leen directamente; solo las páginas escaneadas se rasterizan
+    (por ventanas pequeñas, para que la memoria no crezca con el documento) y
+    pasan por OCR. Con varios workers, el OCR de las páginas se ejecuta en
+    paralelo y los resultados se entregan igualmente en orden de página.
+
+    Las páginas leídas se guardan en la caché aunque el recorrido se
+    interrumpa (por ejemplo, por la salida temprana); la siguiente lectura
+    solo procesa las que faltan.
+
+    Args:
+        pdf_path: Ruta del archivo PDF a procesar
+        use_cache: Reutilizar resultados previos de la caché OCR
+        workers: Páginas procesadas a la vez (ver DOC_OCR_WORKERS; 1 = secuencial)
+        reverse: Entregar las páginas desde la última hacia la primera. Se
+            usa para detenerse pronto, así que las páginas se procesan de a una
 
-    for i, image in enumerate(images):
-        print(f"Procesando Página {i+1}...")
-        page_text = pytesseract.image_to_string(image)
-        full_text_list.extend(page_text.lower().split())
+    Returns:
+        Iterador de PageResult (página, tokens, camino usado, segundos) en orden
+    """
+    if not os.path.exists(pdf_path):
+        print(f"Error: El archivo {pdf_path} no existe")
+        return
+
+    cache = get_cache() if use_cache else None
+    cached = None
+    if cache is not None:
+        key = cache.make_key(pdf_path, _cache_settings())
+        cached = cache.get(key)
+        # Las páginas no leídas en un recorrido interrumpido quedan en None
+        if cached is not None and all(tokens is not None for tokens in cached):
+            print(f"OCR recuperado de caché ({len(cached)} páginas)")
+            numbered = list(enumerate(cached, start=1))
+            if reverse:
+                numbered.reverse()
+            for page, page_tokens in numbered:
+                yield PageResult(page, page_tokens, "cache")
+            return
+
+    # En reverso el consumidor puede detenerse tras cualquier página: procesar
+    # varias por adelantado sería OCR desperdiciado
+    workers = 1 if reverse else _resolve_workers(workers)
+    errors = []
+    total = None
+
+    # Páginas que no necesitan OCR: de la caché o con capa de texto
+    known = {}
+    if cached is not None:
+        total = len(cached)
+        for page, page_tokens in enumerate(cached, start=1):
+            if page_tokens is not None:
+                known[page] = PageResult(page, page_tokens, "cache")
+        print(f"OCR recuperado de caché ({len(known)} de {total} páginas)")
+
+    inicio = time.perf_counter()
+    texts = extract_text_layer(pdf_path) if DOC_TEXT_LAYER else []
+    if texts:
+        total = len(texts)
+        text_seconds = (time.perf_counter() - inicio) / len(texts)
+        con_texto = 0
+        for i, page_text in enumerate(texts):
+            if has_text_layer(page_text):
+                con_texto += 1
+                known.setdefault(i + 1, PageResult(i + 1, page_text.lower().split(), "texto", text_seconds))
+        metrics.observe("capa_texto", time.perf_counter() - inicio, "documento")
+        print(f"Páginas con texto embebido: {con_texto} de {len(texts)}")
+
+    if not known:
+        print(f"Convirtiendo páginas de {pdf_path}...")
+        results = _ocr_pages(_render_pages(pdf_path, workers, errors, reverse=reverse), workers)
+    else:
+        order = list(range(1, total + 1))
+        if reverse:
+            order.reverse()
+        ocr_pages = [p for p in order if p not in known]
+        if ocr_pages:
+            print(f"Convirtiendo {len(ocr_pages)} páginas escaneadas de {pdf_path}...")
+        scanned = _ocr_pages(_render_pages(pdf_path, workers, errors, ocr_pages, reverse), workers)
+        results = _merge_pages(order, known, scanned)
+
+    pages = {}
+    nuevas = 0
+    try:
+        for result in results:
+            pages[result.page] = result.tokens
+            if result.source != "cache":
+                nuevas += 1
+            yield result
+    finally:
+        # También al cerrar el generador antes del final
+        if cache is not None and nuevas and not errors and any(pages.values()):
+            _cache_pages(cache, key, pdf_path, pages, total)
+
+def _cache_pages(cache, key: str, pdf_path: str, pages: Dict[int, List[str]], total: Optional[int]) -> None:
+    if total is None:
+        try:
+            total = count_pdf_pages(pdf_path)
+        except Exception:
+            return
+    try:
+        cache.put(key, [pages.get(page) for page in range(1, total + 1)])
+    except OSError as e:
+        print(f"Aviso: No se pudo guardar el OCR en caché: {e}")
+
+def extract_text_from_pdf(
+    pdf_path: str,
+    use_cache: bool = True,
+    workers: Optional[int] = DOC_OCR_WORKERS
+    ) -> List[str]:
+    """
+    Extrae texto de un PDF y retorna una lista de tokens.
+
+    Args:
+        pdf_path: Ruta del archivo PDF a procesar
+        use_cache: Reutilizar resultados previos de la caché OCR
+        workers: Páginas procesadas a la vez (ver DOC_OCR_WORKERS; 1 = secuencial)
 
-    print(f"OCR Completo. Total de tokens: {len(full_text_list)}")
+    Returns:
+        Lista de tokens extraídos del PDF
+    """
+    full_text_list = []
+
+    sources = {}
+    for result in iter_text_from_pdf(pdf_path, use_cache, workers):
+        full_text_list.extend(result.tokens)
+        sources[result.source] = sources.get(result.source, 0) + 1
+
+    print(f"OCR Completo. Total de tokens: {len(full_text_list)} (páginas por camino: {sources})")
     return full_text_list
 
+def extract_key_values_from_pdf(
+    pdf_path: str,
+    keywords: List[str],
+    require_full_scan: bool = False,
+    look_ahead: int = 6,
+    use_cache: bool = True,
+    workers: Optional[int] = DOC_OCR_WORKERS,
+    on_page: Optional[Callable[[PageResult], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None
+    ) -> Dict[str, float]:
+    """
+    Extrae los pares clave-valor de un PDF recorriendo las páginas desde la
+    última y deteniéndose en cuanto todas las palabras clave tienen valor.
+    Como gana el último valor de cada clave, el resultado es idéntico al de
+    procesar el documento completo.
+
+    Args:
+        pdf_path: Ruta del archivo PDF a procesar
+        keywords: Palabras clave a buscar
+        require_full_scan: Procesar todas las páginas aunque ya haya valores
+        look_ahead: Ventana de búsqueda de valores (ver extract_key_values)
+        use_cache: Reutilizar resultados previos de la caché OCR
+        workers: Páginas procesadas a la vez con require_full_scan; desde la
+            última página se procesan de a una para no adelantar OCR inútil
+        on_page: Función llamada con cada PageResult procesado
+        should_stop: Se consulta entre páginas; si retorna True se deja de
+            procesar el documento y se retornan los valores encontrados hasta ahí
+
+    Returns:
+        Diccionario palabra clave -> valor
+    """
+    if require_full_scan:
+        tokens = []
+        pages = iter_text_from_pdf(pdf_path, use_cache, workers)
+        try:
+            for result in pages:
+                tokens.extend(result.tokens)
+                if on_page:
+                    on_page(result)
+                if should_stop and should_stop():
+                    print("Procesamiento del documento cancelado")
+                    break
+        finally:
+            pages.close()
+        with metrics.timer("extraccion", "documento"):
+            return extract_key_values(tokens, keywords, look_ahead)
+
+    # Los valores ya encontrados provienen de páginas posteriores y tienen prioridad
+    extractor = ReverseKeyValueExtractor(keywords, look_ahead)
+
+    pages = iter_text_from_pdf(pdf_path, use_cache, workers, reverse=True)
+    try:
+        for result in pages:
+            if on_page:
+                on_page(result)
+
+            with metrics.timer("extraccion", "documento"):
+                extractor.feed(result.tokens)
+
+            if extractor.complete():
+                if result.page > 1:
+                    print(f"Todas las palabras clave encontradas; se omiten {result.page - 1} páginas")
+                break
+            if should_stop and should_stop():
+                print("Procesamiento del documento cancelado")
+                break
+    finally:
+        pages.close()
+
+    return extractor.values()
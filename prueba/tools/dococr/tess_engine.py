@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config.settings import DOC_LANGUAGES, DOC_OCR_BACKEND
+from tools import metrics
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# Motores de tesserocr cargados y sin usar, por idioma
+_idle: Dict[str, List] = {}
+_lock = threading.Lock()
+_fallback_reason: Optional[str] = None
+
+
+def active_backend() -> str:
+    """
+    Retorna el motor de OCR que se usará: "tesserocr" (motor cargado en el
+    proceso y reutilizado) o "pytesseract" (un proceso de tesseract por página).
+    """
+    global _fallback_reason
+
+    if DOC_OCR_BACKEND == "pytesseract" or _fallback_reason is not None:
+        return "pytesseract"
+    if tesserocr is None:
+        if DOC_OCR_BACKEND == "tesserocr":
+            _fallback_reason = "tesserocr no está instalado"
+            print("Aviso: tesserocr no está instalado, se usará pytesseract")
+        return "pytesseract"
+    return "tesserocr"
+
+
+def _acquire_api(lang: str):
+    # PyTessBaseAPI no es seguro entre hilos, así que cada motor lo usa un
+    # hilo a la vez. Los motores libres quedan en el proceso y los toma el
+    # siguiente hilo que los necesite: sobreviven a los hilos y a los pools
+    # de cada documento, y solo se carga uno nuevo si todos están ocupados
+    with _lock:
+        libres = _idle.get(lang)
+        if libres:
+            return libres.pop()
+
+    inicio = time.perf_counter()
+    api = tesserocr.PyTessBaseAPI(lang=lang)
+    metrics.observe("carga_modelo", time.perf_counter() - inicio, "documento")
+    return api
+
+
+def _release_api(lang: str, api) -> None:
+    with _lock:
+        _idle.setdefault(lang, []).append(api)
+
+
+def image_to_string(image, lang: str = DOC_LANGUAGES) -> str:
+    """
+    Ejecuta OCR sobre una imagen PIL en memoria.
+
+    Args:
+        image: Imagen PIL a procesar
+        lang: Idiomas de Tesseract (por ejemplo "eng" o "spa+eng")
+
+    Returns:
+        Texto reconocido
+    """
+    global _fallback_reason
+
+    if active_backend() == "tesserocr":
+        try:
+            api = _acquire_api(lang)
+        except RuntimeError as e:
+            # Por ejemplo, datos de idioma no encontrados por la biblioteca
+            _fallback_reason = str(e)
+            print(f"Aviso: No se pudo iniciar tesserocr ({e}), se usará pytesseract")
+        else:
+            try:
+                api.SetImage(image)
+                return api.GetUTF8Text()
+            finally:
+                _release_api(lang, api)
+
+    import pytesseract
+    return pytesseract.image_to_string(image, lang=lang)
@@ -1,15 +1,29 @@
-import easyocr
+import multiprocessing
 import os
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 
-reader = easyocr.Reader(['es', 'en'])
+from config.settings import IMG_LANGUAGES, IMG_BATCH_WORKERS, IMG_BATCH_CHUNKSIZE
+from tools.imgocr.reader_registry import get_reader
+from tools.ocr_cache import get_cache
+from tools import metrics
 
-def extract_text_from_image(image_path: str) -> List[str]:
+def _cache_settings(languages: Sequence[str]) -> dict:
+    return {"engine": "easyocr", "languages": list(languages)}
+
+def _read_tokens(reader, image_path: str) -> List[str]:
+    result = reader.readtext(image_path, detail=0)
+    tokens = []
+    for text in result:
+        tokens.extend(text.lower().split())
+    return tokens
+
+def extract_text_from_image(image_path: str, use_cache: bool = True) -> List[str]:
     """
     Extrae texto de una imagen y retorna una lista de tokens.
 
     Args:
         image_path: Ruta de la imagen a procesar
+        use_cache: Reutilizar resultados previos de la caché OCR
 
     Returns:
         Lista de tokens extraídos de la imagen
@@ -19,10 +33,20 @@ def extract_text_from_image(image_path: str) -> List[str]:
         return []
 
     try:
-        result = reader.readtext(image_path, detail=0)
-        tokens = []
-        for text in result:
-            tokens.extend(text.lower().split())
+        cache = get_cache() if use_cache else None
+        if cache is not None:
+            key = cache.make_key(image_path, _cache_settings(IMG_LANGUAGES))
+            tokens = cache.get(key)
+            if tokens is not None:
+                print(f"Tokens extraídos de imagen (caché): {len(tokens)}")
+                return tokens
+
+        reader = get_reader()
+        with metrics.timer("ocr", "imagen"):
+            tokens = _read_tokens(reader, image_path)
+
+        if cache is not None and tokens:
+            cache.put(key, tokens)
 
         print(f"Tokens extraídos de imagen: {len(tokens)}")
         return tokens
@@ -30,3 +54,84 @@ def extract_text_from_image(image_path: str) -> List[str]:
         print(f"Error al procesar imagen: {e}")
         return []
 
+# Lector propio de cada proceso del pool, cargado una sola vez en _init_worker
+_worker_reader = None
+
+def _init_worker(languages: Sequence[str], single_thread: bool) -> None:
+    global _worker_reader
+
+    if single_thread:
+        # Evita que cada proceso use todos los núcleos y compitan entre sí
+        try:
+            import torch
+            torch.set_num_threads(1)
+        except ImportError:
+            pass
+
+    _worker_reader = get_reader(languages, idle_timeout=None)
+
+def _extract_worker(image_path: str) -> Tuple[str, List[str], dict]:
+    # Las métricas del proceso (carga del lector y OCR) viajan con cada
+    # resultado para que el proceso principal las sume
+    tokens = []
+    if not os.path.exists(image_path):
+        print(f"Error: La imagen {image_path} no existe")
+    else:
+        try:
+            with metrics.timer("ocr", "imagen"):
+                tokens = _read_tokens(_worker_reader, image_path)
+        except Exception as e:
+            print(f"Error al procesar imagen {image_path}: {e}")
+    return image_path, tokens, metrics.drain()
+
+def extract_text_from_images(
+    image_paths: Iterable[str],
+    workers: Optional[int] = IMG_BATCH_WORKERS,
+    chunksize: int = IMG_BATCH_CHUNKSIZE,
+    languages: Optional[Sequence[str]] = None,
+    use_cache: bool = True
+    ) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Extrae texto de varias imágenes en paralelo usando un pool de procesos.
+    Cada proceso carga EasyOCR una sola vez.
+
+    Args:
+        image_paths: Rutas de las imágenes a procesar
+        workers: Número de procesos (None = todos los núcleos)
+        chunksize: Imágenes enviadas a cada proceso por tarea
+        languages: Idiomas del lector (por defecto IMG_LANGUAGES)
+        use_cache: Reutilizar resultados previos de la caché OCR
+
+    Returns:
+        Iterador de tuplas (ruta, tokens) en el orden en que terminan
+    """
+    languages = list(languages or IMG_LANGUAGES)
+    cache = get_cache() if use_cache else None
+    keys = {}
+    pending = []
+
+    # Las imágenes ya procesadas se entregan sin pasar por el pool
+    for image_path in image_paths:
+        if cache is not None and os.path.exists(image_path):
+            keys[image_path] = cache.make_key(image_path, _cache_settings(languages))
+            tokens = cache.get(keys[image_path])
+            if tokens is not None:
+                yield image_path, tokens
+                continue
+        pending.append(image_path)
+
+    if not pending:
+        return
+
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+
+    # spawn evita heredar hilos de Qt o de torch del proceso principal
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(processes=workers,
+                  initializer=_init_worker,
+                  initargs=(languages, workers > 1)) as pool:
+        for image_path, tokens, metricas in pool.imap_unordered(_extract_worker, pending, chunksize):
+            metrics.merge(metricas)
+            if cache is not None and tokens and image_path in keys:
+                cache.put(keys[image_path], tokens)
+            yield image_path, tokens
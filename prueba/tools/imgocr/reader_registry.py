@@ -0,0 +1,147 @@
+import gc
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+from config.settings import IMG_LANGUAGES, READER_IDLE_TIMEOUT
+from tools import metrics
+
+
+class _ReaderEntry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reader = None
+        self.last_used = 0.0
+        self.idle_timeout: Optional[float] = None
+        self.timer: Optional[threading.Timer] = None
+
+
+_entries: Dict[Tuple[str, ...], _ReaderEntry] = {}
+_entries_lock = threading.Lock()
+
+
+def _language_key(languages: Optional[Sequence[str]]) -> Tuple[str, ...]:
+    return tuple(languages) if languages else tuple(IMG_LANGUAGES)
+
+
+def _get_entry(key: Tuple[str, ...]) -> _ReaderEntry:
+    with _entries_lock:
+        entry = _entries.get(key)
+        if entry is None:
+            entry = _ReaderEntry()
+            _entries[key] = entry
+        return entry
+
+
+def get_reader(
+    languages: Optional[Sequence[str]] = None,
+    idle_timeout: Optional[float] = READER_IDLE_TIMEOUT
+    ):
+    """
+    Retorna el lector de EasyOCR compartido para un conjunto de idiomas,
+    construyéndolo en el primer uso.
+
+    Args:
+        languages: Idiomas del lector (por defecto IMG_LANGUAGES)
+        idle_timeout: Segundos sin uso antes de liberar el lector (None = nunca)
+
+    Returns:
+        Instancia de easyocr.Reader
+    """
+    key = _language_key(languages)
+    entry = _get_entry(key)
+
+    with entry.lock:
+        if entry.reader is None:
+            import easyocr
+
+            print(f"Cargando modelo EasyOCR {list(key)}...")
+            inicio = time.perf_counter()
+            entry.reader = easyocr.Reader(list(key))
+            segundos = time.perf_counter() - inicio
+            metrics.observe("carga_modelo", segundos, "imagen")
+            print(f"Modelo EasyOCR cargado en {segundos:.2f}s")
+
+        entry.last_used = time.monotonic()
+        entry.idle_timeout = idle_timeout
+        if idle_timeout is not None and entry.timer is None:
+            _schedule_release(key, entry, idle_timeout)
+
+        return entry.reader
+
+
+def warm_up(languages: Optional[Sequence[str]] = None) -> threading.Thread:
+    """
+    Construye el lector en segundo plano para que el primer OCR no espere
+    la carga del modelo.
+
+    Args:
+        languages: Idiomas del lector (por defecto IMG_LANGUAGES)
+
+    Returns:
+        Hilo que realiza la carga
+    """
+    def _cargar():
+        try:
+            get_reader(languages)
+        except Exception as e:
+            print(f"Error al precargar EasyOCR: {e}")
+
+    hilo = threading.Thread(target=_cargar, name="easyocr-warmup", daemon=True)
+    hilo.start()
+    return hilo
+
+
+def is_loaded(languages: Optional[Sequence[str]] = None) -> bool:
+    entry = _entries.get(_language_key(languages))
+    return entry is not None and entry.reader is not None
+
+
+def release(languages: Optional[Sequence[str]] = None) -> None:
+    """Libera el lector de un conjunto de idiomas si está cargado."""
+    entry = _entries.get(_language_key(languages))
+    if entry is None:
+        return
+
+    with entry.lock:
+        _drop(entry)
+
+
+def release_all() -> None:
+    """Libera todos los lectores cargados."""
+    with _entries_lock:
+        entries = list(_entries.values())
+
+    for entry in entries:
+        with entry.lock:
+            _drop(entry)
+
+
+def _drop(entry: _ReaderEntry) -> None:
+    if entry.timer is not None:
+        entry.timer.cancel()
+        entry.timer = None
+
+    if entry.reader is not None:
+        entry.reader = None
+        gc.collect()
+
+
+def _schedule_release(key: Tuple[str, ...], entry: _ReaderEntry, delay: float) -> None:
+    entry.timer = threading.Timer(delay, _release_if_idle, args=(key, entry))
+    entry.timer.daemon = True
+    entry.timer.start()
+
+
+def _release_if_idle(key: Tuple[str, ...], entry: _ReaderEntry) -> None:
+    with entry.lock:
+        entry.timer = None
+        if entry.reader is None or entry.idle_timeout is None:
+            return
+
+        idle = time.monotonic() - entry.last_used
+        if idle >= entry.idle_timeout:
+            print(f"Liberando modelo EasyOCR {list(key)} tras {idle:.0f}s sin uso")
+            _drop(entry)
+        else:
+            _schedule_release(key, entry, entry.idle_timeout - idle)
@@ -0,0 +1,333 @@
+import json
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Registro de solo-anexado: una extracción JSON por línea
+DATA_PATH = "data.jsonl"
+
+# Formato anterior {"extracciones": [...]}, migrado automáticamente
+LEGACY_DATA_PATH = "data.json"
+
+_migrated = set()
+_migrate_lock = threading.Lock()
+
+def _encode(entrada: Dict) -> bytes:
+    return (json.dumps(entrada, ensure_ascii=False) + "\n").encode("utf-8")
+
+def _append_bytes(data: bytes, path: str) -> None:
+    # Una sola escritura con O_APPEND: cada línea queda completa aunque otra
+    # instancia escriba a la vez, y fsync la hace durable antes de retornar
+    fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        # Si una escritura anterior quedó cortada, empezar en una línea nueva
+        size = os.fstat(fd).st_size
+        if size and os.pread(fd, 1, size - 1) != b"\n":
+            data = b"\n" + data
+        os.write(fd, data)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def append_entry(entrada: Dict, path: str = DATA_PATH) -> None:
+    """Agrega una entrada al final del registro. El costo no depende del historial."""
+    _ensure_migrated(path)
+    _append_bytes(_encode(entrada), path)
+
+def append_entries(entradas: List[Dict], path: str = DATA_PATH) -> None:
+    """Agrega varias entradas con una sola escritura y un solo fsync."""
+    if not entradas:
+        return
+    _ensure_migrated(path)
+    _append_bytes(b"".join(_encode(e) for e in entradas), path)
+
+def _read_lines(path: str, inicio: int = 0, fin: Optional[int] = None) -> Iterator[Tuple[Optional[Dict], int, int]]:
+    # Produce (entrada, inicio de la línea, posición tras la línea) para cada
+    # línea completa entre inicio y fin. Una línea sin salto final puede
+    # estar escribiéndose y se deja para la siguiente lectura
+    with open(path, "rb") as f:
+        f.seek(inicio)
+        posicion = inicio
+        for linea in f:
+            if not linea.endswith(b"\n"):
+                break
+            comienzo = posicion
+            posicion += len(linea)
+            if fin is not None and posicion > fin:
+                break
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                yield json.loads(linea), comienzo, posicion
+            except ValueError:
+                print(f"Aviso: Línea dañada en {path} (termina en el byte {posicion}), se omite")
+                yield None, comienzo, posicion
+
+def iter_entries(path: str = DATA_PATH, corte: Optional[Tuple] = None) -> Iterator[Dict]:
+    """
+    Lee las extracciones guardadas una a una, sin cargar todo el archivo.
+    Una línea incompleta (por ejemplo, tras un corte durante la escritura)
+    se omite sin afectar al resto.
+
+    Args:
+        corte: Cursor de snapshot(); solo se leen las entradas anteriores a él
+    """
+    _ensure_migrated(path)
+    if not os.path.exists(path):
+        return
+
+    fin = None if corte is None else corte[1]
+    for entrada, _, _ in _read_lines(path, 0, fin):
+        if entrada is not None:
+            yield entrada
+
+def snapshot(path: str = DATA_PATH) -> Tuple:
+    """
+    Cursor que identifica el estado actual del registro: (identidad, tamaño).
+    La identidad combina el inodo y el inicio del archivo, para distinguir un
+    registro vaciado y vuelto a crear aunque el sistema reutilice el inodo.
+    Obtenerlo cuesta un stat y una lectura de pocos bytes.
+    """
+    _ensure_migrated(path)
+    try:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            return ((st.st_ino, f.read(64)), st.st_size)
+    except FileNotFoundError:
+        return (None, 0)
+
+def read_since(cursor: Tuple, path: str = DATA_PATH) -> Tuple[Optional[List[Dict]], Tuple]:
+    """
+    Lee solo las entradas agregadas después de cursor.
+
+    Returns:
+        (nuevas, cursor actualizado). nuevas es None si el registro se
+        reescribió o se borró desde entonces y hay que leerlo completo.
+    """
+    identidad, inicio = cursor
+    actual = snapshot(path)
+    if actual[0] is None:
+        return (None, actual) if inicio else ([], cursor)
+    if identidad is None:
+        inicio = 0
+    elif actual[0][0] != identidad[0] or not actual[0][1].startswith(identidad[1]) \
+            or actual[1] < inicio:
+        return None, actual
+
+    nuevas = []
+    posicion = inicio
+    for entrada, _, posicion in _read_lines(path, inicio):
+        if entrada is not None:
+            nuevas.append(entrada)
+    return nuevas, (actual[0], posicion)
+
+def entry_matches(
+    entrada: Dict,
+    fuente: Optional[str] = None,
+    desde: Optional[str] = None,
+    hasta: Optional[str] = None,
+    clave: Optional[str] = None,
+    valor_min: Optional[float] = None,
+    valor_max: Optional[float] = None
+    ) -> bool:
+    """Aplica a una entrada los mismos filtros que query_entries."""
+    if fuente is not None and entrada.get("fuente") != fuente:
+        return False
+    fecha = entrada.get("fecha", "")
+    if desde is not None and fecha < desde:
+        return False
+    if hasta is not None and fecha >= hasta:
+        return False
+
+    if clave is None and valor_min is None and valor_max is None:
+        return True
+
+    datos = entrada.get("datos", {})
+    valores = [datos[clave]] if clave is not None and clave in datos else (
+        [] if clave is not None else list(datos.values()))
+    return any(
+        (valor_min is None or v >= valor_min) and (valor_max is None or v <= valor_max)
+        for v in valores
+    )
+
+class _LineIndex:
+    """
+    Posiciones (byte de inicio) de las líneas que cumplen unos filtros, en
+    orden de inserción. Como el registro solo crece, al actualizarlo se leen
+    únicamente las líneas agregadas desde la vez anterior.
+    """
+
+    def __init__(self, filtros: Dict):
+        self.filtros = filtros
+        self.identidad = None
+        self.fin = 0
+        self.posiciones = array("q")
+        # Si las fechas no bajan nunca, ordenar por fecha es el orden de inserción
+        self.fechas_crecientes = True
+        self._ultima_fecha = ""
+
+    def update(self, path: str, actual: Tuple) -> None:
+        identidad, tamano = actual
+        if self.identidad is not None and (identidad is None or identidad[0] != self.identidad[0]
+                                           or not identidad[1].startswith(self.identidad[1])
+                                           or tamano < self.fin):
+            # Registro vaciado o reescrito: empezar de nuevo
+            self.__init__(self.filtros)
+        self.identidad = identidad
+        if identidad is None or tamano == self.fin:
+            return
+
+        for entrada, comienzo, posicion in _read_lines(path, self.fin):
+            self.fin = posicion
+            if entrada is None or not entry_matches(entrada, **self.filtros):
+                continue
+            self.posiciones.append(comienzo)
+            fecha = entrada.get("fecha") or ""
+            if fecha < self._ultima_fecha:
+                self.fechas_crecientes = False
+            self._ultima_fecha = fecha
+
+# Índices por (registro, filtros); los menos usados se descartan
+_MAX_INDICES = 16
+_indices: "OrderedDict[Tuple, _LineIndex]" = OrderedDict()
+_indices_lock = threading.Lock()
+
+def _line_positions(path: str, corte: Optional[Tuple], filtros: Dict) -> Tuple[array, bool]:
+    # Posiciones de las líneas que cumplen los filtros (hasta corte) y si
+    # están además en orden de fecha
+    clave = (os.path.abspath(path), tuple(sorted(filtros.items())))
+    actual = snapshot(path)
+    with _indices_lock:
+        indice = _indices.get(clave)
+        if indice is None:
+            indice = _indices[clave] = _LineIndex(filtros)
+            if len(_indices) > _MAX_INDICES:
+                _indices.popitem(last=False)
+        else:
+            _indices.move_to_end(clave)
+        indice.update(path, actual)
+
+        posiciones = indice.posiciones
+        if corte is not None:
+            posiciones = posiciones[:bisect_left(posiciones, corte[1])]
+        else:
+            posiciones = posiciones[:]
+        return posiciones, indice.fechas_crecientes
+
+def _read_at(path: str, posiciones: Iterable[int]) -> List[Dict]:
+    entradas = []
+    with open(path, "rb") as f:
+        for posicion in posiciones:
+            f.seek(posicion)
+            entradas.append(json.loads(f.readline()))
+    return entradas
+
+# Columnas por las que se puede ordenar una consulta
+SORT_COLUMNS = ("fecha", "fuente", "archivo")
+
+def query_entries(
+    path: str = DATA_PATH,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    orden: Optional[str] = None,
+    descendente: bool = False,
+    corte: Optional[Tuple] = None,
+    **filtros
+    ) -> List[Dict]:
+    """
+    Retorna las entradas que cumplen los filtros. En orden de inserción (y
+    por fecha, que en el registro es el mismo orden) una página solo lee
+    sus propias líneas, en cualquier sentido, gracias a un índice de
+    posiciones que se actualiza con las líneas nuevas. Los demás órdenes
+    recorren el registro.
+    """
+    if orden is not None and orden not in SORT_COLUMNS:
+        raise ValueError(f"No se puede ordenar por {orden}")
+
+    _ensure_migrated(path)
+    if not os.path.exists(path):
+        return []
+
+    if orden in (None, "fecha"):
+        posiciones, fechas_crecientes = _line_positions(path, corte, filtros)
+        if orden is None or fechas_crecientes:
+            if descendente:
+                posiciones = posiciones[::-1]
+            fin = None if limit is None else offset + limit
+            return _read_at(path, posiciones[offset:fin])
+
+    entradas = [e for e in iter_entries(path, corte) if entry_matches(e, **filtros)]
+    if descendente:
+        # Invertir primero mantiene el desempate por inserción también invertido
+        entradas.reverse()
+    if orden is not None:
+        entradas.sort(key=lambda e: e.get(orden) or "", reverse=descendente)
+    fin = None if limit is None else offset + limit
+    return entradas[offset:fin]
+
+def count(path: str = DATA_PATH, corte: Optional[Tuple] = None, **filtros) -> int:
+    """Número de extracciones que cumplen los filtros de query_entries (sin releer el registro)."""
+    _ensure_migrated(path)
+    if not os.path.exists(path):
+        return 0
+    return len(_line_positions(path, corte, filtros)[0])
+
+def exists(path: str = DATA_PATH) -> bool:
+    _ensure_migrated(path)
+    return os.path.exists(path)
+
+def clear(path: str = DATA_PATH) -> None:
+    """Elimina todas las extracciones guardadas."""
+    if os.path.exists(path):
+        os.remove(path)
+    if path == DATA_PATH and os.path.exists(LEGACY_DATA_PATH):
+        os.remove(LEGACY_DATA_PATH)
+
+def prepare(path: str = DATA_PATH) -> None:
+    """Migra el data.json anterior si hace falta; la aplicación lo llama al iniciar desde un hilo aparte."""
+    _ensure_migrated(path)
+
+def _ensure_migrated(path: str) -> None:
+    # Solo el almacén por defecto hereda el data.json de la aplicación
+    if path == DATA_PATH:
+        migrate_legacy(path)
+
+def migrate_legacy(path: str = DATA_PATH, legacy_path: str = LEGACY_DATA_PATH) -> bool:
+    """
+    Convierte una sola vez el data.json anterior al registro por líneas. El
+    archivo original se conserva renombrado como data.json.migrado.
+
+    Returns:
+        True si se realizó la migración
+    """
+    if path in _migrated:
+        return False
+
+    with _migrate_lock:
+        if path in _migrated:
+            return False
+        if os.path.exists(path) or not os.path.exists(legacy_path):
+            _migrated.add(path)
+            return False
+
+        # Si la lectura falla (archivo dañado o bloqueado) el error se propaga
+        # y se vuelve a intentar en la próxima operación, en lugar de dejar
+        # el historial vacío en silencio
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            entradas = json.load(f).get("extracciones", [])
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(_encode(e) for e in entradas))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        _migrated.add(path)
+        os.replace(legacy_path, f"{legacy_path}.migrado")
+
+    print(f"Migradas {len(entradas)} extracciones de {legacy_path} a {path}")
+    return True
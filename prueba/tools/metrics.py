@@ -0,0 +1,183 @@
+"""
+Instrumentación local: duración de cada etapa del procesamiento (carga de
+modelos, rasterizado, OCR, extracción, guardado, refresco de la interfaz) y
+contadores de eventos, separados por tipo de fuente.
+
+Los tiempos se guardan por (etapa, fuente) con su cantidad, suma y una
+ventana de las últimas METRICS_WINDOW muestras para calcular p50/p95/p99.
+write_metrics() exporta todo en formato de texto de Prometheus.
+"""
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import METRICS_ENABLED, METRICS_PATH, METRICS_WINDOW
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Fuente usada cuando la etapa no depende del tipo de archivo
+GENERAL = "general"
+
+
+class _Series:
+    __slots__ = ("count", "total", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=METRICS_WINDOW)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def quantiles(self) -> Dict[float, float]:
+        ordered = sorted(self.recent)
+        if not ordered:
+            return {q: 0.0 for q in QUANTILES}
+        # Rango más cercano sobre la ventana de muestras recientes
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+
+_lock = threading.Lock()
+_timings: Dict[Tuple[str, str], _Series] = {}
+_counters: Dict[Tuple[str, str], float] = {}
+
+
+def observe(stage: str, seconds: float, fuente: Optional[str] = None) -> None:
+    """Registra la duración de una etapa."""
+    if not METRICS_ENABLED:
+        return
+    key = (stage, fuente or GENERAL)
+    with _lock:
+        series = _timings.get(key)
+        if series is None:
+            series = _timings[key] = _Series()
+        series.add(seconds)
+
+
+@contextmanager
+def timer(stage: str, fuente: Optional[str] = None):
+    """Mide el bloque con observe(); si hay una excepción no se registra."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    inicio = time.perf_counter()
+    yield
+    observe(stage, time.perf_counter() - inicio, fuente)
+
+
+def increment(event: str, fuente: Optional[str] = None, value: float = 1) -> None:
+    """Suma value al contador de un evento."""
+    if not METRICS_ENABLED:
+        return
+    key = (event, fuente or GENERAL)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def snapshot() -> List[Dict]:
+    """Filas (etapa, fuente, cantidad, total, p50, p95, p99) ordenadas por tiempo total."""
+    with _lock:
+        items = [(key, series.count, series.total, series.quantiles())
+                 for key, series in _timings.items()]
+
+    filas = [{"etapa": stage, "fuente": fuente, "cantidad": count, "total_s": total,
+              "p50": q[0.5], "p95": q[0.95], "p99": q[0.99]}
+             for (stage, fuente), count, total, q in items]
+    filas.sort(key=lambda f: f["total_s"], reverse=True)
+    return filas
+
+
+def counters() -> Dict[Tuple[str, str], float]:
+    with _lock:
+        return dict(_counters)
+
+
+def drain() -> Dict:
+    """
+    Retorna lo registrado en este proceso y lo reinicia. Los procesos de un
+    pool lo envían con cada resultado para que el proceso principal lo sume
+    con merge().
+    """
+    global _timings, _counters
+    with _lock:
+        timings, _timings = _timings, {}
+        counts, _counters = _counters, {}
+    return {
+        "tiempos": [(key, s.count, s.total, list(s.recent)) for key, s in timings.items()],
+        "contadores": list(counts.items()),
+    }
+
+
+def merge(data: Dict) -> None:
+    """Suma lo obtenido con drain() en otro proceso."""
+    if not METRICS_ENABLED or not data:
+        return
+    with _lock:
+        for key, count, total, recent in data["tiempos"]:
+            key = tuple(key)
+            series = _timings.get(key)
+            if series is None:
+                series = _timings[key] = _Series()
+            series.count += count
+            series.total += total
+            series.recent.extend(recent)
+        for key, value in data["contadores"]:
+            key = tuple(key)
+            _counters[key] = _counters.get(key, 0) + value
+
+
+def reset() -> None:
+    drain()
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def render_prometheus() -> str:
+    """Métricas en formato de texto de Prometheus."""
+    lineas = [
+        "# HELP optimax_etapa_segundos Duración de cada etapa del procesamiento",
+        "# TYPE optimax_etapa_segundos summary",
+    ]
+    with _lock:
+        timings = sorted((key, s.count, s.total, s.quantiles()) for key, s in _timings.items())
+        counts = sorted(_counters.items())
+
+    for (stage, fuente), count, total, quantiles in timings:
+        etiquetas = f'etapa="{_label(stage)}",fuente="{_label(fuente)}"'
+        for q, valor in quantiles.items():
+            lineas.append(f'optimax_etapa_segundos{{{etiquetas},quantile="{q}"}} {valor:.6f}')
+        lineas.append(f"optimax_etapa_segundos_sum{{{etiquetas}}} {total:.6f}")
+        lineas.append(f"optimax_etapa_segundos_count{{{etiquetas}}} {count}")
+
+    lineas.append("# HELP optimax_eventos_total Eventos contados por tipo de fuente")
+    lineas.append("# TYPE optimax_eventos_total counter")
+    for (event, fuente), value in counts:
+        lineas.append(f'optimax_eventos_total{{evento="{_label(event)}",fuente="{_label(fuente)}"}} {value:g}')
+    return "\n".join(lineas) + "\n"
+
+
+def write_metrics(path: str = METRICS_PATH) -> Optional[str]:
+    """
+    Escribe las métricas en un archivo de texto de Prometheus (por ejemplo,
+    para el textfile collector de node_exporter).
+
+    Returns:
+        Ruta escrita, o None si las métricas están desactivadas
+    """
+    if not METRICS_ENABLED or not path:
+        return None
+    contenido = render_prometheus()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(contenido)
+    # Reemplazo atómico: quien lea el archivo nunca lo ve a medio escribir
+    os.replace(tmp_path, path)
+    return path
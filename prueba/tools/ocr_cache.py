@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from config.settings import OCR_CACHE_ENABLED, OCR_CACHE_DIR, OCR_CACHE_MAX_BYTES
+from tools import metrics
+
+_READ_BLOCK = 1024 * 1024
+
+
+class OCRCache:
+    """
+    Caché en disco de resultados OCR direccionada por contenido.
+
+    La clave es el hash del contenido del archivo más los parámetros de OCR,
+    de modo que renombrar o mover un archivo no invalida la entrada y cambiar
+    idiomas, DPI o motor sí lo hace. Las entradas menos usadas recientemente
+    se eliminan cuando el tamaño total supera max_bytes.
+    """
+
+    def __init__(self, directory: str = OCR_CACHE_DIR, max_bytes: int = OCR_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def make_key(self, file_path: str, settings: Dict[str, Any]) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(_READ_BLOCK), b""):
+                digest.update(block)
+        digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            metrics.increment("cache_ocr_fallo")
+            return None
+
+        # Actualizar la fecha de acceso para el orden LRU
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+        metrics.increment("cache_ocr_acierto")
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+
+        with self._lock:
+            # Al sobrescribir una clave, su tamaño anterior deja de contar
+            try:
+                old_size = os.path.getsize(path)
+            except OSError:
+                old_size = 0
+            os.replace(tmp_path, path)
+
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += os.path.getsize(path) - old_size
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in self._entries():
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            size = self._size if self._size is not None else self._scan_size()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _entries(self):
+        try:
+            return [e for e in os.scandir(self.directory)
+                    if e.is_file() and e.name.endswith(".json")]
+        except FileNotFoundError:
+            return []
+
+    def _scan_size(self) -> int:
+        return sum(e.stat().st_size for e in self._entries())
+
+    def _evict(self) -> None:
+        # Eliminar primero las entradas con el acceso más antiguo
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+        size = sum(e.stat().st_size for e in entries)
+
+        for entry in entries:
+            if size <= self.max_bytes:
+                break
+            try:
+                entry_size = entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                continue
+            size -= entry_size
+            self.evictions += 1
+
+        self._size = size
+
+
+_default_cache: Optional[OCRCache] = None
+
+
+def get_cache() -> Optional[OCRCache]:
+    """Retorna la caché compartida, o None si está desactivada en la configuración."""
+    global _default_cache
+
+    if not OCR_CACHE_ENABLED:
+        return None
+    if _default_cache is None:
+        _default_cache = OCRCache()
+    return _default_cache
@@ -0,0 +1,443 @@
+"""
+Pipeline de extracción por etapas: fuente → tokenizador → extractor → destino.
+
+Cada etapa es un generador que recibe los elementos de la anterior y produce
+los suyos a medida que los tiene, así ningún paso espera a que el anterior
+termine el archivo completo. Las etapas corren en hilos propios unidas por
+colas acotadas (PIPELINE_QUEUE_SIZE): mientras el extractor procesa la
+página N el tokenizador ya hace el OCR de la página N+1, y si una etapa se
+atrasa la cola se llena y la anterior espera (contrapresión).
+
+El consumidor es quien recorre el pipeline, en su propio hilo: un QThread de
+la interfaz, cli.py o cualquier servicio.
+
+    for resultado in extraction_pipeline(documents(rutas, "imagen")):
+        if not resultado.parcial:
+            print(resultado.ruta, resultado.datos)
+"""
+import os
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from config.keywords import keywords_list
+from config.settings import AUDIO_VAD_ENABLED, DOC_OCR_WORKERS, PIPELINE_QUEUE_SIZE
+from tools import metrics, profiling
+
+
+class Document(NamedTuple):
+    """Archivo a procesar (lo produce la fuente)."""
+    ruta: str
+    fuente: str
+
+
+class Tokens(NamedTuple):
+    """
+    Tokens de una parte del documento: una imagen, una página o un segmento
+    de audio. Cada documento termina con un elemento fin=True sin tokens,
+    que lleva el error si lo hubo.
+    """
+    ruta: str
+    fuente: str
+    parte: Optional[int]
+    tokens: List[str]
+    # Camino usado en los PDF: "texto", "ocr" o "cache"
+    camino: Optional[str] = None
+    segundos: float = 0.0
+    fin: bool = False
+    error: Optional[str] = None
+
+
+class Extraction(NamedTuple):
+    """
+    Valores extraídos de un documento. Se produce uno parcial por cada parte
+    procesada (con esa parte en self.parte) y uno final por documento.
+    """
+    ruta: str
+    fuente: str
+    datos: Dict[str, float]
+    total_tokens: int
+    parcial: bool
+    parte: Optional[Tokens] = None
+    error: Optional[str] = None
+
+
+# Una etapa recibe los elementos de la anterior y el pipeline (para consultar
+# stopped o marcar documentos con skip) y produce los suyos
+Stage = Callable[[Iterator, "Pipeline"], Iterator]
+
+_END = object()
+
+
+class Pipeline:
+    """
+    Ejecuta una fuente y una serie de etapas conectadas por colas acotadas.
+    Recorrer el pipeline lo inicia y entrega la salida de la última etapa;
+    si una etapa falla, se detienen todas y el error se relanza al
+    consumidor. Se puede recorrer una sola vez.
+    """
+
+    def __init__(self, source: Iterable, *stages: Stage, queue_size: int = PIPELINE_QUEUE_SIZE):
+        self.source = source
+        self.stages = stages
+        self.queue_size = queue_size
+        self._stop = threading.Event()
+        # Estado de salida temprana por documento: los marcados con skip() y
+        # las partes que ya procesó la etapa que decide
+        self._skipped = set()
+        self._parts_done: Dict[str, int] = {}
+        self._verdicts = threading.Condition()
+        self._error: Optional[BaseException] = None
+        self._started = False
+
+    def stop(self) -> None:
+        """Pide detener todas las etapas; cada una termina en su próximo elemento."""
+        self._stop.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def skip(self, ruta: str) -> None:
+        """Indica a las etapas anteriores que el resto de ese documento ya no hace falta."""
+        with self._verdicts:
+            self._skipped.add(ruta)
+
+    def is_skipped(self, ruta: str) -> bool:
+        with self._verdicts:
+            return ruta in self._skipped
+
+    def part_done(self, ruta: str) -> None:
+        """La etapa que decide skip() terminó de evaluar una parte más de ruta."""
+        with self._verdicts:
+            self._parts_done[ruta] = self._parts_done.get(ruta, 0) + 1
+            self._verdicts.notify_all()
+
+    def wait_parts(self, ruta: str, partes: int) -> None:
+        """Espera a que se hayan evaluado partes partes de ruta (o a que se detenga el pipeline)."""
+        with self._verdicts:
+            while self._parts_done.get(ruta, 0) < partes and not self._stop.is_set():
+                self._verdicts.wait(0.1)
+
+    def forget(self, ruta: str) -> None:
+        """Descarta el estado de salida temprana de ruta al terminar el documento."""
+        with self._verdicts:
+            self._skipped.discard(ruta)
+            self._parts_done.pop(ruta, None)
+
+    def _fail(self, error: BaseException) -> None:
+        if self._error is None:
+            self._error = error
+        self.stop()
+
+    def _put(self, cola: queue.Queue, item) -> bool:
+        try:
+            cola.put_nowait(item)
+            return True
+        except queue.Full:
+            metrics.increment("pipeline_contrapresion")
+        while not self._stop.is_set():
+            try:
+                cola.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _drain(self, cola: queue.Queue) -> Iterator:
+        while True:
+            try:
+                item = cola.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            if item is _END:
+                return
+            yield item
+
+    def _work(self, items: Iterable, cola: queue.Queue) -> None:
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if not self._put(cola, item):
+                    break
+        except Exception as e:
+            self._fail(e)
+        finally:
+            # Cierra el generador para que libere lo que tenga abierto
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            self._put(cola, _END)
+
+    def __iter__(self) -> Iterator:
+        if self._started:
+            raise RuntimeError("El pipeline ya se ejecutó")
+        self._started = True
+
+        if self.queue_size <= 0:
+            # Sin colas: generadores encadenados en el hilo del consumidor
+            items = iter(self.source)
+            for stage in self.stages:
+                items = stage(items, self)
+            yield from items
+            return
+
+        # Un hilo para la fuente y uno por etapa; cada uno escribe en su cola
+        # y la etapa siguiente lee de ella
+        hilos = []
+        cola = None
+        for stage in (None,) + self.stages:
+            items = self.source if stage is None else stage(self._drain(cola), self)
+            cola = queue.Queue(maxsize=self.queue_size)
+            hilos.append(threading.Thread(target=self._work, args=(items, cola), daemon=True,
+                                          name=f"pipeline-{getattr(stage, '__name__', 'fuente')}"))
+
+        for hilo in hilos:
+            hilo.start()
+        try:
+            yield from self._drain(cola)
+        finally:
+            self.stop()
+            for hilo in hilos:
+                hilo.join()
+        if self._error is not None:
+            raise self._error
+
+    def run(self, sink: Callable[[object], None]) -> None:
+        """Recorre el pipeline entregando cada resultado a sink."""
+        for item in self:
+            sink(item)
+
+
+def documents(rutas: Iterable[str], fuente: str) -> Iterator[Document]:
+    """Fuente simple: una lista de archivos del mismo tipo."""
+    for ruta in rutas:
+        yield Document(ruta, fuente)
+
+
+def microphone(should_stop: Callable[[], bool],
+               on_partial: Optional[Callable[[List[str]], None]] = None,
+               on_stats: Optional[Callable[[Dict], None]] = None) -> Iterator[Tokens]:
+    """
+    Fuente del micrófono: produce los Tokens de cada segmento que Vosk
+    reconoce mientras se habla. Entrega Tokens, no Documents, así que va
+    directo al extractor: Pipeline(microphone(...), extractor()). Cuando
+    should_stop() retorna True decodifica lo que quedó en el buffer de
+    captura y cierra la grabación con un elemento fin=True.
+
+    La grabación no tiene archivo (ruta vacía), así que storage_sink la
+    guarda sin nombre de origen. on_partial recibe la hipótesis del segmento
+    en curso y on_stats, al terminar, los contadores de la captura y de la
+    compuerta de voz.
+    """
+    from tools.audio.audio_extraction import CHUNK_SIZE, SAMPLE_RATE, pooled_recognizer, result_tokens
+    from tools.audio.capture import open_capture
+    from tools.audio.vad import EnergyVad
+
+    # Los silencios no llegan al reconocedor (ver EnergyVad)
+    vad = EnergyVad(SAMPLE_RATE) if AUDIO_VAD_ENABLED else None
+    capture = open_capture(SAMPLE_RATE, CHUNK_SIZE)
+
+    def decode(recognizer, data: bytes) -> Iterator[List[str]]:
+        # Tokens de cada segmento que se cierra con este bloque (vacíos si no
+        # se reconoció nada, para que los valores dejen de ser provisionales)
+        pieces = vad.process(data) if vad is not None else [(data, False)]
+        for audio, ended in pieces:
+            if audio:
+                with metrics.timer("decodificacion", "audio"):
+                    aceptado = recognizer.AcceptWaveform(audio)
+                if aceptado:
+                    yield result_tokens(recognizer.Result())
+                elif on_partial is not None:
+                    on_partial(result_tokens(recognizer.PartialResult(), "partial"))
+            if ended:
+                # Fin de un tramo de voz: cerrar el segmento como lo haría el silencio omitido
+                yield result_tokens(recognizer.FinalResult())
+
+    partes = 0
+    try:
+        # Modelo y gramática ya cargados (ver warm_up): la captura empieza de inmediato
+        with pooled_recognizer(SAMPLE_RATE) as recognizer:
+            capture.start()
+            while not should_stop():
+                try:
+                    data = capture.read()
+                except Exception:
+                    # Un error de lectura del micrófono no corta la grabación
+                    continue
+                if not data:
+                    continue
+                for tokens in decode(recognizer, data):
+                    partes += 1
+                    yield Tokens("", "audio", partes, tokens)
+
+            # Lo que quedó en el buffer al detener también se decodifica
+            capture.stop()
+            while True:
+                data = capture.read()
+                if not data:
+                    break
+                for tokens in decode(recognizer, data):
+                    partes += 1
+                    yield Tokens("", "audio", partes, tokens)
+            partes += 1
+            yield Tokens("", "audio", partes, result_tokens(recognizer.FinalResult()))
+    finally:
+        capture.close()
+
+    stats = capture.stats()
+    if vad is not None:
+        stats.update(vad.stats())
+        metrics.increment("silencio_omitido_segundos", "audio", stats["omitido_s"])
+    metrics.increment("desbordamientos_captura", "audio", stats.get("desbordamientos", 0))
+    if stats:
+        print(f"Estadísticas de captura: {stats}")
+        if on_stats is not None:
+            on_stats(stats)
+    yield Tokens("", "audio", None, [], fin=True)
+
+
+def tokenizer(use_cache: bool = True, workers: Optional[int] = DOC_OCR_WORKERS,
+              early_exit: bool = False) -> Stage:
+    """
+    Etapa que convierte cada Document en Tokens con el extractor de su tipo:
+    EasyOCR para imágenes, la capa de texto o Tesseract página por página
+    para PDF y Vosk segmento por segmento para audio. Con early_exit los PDF
+    se recorren desde la última página y se dejan de leer cuando el
+    extractor marca el documento con skip(); antes de leer cada página se
+    espera el veredicto del extractor sobre la anterior (part_done), así no
+    se hace OCR de ninguna página que luego se omite.
+    """
+    def tokenize(items: Iterator[Document], pipeline: Pipeline) -> Iterator[Tokens]:
+        for doc in items:
+            if pipeline.stopped:
+                return
+            error = None
+            try:
+                if doc.fuente == "imagen":
+                    from tools.imgocr.img_extraction import extract_text_from_image
+                    yield Tokens(doc.ruta, doc.fuente, 1, extract_text_from_image(doc.ruta, use_cache))
+
+                elif doc.fuente == "documento":
+                    from tools.dococr.doc_extraction import iter_text_from_pdf
+                    paginas = iter_text_from_pdf(doc.ruta, use_cache, workers, reverse=early_exit)
+                    try:
+                        for n, r in enumerate(paginas, 1):
+                            yield Tokens(doc.ruta, doc.fuente, r.page, r.tokens, r.source, r.seconds)
+                            if early_exit:
+                                pipeline.wait_parts(doc.ruta, n)
+                            if pipeline.stopped:
+                                break
+                            if pipeline.is_skipped(doc.ruta):
+                                if r.page > 1:
+                                    print(f"Todas las palabras clave encontradas; se omiten {r.page - 1} páginas")
+                                break
+                    finally:
+                        paginas.close()
+
+                else:
+                    from tools.audio.audio_extraction import SAMPLE_RATE, iter_transcription
+                    from tools.audio.vad import EnergyVad
+                    vad = EnergyVad(SAMPLE_RATE) if AUDIO_VAD_ENABLED else None
+                    segmentos = iter_transcription(doc.ruta, should_stop=lambda: pipeline.stopped, vad=vad)
+                    for n, tokens in enumerate(segmentos, 1):
+                        yield Tokens(doc.ruta, doc.fuente, n, tokens)
+            except Exception as e:
+                error = str(e)
+            yield Tokens(doc.ruta, doc.fuente, None, [], fin=True, error=error)
+            # Todas sus páginas ya tienen veredicto: el mismo archivo puede
+            # volver a llegar y empieza desde cero
+            pipeline.forget(doc.ruta)
+    return tokenize
+
+
+def extractor(keywords: List[str] = keywords_list, look_ahead: int = 6,
+              early_exit: bool = False) -> Stage:
+    """
+    Etapa que extrae los valores de cada documento a medida que llegan sus
+    partes. El resultado final es idéntico a extract_key_values sobre todos
+    los tokens del documento. Con early_exit los PDF llegan desde la última
+    página y, en cuanto todas las palabras clave tienen valor, se pide al
+    tokenizador que no lea las anteriores.
+    """
+    from tools.data_extraction import ReverseKeyValueExtractor, StreamingKeyValueExtractor
+
+    def extract(items: Iterator[Tokens], pipeline: Pipeline) -> Iterator[Extraction]:
+        estados = {}
+        for parte in items:
+            estado = estados.get(parte.ruta)
+            if estado is None:
+                if early_exit and parte.fuente == "documento":
+                    estado = [ReverseKeyValueExtractor(keywords, look_ahead), 0]
+                else:
+                    estado = [StreamingKeyValueExtractor(keywords, look_ahead), 0]
+                estados[parte.ruta] = estado
+            extractor_doc = estado[0]
+
+            if parte.fin:
+                del estados[parte.ruta]
+                yield Extraction(parte.ruta, parte.fuente, extractor_doc.values(), estado[1],
+                                 False, error=parte.error)
+                continue
+
+            with metrics.timer("extraccion", parte.fuente):
+                extractor_doc.feed(parte.tokens)
+            estado[1] += len(parte.tokens)
+            if isinstance(extractor_doc, ReverseKeyValueExtractor):
+                if extractor_doc.complete():
+                    pipeline.skip(parte.ruta)
+                # El tokenizador espera este veredicto antes de leer la página anterior
+                pipeline.part_done(parte.ruta)
+            yield Extraction(parte.ruta, parte.fuente, extractor_doc.values(), estado[1], True, parte)
+    return extract
+
+
+def extraction_pipeline(
+    source: Iterable[Document],
+    use_cache: bool = True,
+    workers: Optional[int] = DOC_OCR_WORKERS,
+    early_exit: bool = False,
+    keywords: List[str] = keywords_list,
+    queue_size: Optional[int] = None
+    ) -> Pipeline:
+    """
+    Pipeline completo de documentos a valores extraídos.
+
+    Args:
+        source: Documentos a procesar (lista, generador o cola de la interfaz)
+        use_cache: Reutilizar resultados previos de la caché OCR
+        workers: Páginas de un PDF procesadas a la vez (ver DOC_OCR_WORKERS)
+        early_exit: Recorrer los PDF desde la última página y detenerse al
+            tener todas las palabras clave (ver DOC_EARLY_EXIT)
+        keywords: Palabras clave a buscar
+        queue_size: Elementos en espera entre etapas (None = PIPELINE_QUEUE_SIZE)
+
+    Returns:
+        Pipeline que produce Extraction parciales y finales
+    """
+    if queue_size is None:
+        # cProfile solo ve el hilo que perfila: con el perfilado activo las
+        # etapas corren en el hilo del consumidor
+        queue_size = 0 if profiling.is_enabled() else PIPELINE_QUEUE_SIZE
+    return Pipeline(source,
+                    tokenizer(use_cache, workers, early_exit),
+                    extractor(keywords, early_exit=early_exit),
+                    queue_size=queue_size)
+
+
+def storage_sink(path: Optional[str] = None) -> Callable[[Extraction], None]:
+    """
+    Destino que guarda en el almacén cada resultado final con tokens y sin
+    error, con el nombre del archivo de origen. La interfaz lo llama desde
+    sus hilos de trabajo, nunca desde el de la interfaz.
+    """
+    from tools.storage import DATA_PATH, append_entry, make_entry
+
+    def save(resultado: Extraction) -> None:
+        if resultado.parcial or resultado.error or not resultado.total_tokens:
+            return
+        append_entry(make_entry(resultado.datos, resultado.fuente, os.path.basename(resultado.ruta)),
+                     path or DATA_PATH)
+    return save
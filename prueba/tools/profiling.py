@@ -0,0 +1,190 @@
+"""
+Perfilado bajo demanda de una extracción (imagen, documento o audio).
+
+Con el perfilado activo, cada archivo procesado se ejecuta bajo cProfile y
+tracemalloc, y en PROFILE_DIR se crea una carpeta con la fecha, la fuente y
+el hash del archivo de entrada:
+
+    perfil.prof       estadísticas de cProfile (pstats, snakeviz)
+    memoria.snapshot  instantánea de tracemalloc (tracemalloc.Snapshot.load)
+    resumen.txt       funciones más costosas y líneas con más memoria
+    info.json         archivo, hash, duración y pico de memoria
+
+Se activa con PROFILE_ENABLED, la variable de entorno OPTIMAX_PROFILE=1 o
+enable(). Apagado, profile() retorna un contexto vacío compartido y
+cProfile/tracemalloc ni siquiera se importan.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from config.settings import PROFILE_ENABLED, PROFILE_DIR, PROFILE_TOP, PROFILE_TRACE_FRAMES
+
+PROFILE_ENV = "OPTIMAX_PROFILE"
+
+_enabled = PROFILE_ENABLED or os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+# cProfile y tracemalloc son globales al proceso en la práctica: se perfila
+# una ejecución a la vez y las que coinciden con ella corren sin perfilar
+_lock = threading.Lock()
+
+
+def enable() -> None:
+    """Activa el perfilado en este proceso y en los procesos hijos que cree."""
+    global _enabled
+    _enabled = True
+    os.environ[PROFILE_ENV] = "1"
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 del contenido del archivo."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _NoProfile:
+    directorio = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PROFILE = _NoProfile()
+
+
+class ProfileRun:
+    """
+    Contexto que perfila el bloque. Al salir escribe los resultados, imprime
+    el resumen y deja la carpeta en self.directorio.
+    """
+
+    def __init__(self, ruta: str, fuente: str, top: int = PROFILE_TOP):
+        self.ruta = ruta
+        self.fuente = fuente
+        self.top = top
+        self.directorio: Optional[str] = None
+        self._profiler = None
+        self._started_tracing = False
+
+    def __enter__(self):
+        if not _lock.acquire(blocking=False):
+            print(f"Perfilado omitido para {self.ruta}: otra ejecución se está perfilando")
+            return self
+
+        import cProfile
+        import tracemalloc
+
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start(PROFILE_TRACE_FRAMES)
+        tracemalloc.reset_peak()
+
+        self._inicio = time.perf_counter()
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profiler is None:
+            return False
+
+        import tracemalloc
+
+        try:
+            self._profiler.disable()
+            segundos = time.perf_counter() - self._inicio
+            _, pico = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            if self._started_tracing:
+                tracemalloc.stop()
+
+            try:
+                self.directorio = self._write(snapshot, segundos, pico, exc is not None)
+            except OSError as e:
+                print(f"Error al guardar el perfil de {self.ruta}: {e}")
+        finally:
+            self._profiler = None
+            _lock.release()
+        return False
+
+    def _make_directory(self, digest: str) -> str:
+        base = os.path.join(PROFILE_DIR, f"{datetime.now():%Y%m%d-%H%M%S}_{self.fuente}_{digest[:12]}")
+        directorio, n = base, 1
+        while True:
+            try:
+                os.makedirs(directorio)
+                return directorio
+            except FileExistsError:
+                n += 1
+                directorio = f"{base}-{n}"
+
+    def _write(self, snapshot, segundos: float, pico: int, fallo: bool) -> str:
+        import pstats
+
+        digest = file_hash(self.ruta) if os.path.isfile(self.ruta) else "sin-archivo"
+        directorio = self._make_directory(digest)
+
+        self._profiler.dump_stats(os.path.join(directorio, "perfil.prof"))
+        snapshot.dump(os.path.join(directorio, "memoria.snapshot"))
+
+        info = {
+            "archivo": os.path.abspath(self.ruta),
+            "sha256": digest,
+            "fuente": self.fuente,
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "segundos": segundos,
+            "pico_memoria_mb": pico / 1024 / 1024,
+            "error": fallo,
+        }
+        with open(os.path.join(directorio, "info.json"), "w", encoding="utf-8") as f:
+            json.dump(info, f, indent=2, ensure_ascii=False)
+
+        # Resumen completo en el archivo; en pantalla solo las funciones con más tiempo propio
+        texto = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=texto)
+        texto.write(f"{self.ruta} ({self.fuente})  {segundos:.2f} s, pico de memoria {info['pico_memoria_mb']:.1f} MB\n\n")
+        stats.sort_stats("cumulative").print_stats(self.top)
+        stats.sort_stats("tottime").print_stats(self.top)
+        texto.write(f"Líneas con más memoria asignada al terminar (top {self.top}):\n")
+        for stat in snapshot.statistics("lineno")[:self.top]:
+            texto.write(f"  {stat}\n")
+        with open(os.path.join(directorio, "resumen.txt"), "w", encoding="utf-8") as f:
+            f.write(texto.getvalue())
+
+        print(f"Perfil de {os.path.basename(self.ruta)}: {segundos:.2f} s, "
+              f"pico de memoria {info['pico_memoria_mb']:.1f} MB -> {directorio}")
+        print(f"  {'llamadas':>10} {'propio (s)':>11} {'acum. (s)':>10}  función")
+        filas = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        for (archivo, linea, funcion), (_, llamadas, propio, acumulado, _) in filas[:self.top]:
+            print(f"  {llamadas:>10} {propio:>11.3f} {acumulado:>10.3f}  "
+                  f"{funcion} ({os.path.basename(archivo)}:{linea})")
+        return directorio
+
+
+def profile(ruta: str, fuente: str):
+    """
+    Contexto que perfila el procesamiento de un archivo si el perfilado está
+    activo; si no, retorna un contexto vacío sin costo.
+
+    Args:
+        ruta: Archivo de entrada (su hash identifica la carpeta de resultados)
+        fuente: "imagen", "documento" o "audio"
+    """
+    if not _enabled:
+        return _NO_PROFILE
+    return ProfileRun(ruta, fuente)
@@ -0,0 +1,339 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config.settings import SQLITE_PATH
+from tools import jsonl_store
+
+DATA_PATH = SQLITE_PATH
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extracciones (
+    id INTEGER PRIMARY KEY,
+    fuente TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    archivo TEXT,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS valores (
+    extraccion_id INTEGER NOT NULL REFERENCES extracciones(id) ON DELETE CASCADE,
+    clave TEXT NOT NULL,
+    valor REAL
+);
+CREATE INDEX IF NOT EXISTS idx_extracciones_fuente_fecha ON extracciones(fuente, fecha);
+CREATE INDEX IF NOT EXISTS idx_extracciones_fecha ON extracciones(fecha);
+CREATE INDEX IF NOT EXISTS idx_extracciones_archivo ON extracciones(archivo);
+DROP INDEX IF EXISTS idx_valores_clave_valor;
+CREATE INDEX IF NOT EXISTS idx_valores_clave_valor_id ON valores(clave, valor, extraccion_id);
+CREATE INDEX IF NOT EXISTS idx_valores_extraccion ON valores(extraccion_id);
+"""
+
+# Una conexión por hilo y por archivo: sqlite3 no comparte conexiones entre hilos
+_local = threading.local()
+_init_lock = threading.Lock()
+# Importación del historial JSONL en curso en este proceso
+_import_lock = threading.Lock()
+
+def _connect(path: str) -> sqlite3.Connection:
+    conexiones = getattr(_local, "conexiones", None)
+    if conexiones is None:
+        conexiones = _local.conexiones = {}
+
+    conn = conexiones.get(path)
+    if conn is not None:
+        return conn
+
+    with _init_lock:
+        # isolation_level=None: las transacciones se abren explícitamente
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        # WAL permite leer mientras otra instancia escribe; busy_timeout hace
+        # que las escrituras concurrentes esperen su turno en vez de fallar
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.executescript(_SCHEMA)
+        conexiones[path] = conn
+
+    # Fuera de _init_lock: la importación puede tardar y los demás hilos
+    # deben poder abrir sus conexiones mientras tanto
+    if path == DATA_PATH:
+        _import_jsonl(conn)
+    return conn
+
+def prepare(path: str = DATA_PATH) -> None:
+    """
+    Abre la base y, la primera vez, importa el historial JSONL. La aplicación
+    lo llama al iniciar desde un hilo aparte para que la importación no
+    ocurra en el hilo de la interfaz.
+    """
+    _connect(path)
+
+def _import_jsonl(conn: sqlite3.Connection) -> None:
+    # La primera vez se copian las extracciones del registro JSONL (que a su
+    # vez migra el data.json anterior si existe). user_version marca la base
+    # como importada y el bloqueo evita que dos instancias importen a la vez
+    if conn.execute("PRAGMA user_version").fetchone()[0]:
+        return
+    # Si otro hilo ya importa, no esperarlo: hasta que termine esta conexión
+    # ve la base vacía, y el cambio de generación (user_version) hace que los
+    # cursores tomados antes se relean completos
+    if not _import_lock.acquire(blocking=False):
+        return
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0]:
+                conn.execute("ROLLBACK")
+                return
+            entradas = list(jsonl_store.iter_entries()) if jsonl_store.exists() else []
+            _insert_rows(conn, entradas)
+            conn.execute("PRAGMA user_version = 1")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        _import_lock.release()
+    if entradas:
+        print(f"Importadas {len(entradas)} extracciones de {jsonl_store.DATA_PATH} a {DATA_PATH}")
+
+def _insert(conn: sqlite3.Connection, entradas: List[Dict]) -> None:
+    # BEGIN IMMEDIATE toma el bloqueo de escritura al inicio y evita que dos
+    # instancias lleguen a un interbloqueo a mitad de la transacción
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        _insert_rows(conn, entradas)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+def _insert_rows(conn: sqlite3.Connection, entradas: List[Dict]) -> None:
+    for entrada in entradas:
+        datos = entrada.get("datos", {})
+        cursor = conn.execute(
+            "INSERT INTO extracciones (fuente, fecha, archivo, datos) VALUES (?, ?, ?, ?)",
+            (entrada.get("fuente", ""), entrada.get("fecha", ""), entrada.get("archivo"),
+             json.dumps(datos, ensure_ascii=False)),
+        )
+        conn.executemany(
+            "INSERT INTO valores (extraccion_id, clave, valor) VALUES (?, ?, ?)",
+            [(cursor.lastrowid, clave, valor) for clave, valor in datos.items()],
+        )
+
+def _row_to_entry(row) -> Dict:
+    entrada = {"fuente": row[1], "fecha": row[2], "datos": json.loads(row[4])}
+    if row[3] is not None:
+        entrada["archivo"] = row[3]
+    return entrada
+
+def append_entry(entrada: Dict, path: str = DATA_PATH) -> None:
+    """Inserta una extracción y sus valores en una sola transacción."""
+    _insert(_connect(path), [entrada])
+
+def append_entries(entradas: List[Dict], path: str = DATA_PATH) -> None:
+    """Inserta varias extracciones en una sola transacción."""
+    if entradas:
+        _insert(_connect(path), entradas)
+
+# Columnas por las que se puede ordenar una consulta
+SORT_COLUMNS = ("fecha", "fuente", "archivo")
+
+def _where(
+    corte: Optional[Tuple] = None,
+    fuente: Optional[str] = None,
+    desde: Optional[str] = None,
+    hasta: Optional[str] = None,
+    clave: Optional[str] = None,
+    valor_min: Optional[float] = None,
+    valor_max: Optional[float] = None
+    ) -> Tuple[str, list]:
+    condiciones = []
+    parametros: list = []
+    if corte is not None:
+        condiciones.append("e.id <= ?")
+        parametros.append(corte[1])
+    if fuente is not None:
+        condiciones.append("e.fuente = ?")
+        parametros.append(fuente)
+    if desde is not None:
+        condiciones.append("e.fecha >= ?")
+        parametros.append(desde)
+    if hasta is not None:
+        condiciones.append("e.fecha < ?")
+        parametros.append(hasta)
+
+    if clave is not None or valor_min is not None or valor_max is not None:
+        # La subconsulta recorre el índice (clave, valor, extraccion_id) y
+        # solo después busca cada extracción por id
+        filtros_valor = []
+        if clave is not None:
+            filtros_valor.append("clave = ?")
+            parametros.append(clave)
+        if valor_min is not None:
+            filtros_valor.append("valor >= ?")
+            parametros.append(valor_min)
+        if valor_max is not None:
+            filtros_valor.append("valor <= ?")
+            parametros.append(valor_max)
+        condiciones.append(
+            f"e.id IN (SELECT extraccion_id FROM valores WHERE {' AND '.join(filtros_valor)})")
+
+    if not condiciones:
+        return "", parametros
+    return " WHERE " + " AND ".join(condiciones), parametros
+
+def query_entries(
+    path: str = DATA_PATH,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    orden: Optional[str] = None,
+    descendente: bool = False,
+    corte: Optional[Tuple] = None,
+    **filtros
+    ) -> List[Dict]:
+    """
+    Consulta las extracciones usando los índices de la base.
+
+    Args:
+        fuente: "imagen", "documento" o "audio"
+        desde: Fecha ISO inicial (incluida)
+        hasta: Fecha ISO final (excluida)
+        clave: Palabra clave que debe tener valor en la extracción
+        valor_min, valor_max: Límites del valor (de la clave, o de cualquiera si no se indica)
+        limit, offset: Paginación
+        orden: Columna de SORT_COLUMNS (por defecto, orden de inserción)
+        descendente: Invertir el orden
+        corte: Cursor de snapshot(); solo se consideran las entradas anteriores a él
+
+    Returns:
+        Lista de extracciones con el mismo formato que se guardó
+    """
+    where, parametros = _where(corte, **filtros)
+    direccion = "DESC" if descendente else "ASC"
+    orden_sql = f"e.id {direccion}"
+    if orden is not None:
+        if orden not in SORT_COLUMNS:
+            raise ValueError(f"No se puede ordenar por {orden}")
+        orden_sql = f"e.{orden} {direccion}, {orden_sql}"
+
+    sql = (f"SELECT e.id, e.fuente, e.fecha, e.archivo, e.datos FROM extracciones e{where}"
+           f" ORDER BY {orden_sql} LIMIT ? OFFSET ?")
+    parametros += [-1 if limit is None else limit, offset]
+
+    return [_row_to_entry(row) for row in _connect(path).execute(sql, parametros)]
+
+def iter_entries(path: str = DATA_PATH, corte: Optional[Tuple] = None) -> Iterator[Dict]:
+    """Recorre todas las extracciones en orden de inserción."""
+    where, parametros = _where(corte)
+    cursor = _connect(path).execute(
+        f"SELECT e.id, e.fuente, e.fecha, e.archivo, e.datos FROM extracciones e{where} ORDER BY e.id",
+        parametros)
+    for row in cursor:
+        yield _row_to_entry(row)
+
+def snapshot(path: str = DATA_PATH) -> Tuple:
+    """
+    Cursor que identifica el estado actual de la base: (generación, último id).
+    La generación cambia con cada clear(), así que un id repetido tras
+    vaciar la base no se confunde con el anterior.
+    """
+    conn = _connect(path)
+    conn.execute("BEGIN")
+    try:
+        generacion = conn.execute("PRAGMA user_version").fetchone()[0]
+        ultimo = conn.execute("SELECT COALESCE(MAX(id), 0) FROM extracciones").fetchone()[0]
+    finally:
+        conn.execute("COMMIT")
+    return (generacion, ultimo)
+
+def read_since(cursor: Tuple, path: str = DATA_PATH) -> Tuple[Optional[List[Dict]], Tuple]:
+    """
+    Lee solo las extracciones insertadas después de cursor.
+
+    Returns:
+        (nuevas, cursor actualizado). nuevas es None si la base se vació
+        desde entonces y hay que leerla completa.
+    """
+    conn = _connect(path)
+    # Una sola transacción de lectura: generación y filas del mismo estado
+    conn.execute("BEGIN")
+    try:
+        generacion = conn.execute("PRAGMA user_version").fetchone()[0]
+        if generacion != cursor[0]:
+            ultimo = conn.execute("SELECT COALESCE(MAX(id), 0) FROM extracciones").fetchone()[0]
+            return None, (generacion, ultimo)
+
+        filas = conn.execute(
+            "SELECT id, fuente, fecha, archivo, datos FROM extracciones WHERE id > ? ORDER BY id",
+            (cursor[1],)).fetchall()
+    finally:
+        conn.execute("COMMIT")
+
+    ultimo = filas[-1][0] if filas else cursor[1]
+    return [_row_to_entry(row) for row in filas], (generacion, ultimo)
+
+def count(path: str = DATA_PATH, corte: Optional[Tuple] = None, **filtros) -> int:
+    """Número de extracciones que cumplen los filtros de query_entries."""
+    if filtros.get("clave") is not None:
+        return _count_values(_connect(path), corte, **filtros)
+    where, parametros = _where(corte, **filtros)
+    sql = f"SELECT COUNT(*) FROM extracciones e{where}"
+    return _connect(path).execute(sql, parametros).fetchone()[0]
+
+def _count_values(
+    conn: sqlite3.Connection,
+    corte: Optional[Tuple] = None,
+    fuente: Optional[str] = None,
+    desde: Optional[str] = None,
+    hasta: Optional[str] = None,
+    clave: Optional[str] = None,
+    valor_min: Optional[float] = None,
+    valor_max: Optional[float] = None
+    ) -> int:
+    # Cada extracción tiene a lo sumo una fila por clave, así que contar
+    # extracciones es contar filas de valores. Con solo clave, límites y
+    # corte la cuenta sale entera del índice (clave, valor, extraccion_id),
+    # sin leer la tabla de extracciones
+    condiciones = ["v.clave = ?"]
+    parametros: list = [clave]
+    if valor_min is not None:
+        condiciones.append("v.valor >= ?")
+        parametros.append(valor_min)
+    if valor_max is not None:
+        condiciones.append("v.valor <= ?")
+        parametros.append(valor_max)
+    if corte is not None:
+        condiciones.append("v.extraccion_id <= ?")
+        parametros.append(corte[1])
+
+    join = ""
+    if fuente is not None or desde is not None or hasta is not None:
+        join = " JOIN extracciones e ON e.id = v.extraccion_id"
+        where, parametros_e = _where(fuente=fuente, desde=desde, hasta=hasta)
+        condiciones.append(where[len(" WHERE "):])
+        parametros += parametros_e
+
+    sql = f"SELECT COUNT(*) FROM valores v{join} WHERE {' AND '.join(condiciones)}"
+    return conn.execute(sql, parametros).fetchone()[0]
+
+def exists(path: str = DATA_PATH) -> bool:
+    return os.path.exists(path) and count(path) > 0
+
+def clear(path: str = DATA_PATH) -> None:
+    """Elimina todas las extracciones guardadas."""
+    conn = _connect(path)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM valores")
+        conn.execute("DELETE FROM extracciones")
+        # Nueva generación: los cursores anteriores dejan de ser válidos
+        generacion = conn.execute("PRAGMA user_version").fetchone()[0]
+        conn.execute(f"PRAGMA user_version = {generacion + 1}")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
@@ -0,0 +1,105 @@
+"""
+Punto único de acceso al almacén de extracciones. Según STORAGE_BACKEND las
+operaciones se delegan al registro JSONL (tools.jsonl_store) o a la base
+SQLite (tools.sqlite_store); ambos comparten el mismo formato de entrada.
+"""
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config.settings import STORAGE_BACKEND
+
+from tools.jsonl_store import entry_matches
+from tools import metrics
+
+if STORAGE_BACKEND == "sqlite":
+    from tools import sqlite_store as _backend
+else:
+    from tools import jsonl_store as _backend
+
+DATA_PATH = _backend.DATA_PATH
+SORT_COLUMNS = _backend.SORT_COLUMNS
+
+def make_entry(datos: Dict[str, float], fuente: str, archivo: Optional[str] = None) -> Dict:
+    """Construye una entrada con la fuente, la fecha actual y los valores extraídos."""
+    entrada = {
+        "fuente": fuente,
+        "fecha": datetime.now().isoformat(),
+        "datos": datos,
+    }
+    if archivo:
+        entrada["archivo"] = archivo
+    return entrada
+
+def guardar_datos(datos: Dict[str, float], fuente: str, archivo: Optional[str] = None) -> Dict:
+    """
+    Guarda una extracción en el almacén configurado.
+
+    Args:
+        datos: Valores extraídos por palabra clave
+        fuente: "imagen", "documento" o "audio"
+        archivo: Nombre del archivo de origen, si lo hay
+
+    Returns:
+        La entrada guardada
+    """
+    entrada = make_entry(datos, fuente, archivo)
+    append_entry(entrada)
+    return entrada
+
+def append_entry(entrada: Dict, path: str = DATA_PATH) -> None:
+    with metrics.timer("guardado", entrada.get("fuente")):
+        _backend.append_entry(entrada, path)
+
+def append_entries(entradas: List[Dict], path: str = DATA_PATH) -> None:
+    with metrics.timer("guardado_lote"):
+        _backend.append_entries(entradas, path)
+
+def prepare(path: str = DATA_PATH) -> None:
+    """
+    Deja el almacén listo para usarse: migra el data.json anterior y, con
+    SQLite, importa la primera vez el historial JSONL. Puede tardar con
+    historiales grandes, así que se llama fuera del hilo de la interfaz.
+    """
+    _backend.prepare(path)
+
+def iter_entries(path: str = DATA_PATH) -> Iterator[Dict]:
+    return _backend.iter_entries(path)
+
+def snapshot(path: str = DATA_PATH) -> Tuple:
+    """
+    Cursor del estado actual del almacén. Dos cursores iguales indican que no
+    hubo cambios; obtenerlo no lee las extracciones.
+    """
+    return _backend.snapshot(path)
+
+def read_since(cursor: Tuple, path: str = DATA_PATH) -> Tuple[Optional[List[Dict]], Tuple]:
+    """
+    Retorna (nuevas, cursor) con las extracciones agregadas después de
+    cursor, o (None, cursor) si el almacén se vació o reescribió y hay que
+    volver a leerlo completo.
+    """
+    return _backend.read_since(cursor, path)
+
+def load_entries(path: str = DATA_PATH) -> List[Dict]:
+    return list(_backend.iter_entries(path))
+
+def query_entries(path: str = DATA_PATH, **filtros) -> List[Dict]:
+    """
+    Filtra las extracciones por fuente, rango de fechas (desde incluida,
+    hasta excluida), palabra clave y límites de valor, con paginación
+    (limit, offset) y orden por una columna de SORT_COLUMNS. Con corte (un
+    cursor de snapshot) solo se consideran las extracciones anteriores a él.
+    Con SQLite la consulta usa índices. Con JSONL, en orden de inserción o
+    por fecha una página solo lee sus líneas (índice de posiciones que se
+    actualiza con las líneas nuevas); los demás órdenes recorren el registro.
+    """
+    return _backend.query_entries(path, **filtros)
+
+def count(path: str = DATA_PATH, **filtros) -> int:
+    return _backend.count(path, **filtros)
+
+def exists(path: str = DATA_PATH) -> bool:
+    return _backend.exists(path)
+
+def clear(path: str = DATA_PATH) -> None:
+    _backend.clear(path)
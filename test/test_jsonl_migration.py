@@ -0,0 +1,43 @@
+"""
+Migración del data.json anterior al registro por líneas, con el historial
+de ejemplo de prueba/data.json.
+"""
+import json
+import os
+import shutil
+
+import pytest
+
+from tools import jsonl_store
+
+EJEMPLO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prueba", "data.json")
+
+
+def test_migrates_sample_history(tmp_path):
+    legacy_path = str(tmp_path / "data.json")
+    path = str(tmp_path / "data.jsonl")
+    shutil.copyfile(EJEMPLO, legacy_path)
+    with open(EJEMPLO, "r", encoding="utf-8") as f:
+        esperadas = json.load(f)["extracciones"]
+
+    assert jsonl_store.migrate_legacy(path, legacy_path)
+    assert list(jsonl_store.iter_entries(path)) == esperadas
+    assert os.path.exists(f"{legacy_path}.migrado") and not os.path.exists(legacy_path)
+    # La segunda llamada no vuelve a migrar
+    assert not jsonl_store.migrate_legacy(path, legacy_path)
+
+
+def test_failed_migration_is_retried(tmp_path):
+    legacy_path = str(tmp_path / "data.json")
+    path = str(tmp_path / "data.jsonl")
+    with open(legacy_path, "w", encoding="utf-8") as f:
+        f.write('{"extracciones": [')
+
+    with pytest.raises(ValueError):
+        jsonl_store.migrate_legacy(path, legacy_path)
+    assert not os.path.exists(path)
+
+    # Una vez reparado el archivo, la migración se hace en el siguiente intento
+    shutil.copyfile(EJEMPLO, legacy_path)
+    assert jsonl_store.migrate_legacy(path, legacy_path)
+    assert len(list(jsonl_store.iter_entries(path))) > 0
@@ -0,0 +1,82 @@
+"""
+Los extractores incrementales (por segmentos y desde la última página)
+deben dar exactamente el mismo resultado (valores y orden de las claves)
+que extract_key_values sobre todos los tokens del documento.
+"""
+import random
+
+from tools.data_extraction import (ReverseKeyValueExtractor, StreamingKeyValueExtractor,
+                                   extract_key_values)
+
+# Fragmentos con los que se arman palabras clave y tokens: prefijos de
+# palabras clave, separadores, números con formatos distintos y texto
+ALFABETO = ["a", "b", "ab", "ta", "tot", "total", "x", ":", "$", " ", "1", "2", ".",
+            ",", "T", "tax", "5", "itbms", "é"]
+CASOS = 3000
+
+
+def random_case(rng: random.Random):
+    keywords = ["".join(rng.choice(ALFABETO) for _ in range(rng.randint(0, 3)))
+                for _ in range(rng.randint(1, 5))]
+    tokens = ["".join(rng.choice(ALFABETO) for _ in range(rng.randint(0, 3)))
+              for _ in range(rng.randint(0, 30))]
+    return keywords, tokens, rng.randint(0, 8)
+
+
+def split_pages(rng: random.Random, tokens):
+    paginas = []
+    i = 0
+    while i < len(tokens):
+        n = rng.randint(0, 6)
+        paginas.append(tokens[i:i + n])
+        i += n
+    return paginas
+
+
+def test_streaming_matches_full_extraction():
+    rng = random.Random(2)
+    for _ in range(CASOS):
+        keywords, tokens, look_ahead = random_case(rng)
+        esperado = extract_key_values(tokens, keywords, look_ahead)
+
+        extractor = StreamingKeyValueExtractor(keywords, look_ahead)
+        corte = rng.randint(0, len(tokens))
+        # La vista previa de un prefijo es la extracción de ese prefijo
+        assert extractor.preview(tokens[:corte]) == extract_key_values(tokens[:corte], keywords, look_ahead)
+
+        for segmento in split_pages(rng, tokens):
+            extractor.feed(segmento)
+        resultado = extractor.values()
+        assert resultado == esperado, (keywords, tokens, look_ahead)
+        assert list(resultado) == list(esperado)
+
+
+def test_reverse_matches_full_extraction():
+    rng = random.Random(3)
+    for _ in range(CASOS):
+        keywords, tokens, look_ahead = random_case(rng)
+        esperado = extract_key_values(tokens, keywords, look_ahead)
+
+        extractor = ReverseKeyValueExtractor(keywords, look_ahead)
+        for pagina in reversed(split_pages(rng, tokens)):
+            extractor.feed(pagina)
+        resultado = extractor.values()
+        assert resultado == esperado, (keywords, tokens, look_ahead)
+        assert list(resultado) == list(esperado), (keywords, tokens, look_ahead)
+
+
+def test_reverse_complete_keeps_final_values():
+    # Al completar todas las claves, las páginas anteriores ya no cambian el resultado
+    rng = random.Random(5)
+    for _ in range(CASOS):
+        keywords, tokens, look_ahead = random_case(rng)
+        paginas = split_pages(rng, tokens)
+        esperado = extract_key_values(tokens, keywords, look_ahead)
+
+        extractor = ReverseKeyValueExtractor(keywords, look_ahead)
+        for pagina in reversed(paginas):
+            extractor.feed(pagina)
+            if extractor.complete():
+                break
+        # El orden de las claves solo es el del documento si se leyeron todas las páginas
+        assert extractor.values() == esperado, (keywords, tokens, look_ahead)
@@ -0,0 +1,61 @@
+"""
+Métricas de los procesos de un pool: drain() en el proceso hijo, merge() en
+el principal, y el texto exportado para Prometheus.
+"""
+import pickle
+
+import pytest
+
+from tools import metrics
+
+
+@pytest.fixture(autouse=True)
+def limpio():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_drain_and_merge_round_trip():
+    metrics.observe("ocr", 0.5, "imagen")
+    metrics.observe("ocr", 1.5, "imagen")
+    metrics.observe("extraccion", 0.25)
+    metrics.increment("cache_ocr_fallo")
+    metrics.increment("errores", "imagen", 2)
+    esperado_filas = metrics.snapshot()
+    esperado_contadores = metrics.counters()
+
+    # Lo que devuelve un proceso del pool viaja serializado con su resultado
+    datos = pickle.loads(pickle.dumps(metrics.drain()))
+    assert metrics.snapshot() == [] and metrics.counters() == {}
+
+    metrics.merge(datos)
+    assert metrics.snapshot() == esperado_filas
+    assert metrics.counters() == esperado_contadores
+
+    # Dos procesos con lo mismo: cantidades, sumas y contadores se suman
+    metrics.merge(datos)
+    ocr = next(f for f in metrics.snapshot() if f["etapa"] == "ocr")
+    assert (ocr["cantidad"], ocr["total_s"]) == (4, 4.0)
+    assert metrics.counters()[("errores", "imagen")] == 4
+
+
+def test_render_prometheus():
+    metrics.observe("ocr", 0.5, "imagen")
+    metrics.observe("ocr", 1.5, "imagen")
+    metrics.increment("cache_ocr_acierto")
+    metrics.increment("error", 'a"b')
+
+    assert metrics.render_prometheus() == (
+        "# HELP optimax_etapa_segundos Duración de cada etapa del procesamiento\n"
+        "# TYPE optimax_etapa_segundos summary\n"
+        'optimax_etapa_segundos{etapa="ocr",fuente="imagen",quantile="0.5"} 1.500000\n'
+        'optimax_etapa_segundos{etapa="ocr",fuente="imagen",quantile="0.95"} 1.500000\n'
+        'optimax_etapa_segundos{etapa="ocr",fuente="imagen",quantile="0.99"} 1.500000\n'
+        'optimax_etapa_segundos_sum{etapa="ocr",fuente="imagen"} 2.000000\n'
+        'optimax_etapa_segundos_count{etapa="ocr",fuente="imagen"} 2\n'
+        "# HELP optimax_eventos_total Eventos contados por tipo de fuente\n"
+        "# TYPE optimax_eventos_total counter\n"
+        'optimax_eventos_total{evento="cache_ocr_acierto",fuente="general"} 1\n'
+        'optimax_eventos_total{evento="error",fuente="a\\"b"} 1\n'
+    )
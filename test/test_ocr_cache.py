@@ -0,0 +1,53 @@
+"""
+Tamaño acotado y orden LRU de la caché OCR en disco.
+"""
+import os
+
+from tools.ocr_cache import OCRCache
+
+
+def entry_size(cache: OCRCache, key: str) -> int:
+    return os.path.getsize(cache._entry_path(key))
+
+
+def scanned_size(cache: OCRCache) -> int:
+    return sum(os.path.getsize(os.path.join(cache.directory, n)) for n in os.listdir(cache.directory))
+
+
+def test_overwrite_keeps_size_exact(tmp_path):
+    cache = OCRCache(str(tmp_path), max_bytes=10_000)
+    cache.put("a", "x" * 100)
+    for n in (500, 10, 300, 300):
+        cache.put("a", "x" * n)
+        cache.put("b", "y" * n)
+
+    assert cache.stats()["bytes"] == scanned_size(cache)
+    assert cache.stats()["evictions"] == 0
+    assert cache.get("a") == "x" * 300
+
+
+def test_size_stays_under_bound(tmp_path):
+    cache = OCRCache(str(tmp_path), max_bytes=1_000)
+    for i in range(50):
+        cache.put(f"k{i}", "x" * 98)
+        assert cache.stats()["bytes"] == scanned_size(cache) <= 1_000
+
+    # Cada entrada ocupa 100 bytes: caben 10 y se desalojaron las demás
+    assert len(os.listdir(tmp_path)) == 10
+    assert cache.stats()["evictions"] == 40
+
+
+def test_evicts_least_recently_used_first(tmp_path):
+    cache = OCRCache(str(tmp_path), max_bytes=300)
+    for i, key in enumerate(("a", "b", "c"), 1):
+        cache.put(key, "x" * 98)
+        os.utime(cache._entry_path(key), (i * 1000, i * 1000))
+
+    # Leer "a" la vuelve la más reciente; "b" pasa a ser la más antigua
+    assert cache.get("a") == "x" * 98
+    cache.put("d", "x" * 98)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None and cache.get("d") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 3 * entry_size(cache, "a")
@@ -0,0 +1,153 @@
+"""
+Motor del pipeline con etapas y lectores de PDF falsos: contrapresión con
+colas acotadas, salida temprana página por página, errores de una etapa y
+el mismo archivo procesado dos veces.
+"""
+import sys
+import threading
+import time
+import types
+from typing import NamedTuple
+
+import pytest
+
+from tools import metrics
+from tools.pipeline import Document, Pipeline, extraction_pipeline
+
+
+class Pagina(NamedTuple):
+    page: int
+    tokens: list
+    source: str = "ocr"
+    seconds: float = 0.0
+
+
+class LectorFalso:
+    """
+    Reemplaza iter_text_from_pdf: cada llamada usa el siguiente documento de
+    contenidos (página -> tokens) y anota las páginas que se leyeron.
+    """
+
+    def __init__(self, *contenidos):
+        self.contenidos = list(contenidos)
+        self.leidas = []
+
+    def __call__(self, ruta, use_cache=True, workers=None, reverse=False):
+        contenido = self.contenidos.pop(0)
+        leidas = []
+        self.leidas.append(leidas)
+        paginas = sorted(contenido, reverse=reverse)
+        for pagina in paginas:
+            leidas.append(pagina)
+            # Da tiempo a que una etapa adelantada lea de más si el protocolo falla
+            time.sleep(0.005)
+            yield Pagina(pagina, contenido[pagina])
+
+
+@pytest.fixture
+def lector(monkeypatch):
+    def instalar(*contenidos):
+        falso = LectorFalso(*contenidos)
+        modulo = types.ModuleType("tools.dococr.doc_extraction")
+        modulo.iter_text_from_pdf = falso
+        monkeypatch.setitem(sys.modules, "tools.dococr.doc_extraction", modulo)
+        return falso
+    return instalar
+
+
+def documento(paginas=10, con_total=(10,)):
+    return {p: ["total", f"{p}"] if p in con_total else ["texto", "sin", "valores"]
+            for p in range(1, paginas + 1)}
+
+
+@pytest.fixture(autouse=True)
+def limpio():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_backpressure_bounds_items_in_flight():
+    producidos = []
+    consumidos = []
+    maximo = [0]
+
+    def fuente():
+        for i in range(60):
+            producidos.append(i)
+            maximo[0] = max(maximo[0], len(producidos) - len(consumidos))
+            yield i
+
+    def lenta(items, pipeline):
+        for item in items:
+            time.sleep(0.002)
+            yield item
+
+    for item in Pipeline(fuente(), lenta, queue_size=2):
+        consumidos.append(item)
+
+    assert consumidos == list(range(60))
+    # Dos colas de 2, un elemento en la etapa, uno en el consumidor y uno
+    # esperando en put() de la fuente
+    assert maximo[0] <= 2 * 2 + 3
+    assert metrics.counters()[("pipeline_contrapresion", "general")] > 0
+
+
+@pytest.mark.parametrize("queue_size", [0, 2])
+def test_early_exit_reads_only_needed_pages(lector, queue_size):
+    falso = lector(documento(con_total=(10,)), documento(con_total=(8,)))
+    pipeline = extraction_pipeline(documents_of("factura.pdf", "otra.pdf"), use_cache=False,
+                                   workers=1, early_exit=True, keywords=["total"],
+                                   queue_size=queue_size)
+    finales = [r for r in pipeline if not r.parcial]
+
+    # El veredicto de cada página llega antes de leer la anterior: no se hace
+    # OCR de ninguna página que después se descarta
+    assert falso.leidas == [[10], [10, 9, 8]]
+    assert [(r.ruta, r.datos) for r in finales] == [("factura.pdf", {"total": 10.0}),
+                                                    ("otra.pdf", {"total": 8.0})]
+
+
+@pytest.mark.parametrize("queue_size", [0, 2])
+def test_same_path_twice_starts_from_scratch(lector, queue_size):
+    # El mismo archivo vuelve a llegar con otro contenido: el estado de la
+    # primera pasada (skip y páginas evaluadas) se descartó con forget()
+    falso = lector(documento(con_total=(10,)), documento(con_total=(3,)))
+    pipeline = extraction_pipeline(documents_of("factura.pdf", "factura.pdf"), use_cache=False,
+                                   workers=1, early_exit=True, keywords=["total"],
+                                   queue_size=queue_size)
+    finales = [r for r in pipeline if not r.parcial]
+
+    assert falso.leidas == [[10], [10, 9, 8, 7, 6, 5, 4, 3]]
+    assert [r.datos for r in finales] == [{"total": 10.0}, {"total": 3.0}]
+    assert pipeline._skipped == set() and pipeline._parts_done == {}
+
+
+@pytest.mark.parametrize("queue_size", [0, 2])
+def test_stage_error_reaches_consumer(queue_size):
+    leidos = []
+
+    def fuente():
+        for i in range(1000):
+            leidos.append(i)
+            yield i
+
+    def falla(items, pipeline):
+        for item in items:
+            if item == 3:
+                raise ValueError("etapa rota")
+            yield item
+
+    recibidos = []
+    with pytest.raises(ValueError, match="etapa rota"):
+        for item in Pipeline(fuente(), falla, queue_size=queue_size):
+            recibidos.append(item)
+
+    assert recibidos == [0, 1, 2]
+    # La fuente se detuvo al fallar la etapa y no quedan hilos del pipeline
+    assert len(leidos) < 1000
+    assert not [h for h in threading.enumerate() if h.name.startswith("pipeline-")]
+
+
+def documents_of(*rutas):
+    return [Document(ruta, "documento") for ruta in rutas]
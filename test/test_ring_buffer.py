@@ -0,0 +1,52 @@
+"""
+Buffer circular del micrófono: datos que cruzan el final del arreglo y
+contadores de desbordamiento.
+"""
+from tools.audio.ring_buffer import PcmRingBuffer
+
+
+def test_reads_across_wraparound():
+    buffer = PcmRingBuffer(10)
+    assert buffer.write(b"abcdef")
+    assert buffer.read(4, timeout=0) == b"abcd"
+    # Quedan "ef" al final; "ghijkl" ocupa las dos posiciones finales y da la vuelta
+    assert buffer.write(b"ghijkl")
+    assert buffer.available() == 8
+    assert buffer.read(100, timeout=0) == b"efghijkl"
+    assert buffer.available() == 0
+
+
+def test_reads_whole_samples_only():
+    buffer = PcmRingBuffer(8, frame_bytes=2)
+    buffer.write(b"\x01\x02\x03")
+    # Una muestra de 16 bits no se entrega partida
+    assert buffer.read(3, timeout=0) == b"\x01\x02"
+    assert buffer.available() == 1
+
+
+def test_overflow_drops_whole_block():
+    buffer = PcmRingBuffer(10)
+    assert buffer.write(b"12345678")
+    assert not buffer.write(b"abcd")
+    assert not buffer.write(b"xyz")
+    assert buffer.write(b"90")
+
+    # Los bloques rechazados no dejan nada en el buffer
+    assert buffer.read(100, timeout=0) == b"1234567890"
+    stats = buffer.stats()
+    assert stats["desbordamientos"] == 2
+    assert stats["bytes_descartados"] == 7
+    assert stats["bytes_en_buffer"] == 0
+
+
+def test_underflow_and_close():
+    buffer = PcmRingBuffer(10)
+    assert buffer.read(4, timeout=0.01) == b""
+    assert buffer.stats()["subejecuciones"] == 1
+
+    buffer.write(b"ab")
+    buffer.close()
+    # Tras cerrar se entrega lo que queda y luego b"" sin esperar
+    assert buffer.read(4) == b"ab"
+    assert buffer.read(4) == b""
+    assert buffer.stats()["subejecuciones"] == 1
@@ -0,0 +1,151 @@
+"""
+Los dos almacenes (registro JSONL y SQLite) son intercambiables: con las
+mismas extracciones deben responder igual a query_entries, count,
+snapshot/read_since e iter_entries.
+"""
+import random
+
+import pytest
+
+from tools import jsonl_store, sqlite_store
+
+FUENTES = ("imagen", "documento", "audio")
+CLAVES = ("total", "tax", "subttl", "itbms")
+ARCHIVOS = ("a.png", "b.pdf", "c.wav", "d.png", None)
+CONSULTAS = 1500
+
+
+def make_entries(rng: random.Random, n: int, ordenadas: bool):
+    entradas = []
+    for i in range(n):
+        # Fechas repetidas para probar el desempate; ordenadas = como las
+        # guarda la aplicación, desordenadas = historial importado
+        dia = 1 + i // 40 if ordenadas else rng.randint(1, 9)
+        entrada = {
+            "fuente": rng.choice(FUENTES),
+            "fecha": f"2024-01-{dia:02d}T10:00:00",
+            "datos": {clave: round(rng.uniform(0, 200), 2)
+                      for clave in rng.sample(CLAVES, rng.randint(0, len(CLAVES)))},
+        }
+        archivo = rng.choice(ARCHIVOS)
+        if archivo:
+            entrada["archivo"] = archivo
+        entradas.append(entrada)
+    return entradas
+
+
+def random_filters(rng: random.Random):
+    filtros = {}
+    if rng.random() < 0.3:
+        filtros["fuente"] = rng.choice(FUENTES)
+    if rng.random() < 0.3:
+        filtros["desde"] = f"2024-01-{rng.randint(1, 9):02d}"
+    if rng.random() < 0.3:
+        filtros["hasta"] = f"2024-01-{rng.randint(1, 9):02d}"
+    if rng.random() < 0.4:
+        filtros["clave"] = rng.choice(CLAVES + ("inexistente",))
+    if rng.random() < 0.3:
+        filtros["valor_min"] = rng.uniform(0, 200)
+    if rng.random() < 0.3:
+        filtros["valor_max"] = rng.uniform(0, 200)
+    return filtros
+
+
+def append_both(entradas, jsonl_path, db_path, rng):
+    # Mezcla anexos individuales y por lotes
+    i = 0
+    while i < len(entradas):
+        lote = entradas[i:i + rng.randint(1, 30)]
+        if len(lote) == 1:
+            jsonl_store.append_entry(lote[0], jsonl_path)
+            sqlite_store.append_entry(lote[0], db_path)
+        else:
+            jsonl_store.append_entries(lote, jsonl_path)
+            sqlite_store.append_entries(lote, db_path)
+        i += len(lote)
+
+
+@pytest.fixture(params=[True, False], ids=["fechas_ordenadas", "fechas_desordenadas"])
+def stores(tmp_path, request):
+    rng = random.Random(f"almacenes-{request.param}")
+    jsonl_path = str(tmp_path / "data.jsonl")
+    db_path = str(tmp_path / "data.db")
+    append_both(make_entries(rng, 300, request.param), jsonl_path, db_path, rng)
+    return jsonl_path, db_path, request.param
+
+
+def test_iter_entries_same_order(stores):
+    jsonl_path, db_path, _ = stores
+    assert list(jsonl_store.iter_entries(jsonl_path)) == list(sqlite_store.iter_entries(db_path))
+
+
+def test_random_queries_match(stores):
+    jsonl_path, db_path, _ = stores
+    rng = random.Random(7)
+    for _ in range(CONSULTAS):
+        filtros = random_filters(rng)
+        consulta = dict(filtros,
+                        orden=rng.choice((None,) + jsonl_store.SORT_COLUMNS),
+                        descendente=rng.random() < 0.5,
+                        limit=rng.choice((None, 1, 10, 50)),
+                        offset=rng.choice((0, 0, 5, 40)))
+
+        assert jsonl_store.query_entries(jsonl_path, **consulta) == \
+            sqlite_store.query_entries(db_path, **consulta), consulta
+        assert jsonl_store.count(jsonl_path, **filtros) == sqlite_store.count(db_path, **filtros), filtros
+
+
+def test_incremental_reads_match(stores):
+    jsonl_path, db_path, ordenadas = stores
+    rng = random.Random(11)
+    cursores = [jsonl_store.snapshot(jsonl_path), sqlite_store.snapshot(db_path)]
+
+    for ronda in range(5):
+        nuevas = make_entries(rng, rng.randint(0, 20), ordenadas)
+        # Fechas posteriores a todo lo anterior, como las de la aplicación
+        for entrada in nuevas:
+            entrada["fecha"] = f"2024-02-{ronda + 1:02d}T10:00:00"
+        append_both(nuevas, jsonl_path, db_path, rng)
+
+        leidas_jsonl, cursores[0] = jsonl_store.read_since(cursores[0], jsonl_path)
+        leidas_sqlite, cursores[1] = sqlite_store.read_since(cursores[1], db_path)
+        assert leidas_jsonl == leidas_sqlite == nuevas
+
+    # Sin cambios: nada nuevo y el cursor no se mueve
+    assert jsonl_store.read_since(cursores[0], jsonl_path) == ([], cursores[0])
+    assert sqlite_store.read_since(cursores[1], db_path) == ([], cursores[1])
+
+
+def test_query_with_cut_ignores_later_entries(stores):
+    jsonl_path, db_path, ordenadas = stores
+    rng = random.Random(13)
+    corte_jsonl = jsonl_store.snapshot(jsonl_path)
+    corte_sqlite = sqlite_store.snapshot(db_path)
+    esperadas = jsonl_store.query_entries(jsonl_path, orden="fecha", descendente=True, limit=50)
+
+    append_both(make_entries(rng, 25, ordenadas), jsonl_path, db_path, rng)
+
+    for filtros in [{}] + [random_filters(rng) for _ in range(50)]:
+        consulta = dict(filtros, orden="fecha", descendente=True, limit=50)
+        resultado = jsonl_store.query_entries(jsonl_path, corte=corte_jsonl, **consulta)
+        assert resultado == sqlite_store.query_entries(db_path, corte=corte_sqlite, **consulta), filtros
+        assert jsonl_store.count(jsonl_path, corte=corte_jsonl, **filtros) == \
+            sqlite_store.count(db_path, corte=corte_sqlite, **filtros), filtros
+        if not filtros:
+            assert resultado == esperadas
+
+
+def test_clear_invalidates_cursors(stores):
+    jsonl_path, db_path, _ = stores
+    cursor_jsonl = jsonl_store.snapshot(jsonl_path)
+    cursor_sqlite = sqlite_store.snapshot(db_path)
+
+    jsonl_store.clear(jsonl_path)
+    sqlite_store.clear(db_path)
+    entrada = {"fuente": "imagen", "fecha": "2024-03-01T10:00:00", "datos": {"total": 1.0}}
+    jsonl_store.append_entry(entrada, jsonl_path)
+    sqlite_store.append_entry(entrada, db_path)
+
+    assert jsonl_store.read_since(cursor_jsonl, jsonl_path)[0] is None
+    assert sqlite_store.read_since(cursor_sqlite, db_path)[0] is None
+    assert jsonl_store.query_entries(jsonl_path) == sqlite_store.query_entries(db_path) == [entrada]
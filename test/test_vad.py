@@ -0,0 +1,65 @@
+"""
+Compuerta de voz por energía sobre PCM sintético: margen previo y posterior
+alrededor de la voz y audio omitido.
+"""
+from array import array
+
+from tools.audio.vad import EnergyVad
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+MUESTRAS = SAMPLE_RATE * FRAME_MS // 1000
+
+
+def trama(valor: int) -> bytes:
+    # Amplitud constante: el RMS de la trama es abs(valor)
+    return array("h", [valor] * MUESTRAS).tobytes()
+
+
+def senal():
+    # 10 tramas de ruido bajo (cada una distinta), 5 de voz y 10 de ruido
+    silencio = [trama(i + 1) for i in range(10)]
+    voz = [trama(5000 + i) for i in range(5)]
+    cola = [trama(20 + i) for i in range(10)]
+    return silencio + voz + cola
+
+
+def make_vad():
+    return EnergyVad(SAMPLE_RATE, frame_ms=FRAME_MS, min_rms=300, noise_factor=3.0,
+                     pre_roll_ms=3 * FRAME_MS, post_roll_ms=2 * FRAME_MS)
+
+
+def test_keeps_pre_and_post_roll():
+    tramas = senal()
+    vad = make_vad()
+    tramos = vad.process(b"".join(tramas))
+
+    # 3 tramas antes de la voz, la voz y 2 después; el segmento queda cerrado
+    assert tramos == [(b"".join(tramas[7:17]), True)]
+    stats = vad.stats()
+    assert stats["segmentos"] == 1
+    # De 25 tramas se enviaron 10 y las 3 últimas esperan como pre-roll
+    assert abs(stats["omitido_s"] - 12 * FRAME_MS / 1000) < 1e-9
+    assert abs(stats["audio_s"] - 25 * FRAME_MS / 1000) < 1e-9
+
+
+def test_blocks_split_mid_frame_give_same_audio():
+    tramas = senal()
+    datos = b"".join(tramas)
+    vad = make_vad()
+
+    tramos = []
+    for inicio in range(0, len(datos), 700):
+        tramos.extend(vad.process(datos[inicio:inicio + 700]))
+
+    assert b"".join(audio for audio, _ in tramos) == b"".join(tramas[7:17])
+    assert [fin for _, fin in tramos][-1] is True
+    assert sum(fin for _, fin in tramos) == 1
+
+
+def test_silence_is_skipped():
+    vad = make_vad()
+    assert vad.process(b"".join(trama(5) for _ in range(20))) == []
+    assert vad.stats()["segmentos"] == 0
+    # Todo menos el pre-roll pendiente se omitió
+    assert abs(vad.stats()["omitido_s"] - 17 * FRAME_MS / 1000) < 1e-9